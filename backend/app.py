@@ -1,18 +1,40 @@
-from flask import Flask, request, jsonify, send_file
+import multiprocessing
+if __name__ == '__main__':
+    # PDF render pool workers of frozen (PyInstaller) builds re-launch the
+    # executable; this hands them off before any app initialisation runs.
+    multiprocessing.freeze_support()
+
+# Render pool workers started from `python app.py` import this module again;
+# they must not start the scheduler or any background threads.
+IS_POOL_WORKER = multiprocessing.parent_process() is not None
+
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import db_manager
-from pdf_builder import InvoicePDF
+import db_engine
+from pdf_cache import PDFRenderCache, render_key
+import bulk_export
+import pdf_store
+import render_queue
+import schema_version
+import notifier
+import leader
+import pdf_jobs
+import pagination
+import data_export
+import data_import
 import datetime
 import os
 import sys
 import webbrowser
-import json
 import io
+import threading
 from threading import Timer
-from flask_migrate import Migrate, upgrade
-from models import db, Invoice, Client
-import requests
-from flask_apscheduler import APScheduler
+from models import db
+
+# ReportLab (pdf_builder, statement_builder, font_registry), requests
+# (notifier) and APScheduler are imported where they are first used, so
+# they do not slow down every start. See tools/startup_time.py.
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 
@@ -34,6 +56,8 @@ def serve_static_files(path):
 
 # Database Config
 def get_db_path():
+    if os.environ.get('DATABASE_PATH'):
+        return os.environ['DATABASE_PATH']
     if getattr(sys, 'frozen', False):
         base_path = os.path.dirname(sys.executable)
         return os.path.join(base_path, 'data', 'invoices.db')
@@ -48,31 +72,37 @@ def get_db_path():
 
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{get_db_path()}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_engine.engine_options()
 
 db.init_app(app)
-migrate = Migrate(app, db)
+with app.app_context():
+    # WAL and the other DB_PROFILE pragmas on every pooled connection
+    db_engine.install(db.engine)
 CORS(app) # Enable CORS for all routes
-scheduler = APScheduler()
-
-def send_discord_notification(webhook_url, invoice, client_name, type='reminder'):
-    try:
-        if type == 'overdue':
-            emoji = "🚨"
-            title = "**OVERDUE INVOICE ALERT**"
-            time_info = f"was due on **{invoice.due_date}**"
-        else:
-            emoji = "📢"
-            title = "**Invoice Reminder**"
-            time_info = f"is due **today** ({invoice.due_date})"
 
-        data = {
-            "content": f"{emoji} {title}\nInvoice **#{invoice.invoice_number}** for **{client_name}** {time_info} and is unpaid.\nTotal Amount: ${invoice.total_amount:,.2f}"
-        }
-        requests.post(webhook_url, json=data)
-    except Exception as e:
-        print(f"Failed to send Discord notification: {e}")
+# Rendered PDFs keyed by content hash, so unchanged invoices skip ReportLab
+pdf_cache = PDFRenderCache(max_bytes=int(os.environ.get('PDF_CACHE_MAX_MB', '64')) * 1024 * 1024)
+# Saved invoices are rendered into pdf_cache in the background
+if not IS_POOL_WORKER:
+    render_queue.init_app(app, pdf_cache)
+# Job state and results, and import progress, are kept as files next to the
+# database so every gunicorn worker answers polls for them
+data_dir = os.path.dirname(get_db_path())
+# Asynchronous render jobs, polled through /api/pdf-jobs/<id>
+pdf_job_registry = pdf_jobs.registry_from_env(cache=pdf_cache, store_dir=os.path.join(data_dir, 'pdf_jobs'))
+# Row counts of the running (or last) data import
+import_progress = data_import.ImportProgress(path=os.path.join(data_dir, 'import_progress.json'))
+# Webhook notifications are queued in the outbox and delivered in the
+# background; the dispatcher is created by start_background_services()
+notification_dispatcher = None
+# Created by start_background_services()
+scheduler = None
+scheduler_leader = None
 
 def check_overdue_invoices():
+    # The lease may have moved on since the scheduler was resumed
+    if scheduler_leader and not scheduler_leader.is_leader:
+        return
     with app.app_context():
         # Get Webhook URL
         settings = db_manager.get_settings()
@@ -80,51 +110,79 @@ def check_overdue_invoices():
         
         today = datetime.date.today()
         
-        # 1. MARK AND NOTIFY NEWLY OVERDUE INVOICES (due_date < today)
-        newly_overdue = Invoice.query.filter(
-            Invoice.due_date < today,
-            Invoice.status != 'Paid',
-            Invoice.status != 'Overdue'
-        ).all()
-        
-        for invoice in newly_overdue:
-            invoice.status = 'Overdue'
-            if webhook_url:
-                client_name = invoice.client.name if invoice.client else "Unknown Client"
-                send_discord_notification(webhook_url, invoice, client_name, type='overdue')
-        
-        # 2. SEND REMINDERS FOR INVOICES DUE TODAY
-        due_today = Invoice.query.filter(
-            Invoice.due_date == today,
-            Invoice.status != 'Paid'
-        ).all()
+        # 1. MARK NEWLY OVERDUE INVOICES (due_date < today) in one UPDATE,
+        #    and read those plus the invoices due today with their clients
+        newly_overdue, due_today = db_manager.sweep_overdue_invoices(today, commit=False)
         
-        for invoice in due_today:
-            if webhook_url:
-                client_name = invoice.client.name if invoice.client else "Unknown Client"
-                send_discord_notification(webhook_url, invoice, client_name, type='reminder')
+        # 2. QUEUE NOTIFICATIONS in the same transaction: overdue alerts, then
+        #    reminders for invoices due today. The dispatcher sends them.
+        if webhook_url:
+            messages = notifier.build_messages(newly_overdue, due_today, digest=notifier.digest_enabled())
+            db_manager.add_notifications(webhook_url, messages)
+        db.session.commit()
+        if webhook_url and notification_dispatcher:
+            notification_dispatcher.wake()
         
         if newly_overdue:
-            db.session.commit()
             print(f"Checked invoices: {len(newly_overdue)} marked as Overdue.")
 
-# Initialize Scheduler
-scheduler.init_app(app)
-# Run check daily at 9:00 AM
-scheduler.add_job(id='invoice_check', func=check_overdue_invoices, trigger='cron', hour=9)
-scheduler.start()
+def resume_scheduler():
+    if scheduler and scheduler.running:
+        scheduler.resume()
+
+def pause_scheduler():
+    if scheduler and scheduler.running:
+        scheduler.pause()
 
 def open_browser():
     webbrowser.open_new("http://127.0.0.1:5000")
 
-# Ensure DB creation and default settings
-with app.app_context():
-    # Auto-migrate logic
+if getattr(sys, 'frozen', False):
+    # In frozen app, migrations are bundled in sys._MEIPASS/migrations
+    migration_dir = os.path.join(sys._MEIPASS, 'migrations')
+else:
+    migration_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Flask-Migrate (and with it Alembic) is only loaded when there is something
+# to migrate, or for the `flask db` commands
+migrate = None
+
+def load_migrate():
+    global migrate
+    import flask_migrate
+    if migrate is None:
+        # Also registers the `flask db` commands
+        migrate = flask_migrate.Migrate(app, db)
+    return flask_migrate
+
+def running_flask_db_command():
+    # Flask looks `flask db ...` up on app.cli once the app is imported
+    parts = os.path.normpath(sys.argv[0]).split(os.sep) if sys.argv and sys.argv[0] else []
+    is_flask = bool(parts) and (parts[-1] in ('flask', 'flask.exe') or parts[-2:] == ['flask', '__main__.py'])
+    return is_flask and 'db' in sys.argv[1:]
+
+if running_flask_db_command():
+    load_migrate()
+
+def stamp_created_schema(head):
+    """After the db.create_all() fallback: stamp head if the tables now match
+    the models, so the next start skips migrations instead of failing the
+    same way again. Returns whether it stamped."""
+    if not head or not schema_version.matches_models(db.engine, db.metadata):
+        return False
+    load_migrate().stamp(directory=migration_dir, revision=head)
+    return True
+
+# Ensure DB creation and default settings. Server workers start together;
+# the lock lets one of them migrate while the others wait.
+with app.app_context(), db_engine.file_lock(get_db_path() + '.lock'):
+    # head.txt is written at build time (tools/schema_head.py); without it
+    # the migration scripts are scanned
+    head = schema_version.head_revision(migration_dir) if os.path.exists(migration_dir) else None
+    if head and schema_version.current_revision(db.engine) == head:
+        print(f"Database schema is up to date ({head}).")
     # Auto-migrate logic
-    if getattr(sys, 'frozen', False):
-        # In frozen app, migrations are bundled in sys._MEIPASS/migrations
-        migration_dir = os.path.join(sys._MEIPASS, 'migrations')
-        
+    elif getattr(sys, 'frozen', False):
         # Setup logging to catch errors
         log_path = os.path.join(os.path.dirname(sys.executable), 'startup_log.txt')
         
@@ -133,7 +191,7 @@ with app.app_context():
                 f.write(f"Starting migration from {migration_dir}\n")
                 f.write(f"Contents of migration dir: {os.listdir(migration_dir) if os.path.exists(migration_dir) else 'DIR NOT FOUND'}\n")
             
-            upgrade(directory=migration_dir)
+            load_migrate().upgrade(directory=migration_dir)
             
             with open(log_path, 'a') as f:
                 f.write("Migration successful\n")
@@ -149,30 +207,112 @@ with app.app_context():
             # This is a safety net for fresh installs.
             try:
                 db.create_all()
+                stamped = stamp_created_schema(head)
                 with open(log_path, 'a') as f:
-                    f.write("Fallback db.create_all() executed\n")
+                    f.write(f"Fallback db.create_all() executed{f', stamped {head}' if stamped else ''}\n")
             except Exception as e2:
                  with open(log_path, 'a') as f:
                     f.write(f"Fallback create_all failed: {e2}\n")
     else:
         # In non-frozen environments (dev or Docker), apply migrations if they exist
-        migration_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
         if os.path.exists(migration_dir):
             try:
-                upgrade(directory=migration_dir)
+                load_migrate().upgrade(directory=migration_dir)
                 print("Database migrated successfully.")
             except Exception as e:
-                print(f"Migration failed: {e}. Attempting db.create_all() as fallback.")
                 db.create_all()
+                stamped = stamp_created_schema(head)
+                print(f"Migration failed: {e}. Tables created with db.create_all() as fallback"
+                      f"{f', stamped {head}' if stamped else ''}.")
         else:
             db.create_all()
             print("Database tables created using db.create_all().")
 
     db_manager.init_db()
 
+_background_lock = threading.Lock()
+_background_started = False
+
+def start_background_services():
+    """Start the scheduler, the notification dispatcher and the scheduler
+    leader election. Called once the server is up (see __main__ below,
+    post_worker_init in gunicorn.conf.py and start_on_first_request) rather
+    than at import, so they do not delay the first response."""
+    global _background_started, notification_dispatcher, scheduler, scheduler_leader
+    if IS_POOL_WORKER:
+        return
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+
+        notification_dispatcher = notifier.dispatcher_from_env(app)
+        notification_dispatcher.start()
+
+        from flask_apscheduler import APScheduler
+        scheduler = APScheduler()
+        scheduler.init_app(app)
+        # Run check daily at 9:00 AM. A leader elected after 9:00 (the
+        # previous one died) still runs it within the grace time.
+        scheduler.add_job(id='invoice_check', func=check_overdue_invoices, trigger='cron', hour=9,
+                          misfire_grace_time=3600, coalesce=True)
+        # Every server process starts the scheduler paused; only the elected
+        # leader resumes it, so running several workers does not run each
+        # job several times
+        scheduler.start(paused=True)
+
+        lease_ttl = int(os.environ.get('SCHEDULER_LEASE_TTL', '30'))
+        scheduler_leader = leader.LeaderElection(
+            app, 'scheduler', ttl=lease_ttl, renew_every=max(1, lease_ttl // 3),
+            on_elected=resume_scheduler, on_demoted=pause_scheduler,
+        )
+        scheduler_leader.start()
+
+@app.before_request
+def start_on_first_request():
+    # For servers that give no hook of their own (flask run, other WSGI
+    # servers): start in the background, the request does not wait
+    if not _background_started and not IS_POOL_WORKER:
+        threading.Thread(target=start_background_services, name='background-start', daemon=True).start()
+
+def invoice_summary(inv):
+    # inv is a db_manager._invoice_row tuple
+    return {
+        'id': inv[0],
+        'invoice_number': inv[1],
+        'client_name': inv[2],
+        'date_issued': inv[3].isoformat() if inv[3] else None,
+        'status': inv[4],
+        'total_amount': inv[5],
+        'vat_exempt': inv[6],
+        'vat_exempt_reason': inv[7],
+        'client_id': inv[8]
+    }
+
 @app.route('/api/invoices')
 def get_invoices():
     status_filter = request.args.get('status', 'All')
+    
+    # ?limit= and/or ?cursor= switch to keyset pages: {items, next_cursor[, total]}
+    if pagination.wants_page(request.args):
+        try:
+            limit = pagination.parse_limit(request.args.get('limit'))
+            after = None
+            if request.args.get('cursor'):
+                date_str, last_id = pagination.decode_cursor(request.args['cursor'])
+                after = (datetime.date.fromisoformat(date_str) if date_str else None, int(last_id))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        
+        rows, has_more = db_manager.get_invoices_page(status=status_filter, limit=limit, after=after)
+        page = {
+            'items': [invoice_summary(inv) for inv in rows],
+            'next_cursor': pagination.encode_cursor([rows[-1][3], rows[-1][0]]) if has_more else None
+        }
+        if request.args.get('total') == '1':
+            page['total'] = db_manager.count_invoices(status=status_filter)
+        return jsonify(page)
+    
     invoices = db_manager.get_invoices(status=status_filter)
     
     # Serialize invoices (assuming db_manager returns objects or dicts)
@@ -182,22 +322,21 @@ def get_invoices():
     # For now, assuming db_manager.get_invoices returns a list of Invoice objects.
     # We need to construct a list of dicts.
     
-    invoices_data = []
-    for inv in invoices:
-        invoices_data.append({
-            'id': inv[0],
-            'invoice_number': inv[1],
-            'client_name': inv[2],
-            'date_issued': inv[3].isoformat() if inv[3] else None,
-            'status': inv[4],
-            'total_amount': inv[5],
-            'vat_exempt': inv[6],
-            'vat_exempt_reason': inv[7],
-            'client_id': inv[8]
-        })
+    invoices_data = [invoice_summary(inv) for inv in invoices]
         
     return jsonify(invoices_data)
 
+def client_summary(c):
+    # c is a db_manager._client_row tuple
+    return {
+        'id': c[0],
+        'name': c[1],
+        'address': c[2],
+        'email': c[3],
+        'phone': c[4],
+        'category': c[5]
+    }
+
 @app.route('/api/clients', methods=['GET', 'POST'])
 def clients():
     if request.method == 'POST':
@@ -209,6 +348,26 @@ def clients():
         category = data.get('category')
         db_manager.add_client(name, address, email, phone, category)
         return jsonify({'message': 'Client added successfully'}), 201
+    
+    # Same paging contract as /api/invoices, ordered by name
+    if pagination.wants_page(request.args):
+        try:
+            limit = pagination.parse_limit(request.args.get('limit'))
+            after = None
+            if request.args.get('cursor'):
+                name, last_id = pagination.decode_cursor(request.args['cursor'])
+                after = (str(name), int(last_id))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        
+        rows, has_more = db_manager.get_clients_page(limit=limit, after=after)
+        page = {
+            'items': [client_summary(c) for c in rows],
+            'next_cursor': pagination.encode_cursor([rows[-1][1], rows[-1][0]]) if has_more else None
+        }
+        if request.args.get('total') == '1':
+            page['total'] = db_manager.count_clients()
+        return jsonify(page)
         
     clients = db_manager.get_clients()
     clients_data = []
@@ -224,14 +383,7 @@ def clients():
     # (id, name, address, email, phone, category, created_at)
     
     for c in clients:
-        clients_data.append({
-            'id': c[0],
-            'name': c[1],
-            'address': c[2],
-            'email': c[3],
-            'phone': c[4],
-            'category': c[5]
-        })
+        clients_data.append(client_summary(c))
             
     return jsonify(clients_data)
 
@@ -326,7 +478,7 @@ def settings():
         return jsonify({'message': 'Settings updated successfully'})
 
     current_settings = db_manager.get_settings()
-    return jsonify(current_settings)
+    return jsonify(dict(current_settings))
 
 @app.route('/api/settings/test-discord', methods=['POST'])
 def test_discord_webhook():
@@ -339,7 +491,7 @@ def test_discord_webhook():
         discord_data = {
             "content": "✅ **Test Notification**\nThis is a test message from Invoice Generator."
         }
-        resp = requests.post(webhook_url, json=discord_data)
+        resp = notifier.post(webhook_url, discord_data["content"])
         if resp.status_code == 204 or resp.status_code == 200:
             return jsonify({"message": "Test message sent successfully!"})
         else:
@@ -349,18 +501,20 @@ def test_discord_webhook():
 
 @app.route('/settings/export')
 def export_data():
-    data = db_manager.export_data()
-    json_str = json.dumps(data, indent=4)
-    mem = io.BytesIO()
-    mem.write(json_str.encode('utf-8'))
-    mem.seek(0)
+    # Rows are read and written in batches, so memory stays flat however big the database is
+    if request.args.get('format') == 'ndjson':
+        chunks = data_export.stream_ndjson()
+        filename = f"invoice_data_{datetime.date.today()}.ndjson"
+        mimetype = 'application/x-ndjson'
+    else:
+        chunks = data_export.stream_json()
+        filename = f"invoice_data_{datetime.date.today()}.json"
+        mimetype = 'application/json'
     
-    filename = f"invoice_data_{datetime.date.today()}.json"
-    return send_file(
-        mem, 
-        as_attachment=True, 
-        download_name=filename,
-        mimetype='application/json'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
     )
 
 @app.route('/api/settings/import', methods=['POST'])
@@ -373,18 +527,42 @@ def import_data():
         return jsonify({"error": "No file selected"}), 400
         
     if file:
+        # mode=merge upserts into the existing data instead of replacing it;
+        # delete_missing=1 then also removes rows absent from the file
+        mode = request.values.get('mode', 'replace')
+        if mode not in ('replace', 'merge'):
+            return jsonify({"error": "mode must be 'replace' or 'merge'"}), 400
+        delete_missing = request.values.get('delete_missing') in ('1', 'true')
+        
+        # The upload is parsed while rows are inserted, never loaded whole.
+        # NDJSON exports are recognised by extension.
+        if file.filename.lower().endswith(('.ndjson', '.jsonl')):
+            rows = data_import.iter_ndjson_rows(file.stream)
+        else:
+            rows = data_import.iter_json_rows(file.stream)
+        
+        import_progress.start()
         try:
-            data = json.load(file)
-            success, message = db_manager.import_data(data)
-            if success:
-                return jsonify({"message": "Data imported successfully"})
-            else:
-                return jsonify({"error": f"Error importing data: {message}"}), 500
-        except json.JSONDecodeError:
-            return jsonify({"error": "Invalid JSON file"}), 400
+            success, message, summary = db_manager.import_rows(
+                rows, progress=import_progress.update, mode=mode, delete_missing=delete_missing
+            )
+        except data_import.ImportFormatError as e:
+            import_progress.finish(False, str(e))
+            return jsonify({"error": str(e)}), 400
+        import_progress.finish(success, message)
+        
+        if success:
+            return jsonify({"message": message, "summary": summary})
+        else:
+            return jsonify({"error": f"Error importing data: {message}"}), 500
             
     return jsonify({"error": "Unknown error"}), 500
 
+@app.route('/api/settings/import/progress')
+def import_data_progress():
+    # Polled while an import request is running
+    return jsonify(import_progress.to_dict())
+
 @app.route('/invoices/<invoice_number>/pdf')
 def download_pdf(invoice_number):
     invoice_data = db_manager.get_invoice_details(invoice_number)
@@ -393,24 +571,126 @@ def download_pdf(invoice_number):
     
     settings = db_manager.get_settings()
     
-    # Create directory structure: invoices/ClientName/
-    client_name = invoice_data['client']['name']
-    # Sanitize client name for folder safely
-    safe_client_name = "".join([c for c in client_name if c.isalpha() or c.isdigit() or c==' ']).strip()
+    # Serve straight from memory if nothing affecting the output has changed,
+    # then from the render store shared with the other workers
+    key = render_key(invoice_data, settings)
+    pdf_bytes = pdf_cache.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = pdf_store.load_render(key)
+        if pdf_bytes is not None:
+            pdf_cache.put(key, pdf_bytes)
+    if pdf_bytes is None:
+        from pdf_builder import InvoicePDF
+        pdf_bytes = InvoicePDF(invoice_data, settings).generate()
+        pdf_cache.put(key, pdf_bytes)
+        pdf_store.store_render(key, pdf_bytes)
+        # Keep a copy under data/invoices/<ClientName>/ without blocking the response
+        pdf_store.archive_async(invoice_data['client']['name'], invoice_number, pdf_bytes)
+    
+    return send_file(
+        io.BytesIO(pdf_bytes),
+        as_attachment=True,
+        download_name=f"{invoice_number}.pdf",
+        mimetype='application/pdf'
+    )
+
+@app.route('/clients/<int:client_id>/statement/pdf')
+def download_statement(client_id):
+    status_filter = request.args.get('status', 'Open')
+    client, invoices = db_manager.get_client_statement(client_id, status=status_filter)
+    if not client:
+        return "Client not found", 404
+    if not invoices:
+        return "No invoices to include in the statement", 404
+    
+    from statement_builder import ClientStatementPDF
+    pdf_bytes = ClientStatementPDF(client, invoices, db_manager.get_settings()).generate()
+    return send_file(
+        io.BytesIO(pdf_bytes),
+        as_attachment=True,
+        download_name=f"Statement_{pdf_store.safe_client_name(client['name'])}_{datetime.date.today()}.pdf",
+        mimetype='application/pdf'
+    )
+
+@app.route('/api/invoices/<invoice_number>/pdf-jobs', methods=['POST'])
+def create_pdf_job(invoice_number):
+    invoice_data = db_manager.get_invoice_details(invoice_number)
+    if not invoice_data:
+        return jsonify({"error": "Invoice not found"}), 404
+    
+    settings = db_manager.get_settings()
+    try:
+        job = pdf_job_registry.submit(invoice_data, settings, cache_key=render_key(invoice_data, settings))
+    except pdf_jobs.RegistryFull as e:
+        return jsonify({"error": str(e)}), 503
+    
+    data = job.to_dict()
+    data['status_url'] = f"/api/pdf-jobs/{job.id}"
+    return jsonify(data), 202
+
+@app.route('/api/pdf-jobs/<job_id>')
+def get_pdf_job(job_id):
+    job = pdf_job_registry.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/pdf-jobs/<job_id>/download')
+def download_pdf_job(job_id):
+    job = pdf_job_registry.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found or expired"}), 404
+    if job.status != pdf_jobs.DONE:
+        return jsonify({"error": f"Job is {job.to_dict()['status']}"}), 409
     
-    # Use absolute path for invoices directory
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    folder_path = os.path.join(base_dir, "data", "invoices", safe_client_name)
-    os.makedirs(folder_path, exist_ok=True)
+    return send_file(
+        io.BytesIO(job.pdf),
+        as_attachment=True,
+        download_name=f"{job.invoice_number}.pdf",
+        mimetype='application/pdf'
+    )
+
+@app.route('/api/invoices/pdf-export')
+def export_invoice_pdfs():
+    status_filter = request.args.get('status', 'All')
+    client_id = request.args.get('client_id', type=int)
+    month = request.args.get('month') # YYYY-MM
     
-    filename = f"{invoice_number}.pdf"
-    full_path = os.path.join(folder_path, filename)
+    date_from = date_to = None
+    if month:
+        try:
+            date_from, date_to = bulk_export.month_range(month)
+        except ValueError:
+            return jsonify({"error": "month must be in YYYY-MM format"}), 400
     
-    # Generate
-    pdf = InvoicePDF(invoice_data, settings)
-    pdf.generate(full_path)
+    invoice_numbers = db_manager.get_invoice_numbers(
+        status=status_filter, client_id=client_id, date_from=date_from, date_to=date_to
+    )
+    if not invoice_numbers:
+        return jsonify({"error": "No invoices match the filter"}), 404
     
-    return send_file(full_path, as_attachment=True)
+    settings = db_manager.get_settings()
+    filename = f"invoices_{month or datetime.date.today()}.zip"
+    return Response(
+        stream_with_context(bulk_export.stream_invoice_zip(invoice_numbers, settings)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@app.route('/api/pdf-cache')
+def pdf_cache_stats():
+    stats = pdf_cache.stats()
+    stats['prerender_pending'] = render_queue.pending_count()
+    return jsonify(stats)
+
+@app.route('/api/notifications/stats')
+def notification_stats():
+    return jsonify(db_manager.notification_counts())
+
+@app.route('/api/pdf-fonts')
+def pdf_fonts():
+    import font_registry
+    return jsonify(font_registry.resolved_fonts())
 
 @app.route('/api/invoices/<invoice_number>/status', methods=['POST'])
 def update_status(invoice_number):
@@ -492,8 +772,14 @@ def manage_invoice(invoice_id):
         
     return jsonify(invoice)
 
+def format_invoice_number(client_name, client_id, number, year):
+    # Format: Prefix-ClientID-00N-YYYY, prefix = first 3 letters uppercased
+    # e.g., ENV-2-001-2026
+    return f"{client_name[:3].upper()}-{client_id}-{number:03d}-{year}"
+
 @app.route('/api/next-invoice-number')
 def next_invoice_number():
+    """Preview of the next number; POST /api/invoice-numbers/reserve claims it."""
     client_id = request.args.get('client_id')
     if not client_id:
         return {"error": "Missing client_id"}, 400
@@ -502,21 +788,34 @@ def next_invoice_number():
     if not client:
         return {"error": "Client not found"}, 404
         
-    client_name = client[1]
-    # Extract first 3 letters, uppercase
-    prefix = client_name[:3].upper()
-    
     current_year = datetime.date.today().year
+    next_num = db_manager.peek_invoice_number(client[0], current_year)
     
-    # Get count for THIS year
-    count = db_manager.get_client_invoice_count(client_id, year=current_year)
-    next_num = count + 1
+    return {"invoice_number": format_invoice_number(client[1], client[0], next_num, current_year)}
+
+@app.route('/api/invoice-numbers/reserve', methods=['POST'])
+def reserve_invoice_number():
+    data = request.json or {}
+    client = db_manager.get_client(data.get('client_id')) if data.get('client_id') else None
+    if not client:
+        return {"error": "Client not found"}, 404
     
-    # Format: Prefix-ClientID-00N-YYYY
-    # e.g., ENV-2-001-2026
-    invoice_number = f"{prefix}-{client_id}-{next_num:03d}-{current_year}"
+    current_year = datetime.date.today().year
+    number = db_manager.reserve_invoice_number(client[0], current_year)
+    return {"invoice_number": format_invoice_number(client[1], client[0], number, current_year)}
+
+@app.route('/api/invoice-numbers/release', methods=['POST'])
+def release_invoice_number():
+    data = request.json or {}
+    if not data.get('client_id') or not isinstance(data.get('invoice_number'), str) or not data['invoice_number']:
+        return {"error": "Missing client_id or invoice_number"}, 400
+    
+    client = db_manager.get_client(data['client_id'])
+    if not client:
+        return {"error": "Client not found"}, 404
     
-    return {"invoice_number": invoice_number}
+    released = db_manager.release_invoice_number(client[0], data['invoice_number'])
+    return {"released": released}
 
 @app.route('/shutdown', methods=['POST'])
 def shutdown():
@@ -548,5 +847,7 @@ if __name__ == '__main__':
     # Only open browser automatically if frozen (executable) or if desired in dev
     if getattr(sys, 'frozen', False):
         Timer(1.5, open_browser).start()
+    # Scheduler and friends once the server is listening
+    Timer(0.5, start_background_services).start()
     
     app.run(debug=False, port=5000)
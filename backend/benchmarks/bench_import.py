@@ -0,0 +1,151 @@
+"""Backup import time and peak memory: chunked pipeline vs the previous importer.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_import [--items 200000] [--chunk-size 5000] [--skip-legacy]
+
+Each run imports the same JSON backup into a fresh SQLite file. The legacy
+importer (json.load, one ORM object per row) is reproduced here so the
+comparison keeps working after db_manager changes. The "merge" row times a
+merge import of the backup into a database that already contains it (all
+rows unchanged).
+"""
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from flask import Flask
+
+import data_import
+import db_manager
+from models import db, Client, Invoice, InvoiceItem, Settings
+from benchmarks.synthetic import make_settings
+
+
+def write_backup(path, n_items, items_per_invoice=10, invoices_per_client=50):
+    n_invoices = max(1, n_items // items_per_invoice)
+    n_clients = max(1, n_invoices // invoices_per_client)
+    day = datetime.date(2026, 1, 1)
+    data = {
+        "clients": [
+            {"id": c, "name": f"Client {c}", "address": "Street 1\nCity", "email": f"c{c}@example.com",
+             "phone": "+1 234", "category": "Services", "created_at": "2026-01-01T09:00:00"}
+            for c in range(1, n_clients + 1)
+        ],
+        "invoices": [
+            {"id": i, "client_id": i % n_clients + 1, "invoice_number": f"INV-{i:07d}",
+             "date_issued": (day + datetime.timedelta(days=i % 365)).isoformat(), "due_date": None,
+             "status": "Paid", "total_amount": 100.0, "vat_exempt": False, "vat_exempt_reason": None}
+            for i in range(1, n_invoices + 1)
+        ],
+        "invoice_items": [
+            {"id": k, "invoice_id": k % n_invoices + 1, "description": f"Consulting work, item {k}",
+             "quantity": 2.0, "rate": 5.0, "amount": 10.0}
+            for k in range(1, n_items + 1)
+        ],
+        "settings": [{"key": k, "value": v} for k, v in make_settings().items()],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+
+
+def legacy_import(path):
+    """The importer as it was before the chunked pipeline."""
+    with open(path, 'rb') as f:
+        data = json.load(f)
+    InvoiceItem.query.delete()
+    Invoice.query.delete()
+    Client.query.delete()
+    Settings.query.delete()
+    for s_data in data.get("settings", []):
+        db.session.add(Settings(key=s_data["key"], value=s_data["value"]))
+    for c_data in data.get("clients", []):
+        created_at = datetime.datetime.fromisoformat(c_data["created_at"]) if c_data.get("created_at") else None
+        db.session.add(Client(id=c_data["id"], name=c_data["name"], address=c_data["address"], email=c_data["email"],
+                              phone=c_data["phone"], category=c_data["category"], created_at=created_at))
+    for i_data in data.get("invoices", []):
+        date_issued = datetime.datetime.fromisoformat(i_data["date_issued"]).date() if i_data.get("date_issued") else None
+        due_date = datetime.datetime.fromisoformat(i_data["due_date"]).date() if i_data.get("due_date") else None
+        db.session.add(Invoice(id=i_data["id"], client_id=i_data["client_id"], invoice_number=i_data["invoice_number"],
+                               date_issued=date_issued, due_date=due_date, status=i_data["status"],
+                               total_amount=i_data["total_amount"], vat_exempt=i_data.get("vat_exempt", False),
+                               vat_exempt_reason=i_data.get("vat_exempt_reason")))
+    for item_data in data.get("invoice_items", []):
+        db.session.add(InvoiceItem(id=item_data["id"], invoice_id=item_data["invoice_id"],
+                                   description=item_data["description"], quantity=item_data["quantity"],
+                                   rate=item_data["rate"], amount=item_data["amount"]))
+    db.session.commit()
+    return True, "Data imported successfully."
+
+
+def chunked_import(path, chunk_size, mode='replace'):
+    with open(path, 'rb') as f:
+        success, message, _ = db_manager.import_rows(data_import.iter_json_rows(f), chunk_size=chunk_size, mode=mode)
+    return success, message
+
+
+def unchanged_merge(path, chunk_size):
+    # Merge the backup into a database that already holds it: every row is
+    # compared and none is written. Only the merge itself is measured.
+    chunked_import(path, chunk_size)
+    start = time.perf_counter()
+    success, message = chunked_import(path, chunk_size, mode='merge')
+    return success, message, time.perf_counter() - start
+
+
+def run(label, importer, backup, workdir, trace):
+    # Fresh database per run so neither importer pays for the other's data
+    db_path = os.path.join(workdir, f"{label}-{int(trace)}.db")
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        success, message, *measured = importer(backup)
+        elapsed = measured[0] if measured else time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        if trace:
+            tracemalloc.stop()
+        rows = db.session.query(InvoiceItem).count()
+        db.session.remove()
+        db.engine.dispose()
+    if not success:
+        raise SystemExit(f"{label} import failed: {message}")
+    return elapsed, peak, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=db_manager.IMPORT_CHUNK_SIZE)
+    parser.add_argument('--skip-legacy', action='store_true', help="skip the slow, memory hungry legacy importer")
+    args = parser.parse_args()
+
+    importers = [
+        ('chunked', lambda path: chunked_import(path, args.chunk_size)),
+        ('merge', lambda path: unchanged_merge(path, args.chunk_size)),
+    ]
+    if not args.skip_legacy:
+        importers.append(('legacy', legacy_import))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        backup = os.path.join(workdir, 'backup.json')
+        write_backup(backup, args.items)
+        print(f"backup: {args.items} items, {os.path.getsize(backup) / 2**20:.1f} MiB")
+        print(f"{'importer':>10}{'seconds':>10}{'peak MiB':>10}{'items':>10}")
+        for label, importer in importers:
+            # Timed and traced separately: tracemalloc slows the import down
+            elapsed, _, rows = run(label, importer, backup, workdir, trace=False)
+            _, peak, _ = run(label, importer, backup, workdir, trace=True)
+            print(f"{label:>10}{elapsed:>10.2f}{peak / 2**20:>10.1f}{rows:>10}")
+
+
+if __name__ == '__main__':
+    main()
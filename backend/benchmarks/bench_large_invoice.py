@@ -0,0 +1,61 @@
+"""Render time and peak memory for invoices with many line items.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_large_invoice [--sizes 10 1000 20000] [--compare]
+
+--compare also renders every size with the single-table layout used for
+small invoices, which is slow for the largest sizes.
+"""
+import argparse
+import time
+import tracemalloc
+
+import pdf_builder
+from pdf_builder import InvoicePDF
+from benchmarks.synthetic import make_invoice, make_settings
+
+
+def measure(n_items):
+    invoice = make_invoice(n_items)
+    settings = make_settings()
+    # Timed and traced separately: tracemalloc slows rendering down several times
+    start = time.perf_counter()
+    pdf = InvoicePDF(invoice, settings).generate()
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    InvoicePDF(invoice, settings).generate()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, len(pdf)
+
+
+def report(label, sizes):
+    print(label)
+    print(f"{'items':>8}{'seconds':>10}{'peak MiB':>10}{'PDF KiB':>10}")
+    for n in sizes:
+        elapsed, peak, size = measure(n)
+        print(f"{n:>8}{elapsed:>10.2f}{peak / 2**20:>10.1f}{size / 1024:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 20000])
+    parser.add_argument('--compare', action='store_true')
+    args = parser.parse_args()
+
+    # Warm-up so font discovery is not attributed to the first size
+    measure(1)
+    report(f"paged layout (threshold {pdf_builder.LARGE_INVOICE_THRESHOLD} items)", args.sizes)
+    if args.compare:
+        threshold = pdf_builder.LARGE_INVOICE_THRESHOLD
+        pdf_builder.LARGE_INVOICE_THRESHOLD = float('inf')
+        try:
+            report("single table", args.sizes)
+        finally:
+            pdf_builder.LARGE_INVOICE_THRESHOLD = threshold
+
+
+if __name__ == '__main__':
+    main()
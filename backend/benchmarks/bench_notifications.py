@@ -0,0 +1,98 @@
+"""Webhook delivery against a local stub: serial posts vs the outbox dispatcher.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_notifications [--invoices 200] [--delay 0.1] [--fail-every 7] [--rate-limit 30/1]
+
+The stub (tools/webhook_stub.py) answers after --delay seconds, fails every
+--fail-every-th request with a 500 and answers 429 beyond --rate-limit. The
+"serial" row posts one message per invoice the way the daily check used to:
+no session, no timeout, failures dropped. "outbox" delivers the same
+messages through notifier.Dispatcher, "digest" packs them first.
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import requests
+from flask import Flask
+
+import db_manager
+import notifier
+from models import db
+from tools.webhook_stub import WebhookStub, parse_rate_limit
+
+
+def make_rows(n):
+    due = datetime.date(2026, 6, 1)
+    return [SimpleNamespace(invoice_number=f"INV-{i:05d}", client_name=f"Client {i % 40}",
+                            due_date=due, total_amount=1234.5 + i) for i in range(n)]
+
+
+def serial(app, stub, rows, args):
+    dropped = 0
+    for kind, _, content in notifier.build_messages(rows, []):
+        try:
+            resp = requests.post(stub.url, json={"content": content})
+            if resp.status_code >= 300:
+                dropped += 1
+        except requests.RequestException:
+            dropped += 1
+    return dropped
+
+
+def outbox(app, stub, rows, args, digest=False):
+    with app.app_context():
+        db_manager.add_notifications(stub.url, notifier.build_messages(rows, [], digest=digest))
+        db.session.commit()
+    dispatcher = notifier.Dispatcher(app, concurrency=args.concurrency, backoff_base=0.2, max_attempts=8)
+    while True:
+        dispatcher.drain()
+        with app.app_context():
+            counts = db_manager.notification_counts()
+            due = db_manager.next_notification_due()
+        if not counts.get('pending'):
+            return counts.get('failed', 0)
+        time.sleep(max(0.0, (due - datetime.datetime.utcnow()).total_seconds()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.1, help="stub response time in seconds")
+    parser.add_argument('--fail-every', type=int, default=7)
+    parser.add_argument('--rate-limit', type=parse_rate_limit, default=parse_rate_limit('30/1'))
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    rows = make_rows(args.invoices)
+    modes = [
+        ('serial', serial),
+        ('outbox', outbox),
+        ('digest', lambda app, stub, rows, args: outbox(app, stub, rows, args, digest=True)),
+    ]
+    print(f"{args.invoices} overdue invoices, stub delay {args.delay}s, 500 every {args.fail_every}, "
+          f"rate limit {args.rate_limit}")
+    print(f"{'mode':>8}{'seconds':>10}{'calls':>8}{'429s':>8}{'500s':>8}{'messages':>10}{'lost':>8}{'max conc':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for label, deliver in modes:
+            app = Flask(__name__)
+            app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, label + '.db')}"
+            db.init_app(app)
+            with app.app_context():
+                db.create_all()
+            stub = WebhookStub(delay=args.delay, fail_every=args.fail_every, rate_limit=args.rate_limit).start()
+            start = time.perf_counter()
+            lost = deliver(app, stub, rows, args)
+            elapsed = time.perf_counter() - start
+            stub.stop()
+            counts = stub.counts
+            print(f"{label:>8}{elapsed:>10.2f}{counts['requests']:>8}{counts['rate_limited']:>8}{counts['failed']:>8}"
+                  f"{counts['accepted']:>10}{lost:>8}{stub.max_in_flight:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Daily overdue check at scale: set-based sweep vs the previous ORM loop.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_overdue_sweep [--invoices 500000] [--overdue 0.02 0.2] [--skip-legacy]
+
+Each run seeds a fresh SQLite file (WAL profile, like the app). Most invoices
+are paid; --overdue is the share that is unpaid and past due, i.e. turns
+Overdue in this sweep, and 0.1% are due today. Only the status change and
+the notification reads are timed; no webhooks are called.
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from flask import Flask
+
+import db_engine
+import db_manager
+from models import db, Invoice
+
+TODAY = datetime.date(2026, 6, 1)
+
+
+def legacy_sweep(today):
+    """The check as it was: ORM objects, one status change per row, lazy
+    client loads, a second query for invoices due today."""
+    newly_overdue = Invoice.query.filter(
+        Invoice.due_date < today, Invoice.status != 'Paid', Invoice.status != 'Overdue'
+    ).all()
+    notices = []
+    for invoice in newly_overdue:
+        invoice.status = 'Overdue'
+        notices.append((invoice, invoice.client.name if invoice.client else "Unknown Client"))
+    for invoice in Invoice.query.filter(Invoice.due_date == today, Invoice.status != 'Paid').all():
+        notices.append((invoice, invoice.client.name if invoice.client else "Unknown Client"))
+    db.session.commit()
+    return len(newly_overdue), len(notices) - len(newly_overdue)
+
+
+def set_based_sweep(today):
+    newly_overdue, due_today = db_manager.sweep_overdue_invoices(today)
+    return len(newly_overdue), len(due_today)
+
+
+def seed(n_invoices, overdue_share):
+    n_clients = max(1, n_invoices // 50)
+    every_overdue = max(1, round(1 / overdue_share)) if overdue_share else 0
+    db.session.execute(db.metadata.tables['clients'].insert(), [
+        {"id": c, "name": f"Client {c}", "address": "Street 1\nCity"} for c in range(1, n_clients + 1)
+    ])
+    rows = []
+    for i in range(1, n_invoices + 1):
+        if every_overdue and i % every_overdue == 0:
+            status, due = 'Sent', TODAY - datetime.timedelta(days=i % 60 + 1)
+        elif i % 1000 == 1:
+            status, due = 'Sent', TODAY
+        elif i % 10 == 3:
+            status, due = 'Sent', TODAY + datetime.timedelta(days=i % 30 + 1)
+        else:
+            status, due = 'Paid', TODAY - datetime.timedelta(days=i % 700)
+        rows.append({"id": i, "client_id": i % n_clients + 1, "invoice_number": f"INV-{i:07d}",
+                     "date_issued": due - datetime.timedelta(days=14), "due_date": due,
+                     "status": status, "total_amount": 100.0})
+    db.session.execute(db.metadata.tables['invoices'].insert(), rows)
+    db.session.commit()
+
+
+def run(label, sweep, args, overdue_share, workdir):
+    db_path = os.path.join(workdir, f"{label}-{overdue_share}.db")
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    db.init_app(app)
+    with app.app_context():
+        db_engine.install(db.engine, db_engine.profile_pragmas('wal'))
+        db.create_all()
+        seed(args.invoices, overdue_share)
+        start = time.perf_counter()
+        overdue, due_today = sweep(TODAY)
+        elapsed = time.perf_counter() - start
+        # Running it again finds nothing new to flip
+        again, _ = sweep(TODAY)
+        db.session.remove()
+        db.engine.dispose()
+    if again:
+        raise SystemExit(f"{label}: second sweep flipped {again} invoices again")
+    return elapsed, overdue, due_today
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=500000)
+    parser.add_argument('--overdue', type=float, nargs='+', default=[0.02, 0.2],
+                        help="share of invoices that turn overdue in the sweep")
+    parser.add_argument('--skip-legacy', action='store_true')
+    args = parser.parse_args()
+
+    sweeps = [('set-based', set_based_sweep)]
+    if not args.skip_legacy:
+        sweeps.append(('legacy', legacy_sweep))
+
+    print(f"{args.invoices} invoices")
+    print(f"{'sweep':>10}{'overdue':>10}{'due today':>10}{'seconds':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for share in args.overdue:
+            for label, sweep in sweeps:
+                elapsed, overdue, due_today = run(label, sweep, args, share, workdir)
+                print(f"{label:>10}{overdue:>10}{due_today:>10}{elapsed:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""PDF rendering benchmark over synthetic invoices, with per-stage timings.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pdf [--renders 10] [--json results.json]
+    python -m benchmarks.bench_pdf --baseline results.json [--tolerance 0.2]
+
+With --baseline, exits non-zero when a scenario's median render time is
+more than --tolerance slower than in the baseline file.
+"""
+import argparse
+import json
+import statistics
+import sys
+
+from pdf_builder import InvoicePDF
+from benchmarks.synthetic import make_invoice, make_settings
+
+SCENARIOS = [
+    # (name, line items, VAT exempt, long address)
+    ('1 item', 1, False, False),
+    ('10 items', 10, False, False),
+    ('10 items, VAT exempt', 10, True, False),
+    ('10 items, long address', 10, False, True),
+    ('100 items', 100, False, False),
+    ('500 items', 500, False, False),
+    ('500 items, VAT exempt, long address', 500, True, True),
+]
+
+STAGES = ('styles', 'header', 'items', 'totals', 'build')
+
+
+def run_scenario(n_items, vat_exempt, long_address, renders):
+    invoice = make_invoice(n_items, vat_exempt=vat_exempt, long_address=long_address)
+    settings = make_settings()
+    profiles = []
+    for _ in range(renders):
+        pdf = InvoicePDF(invoice, settings, profile=True)
+        pdf.generate()
+        profiles.append(pdf.last_profile)
+    return {
+        'median_seconds': statistics.median(p['total_seconds'] for p in profiles),
+        'stages': {s: statistics.median(p['stages'][s] for p in profiles) for s in STAGES},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--renders', type=int, default=10)
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--baseline', help="compare against a previous --json file")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Warm-up: font discovery and imports are one-off costs
+    InvoicePDF(make_invoice(1), make_settings()).generate()
+
+    results = {}
+    header = f"{'scenario':<40}{'total ms':>10}" + "".join(f"{s:>9}" for s in STAGES)
+    print(header)
+    for name, n_items, vat_exempt, long_address in SCENARIOS:
+        result = run_scenario(n_items, vat_exempt, long_address, args.renders)
+        results[name] = result
+        print(f"{name:<40}{result['median_seconds'] * 1000:>10.2f}"
+              + "".join(f"{result['stages'][s] * 1000:>9.2f}" for s in STAGES))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before and result['median_seconds'] > before['median_seconds'] * (1 + args.tolerance):
+                regressions.append(f"{name}: {before['median_seconds'] * 1000:.2f} ms -> {result['median_seconds'] * 1000:.2f} ms")
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Dashboard read latency while another connection writes, per DB profile.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_sqlite_concurrency [--invoices 100000] [--readers 8] [--seconds 5]
+
+Each profile gets a fresh SQLite file with the same data. A writer thread
+repeatedly rewrites every invoice total in one transaction and keeps it open
+for a moment, like an import or the overdue sweep; reader threads run the
+dashboard's first-page query meanwhile. With the legacy rollback journal the
+writer's exclusive lock stalls (or fails) the readers; in WAL mode they keep
+reading the last committed snapshot.
+"""
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import db_engine
+from models import db
+
+DASHBOARD_QUERY = text(
+    "SELECT invoices.id, invoices.invoice_number, clients.name, invoices.date_issued, invoices.status, "
+    "invoices.total_amount FROM invoices JOIN clients ON clients.id = invoices.client_id "
+    "ORDER BY invoices.date_issued DESC, invoices.id DESC LIMIT 50"
+)
+
+
+def make_engine(path, profile):
+    engine = create_engine(f'sqlite:///{path}', **db_engine.engine_options())
+    db_engine.install(engine, db_engine.profile_pragmas(profile))
+    return engine
+
+
+def seed(engine, n_invoices):
+    db.metadata.create_all(engine)
+    n_clients = max(1, n_invoices // 50)
+    day = datetime.date(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(db.metadata.tables['clients'].insert(), [
+            {"id": c, "name": f"Client {c}", "address": "Street 1\nCity"} for c in range(1, n_clients + 1)
+        ])
+        conn.execute(db.metadata.tables['invoices'].insert(), [
+            {"id": i, "client_id": i % n_clients + 1, "invoice_number": f"INV-{i:07d}",
+             "date_issued": day + datetime.timedelta(days=i % 365), "status": "Sent", "total_amount": 100.0}
+            for i in range(1, n_invoices + 1)
+        ])
+
+
+def writer(engine, stop, hold, stats):
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE invoices SET total_amount = total_amount + 1"))
+                # Keep the transaction open, like a long import
+                time.sleep(hold)
+            stats['commits'] += 1
+        except OperationalError:
+            stats['write_errors'] += 1
+
+
+def reader(engine, stop, latencies, errors):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(DASHBOARD_QUERY).all()
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            errors.append(time.perf_counter() - start)
+
+
+def run(profile, args, workdir):
+    path = os.path.join(workdir, f"{profile}.db")
+    engine = make_engine(path, profile)
+    seed(engine, args.invoices)
+    with engine.connect() as conn:
+        mode = db_engine.pragma_values(conn, ['journal_mode'])['journal_mode']
+
+    stop = threading.Event()
+    stats = {'commits': 0, 'write_errors': 0}
+    latencies, errors = [], []
+    threads = [threading.Thread(target=writer, args=(engine, stop, args.hold, stats))]
+    threads += [threading.Thread(target=reader, args=(engine, stop, latencies, errors)) for _ in range(args.readers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+    return {
+        'profile': profile, 'journal': mode, 'reads': len(latencies), 'read_errors': len(errors),
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p99_ms': p99 * 1000, 'max_ms': latencies[-1] * 1000 if latencies else 0,
+        'commits': stats['commits'], 'write_errors': stats['write_errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=100000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--hold', type=float, default=0.2, help="seconds each write transaction stays open")
+    parser.add_argument('--profiles', nargs='+', default=['legacy', 'wal'], choices=list(db_engine.PROFILES))
+    args = parser.parse_args()
+
+    columns = ('profile', 'journal', 'reads', 'read_errors', 'p50_ms', 'p99_ms', 'max_ms', 'commits', 'write_errors')
+    print("".join(f"{c:>13}" for c in columns))
+    with tempfile.TemporaryDirectory() as workdir:
+        for profile in args.profiles:
+            row = run(profile, args, workdir)
+            print("".join(f"{row[c]:>13.1f}" if isinstance(row[c], float) else f"{row[c]:>13}" for c in columns))
+
+
+if __name__ == '__main__':
+    main()
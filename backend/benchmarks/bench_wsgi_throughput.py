@@ -0,0 +1,183 @@
+"""HTTP throughput: Flask dev server vs gunicorn (gunicorn.conf.py).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_wsgi_throughput [--clients 32] [--seconds 10] [--workers 4] [--threads 4]
+
+Both servers run the real app as a subprocess against the same seeded
+database (DATABASE_PATH in a temp directory). Client threads, each with
+their own keep-alive session, loop over a dashboard-like mix: the invoice
+and client lists, single invoices, a client's invoices and, one request in
+ten, an invoice PDF (CPU bound, which is where extra processes pay off).
+"""
+import argparse
+import datetime
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from flask import Flask
+
+from models import db
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def prepare_database(env, n_clients, n_invoices, items_per_invoice=10):
+    # Let the app create and migrate the database, then bulk insert the data
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{env['DATABASE_PATH']}"
+    db.init_app(app)
+    day = datetime.date(2026, 1, 1)
+    with app.app_context():
+        tables = db.metadata.tables
+        db.session.execute(tables['clients'].insert(), [
+            {"id": c, "name": f"Client {c}", "address": "Street 1\nCity", "email": f"c{c}@example.com"}
+            for c in range(1, n_clients + 1)
+        ])
+        db.session.execute(tables['invoices'].insert(), [
+            {"id": i, "client_id": i % n_clients + 1, "invoice_number": f"INV-{i:06d}",
+             "date_issued": day + datetime.timedelta(days=i % 300), "due_date": day + datetime.timedelta(days=i % 300 + 14),
+             "status": "Paid" if i % 3 else "Sent", "total_amount": 10.0 * items_per_invoice, "vat_exempt": False}
+            for i in range(1, n_invoices + 1)
+        ])
+        db.session.execute(tables['invoice_items'].insert(), [
+            {"invoice_id": i, "description": f"Consulting, item {k}", "quantity": 1.0, "rate": 10.0, "amount": 10.0}
+            for i in range(1, n_invoices + 1) for k in range(items_per_invoice)
+        ])
+        db.session.commit()
+        db.engine.dispose()
+
+
+def request_mix(n_clients, n_invoices):
+    def pick():
+        roll = random.random()
+        if roll < 0.1:
+            return f"/invoices/INV-{random.randint(1, n_invoices):06d}/pdf"
+        if roll < 0.35:
+            return "/api/invoices?limit=50"
+        if roll < 0.5:
+            return "/api/clients"
+        if roll < 0.75:
+            return f"/api/invoices/{random.randint(1, n_invoices)}"
+        return f"/api/clients/{random.randint(1, n_clients)}/invoices"
+    return pick
+
+
+def wait_ready(base_url, proc, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"server exited with {proc.returncode}")
+        try:
+            if requests.get(base_url + "/api/settings", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("server did not start")
+
+
+def load(base_url, pick, clients, seconds):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def client():
+        session = requests.Session()
+        mine, failed = [], 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                ok = session.get(base_url + pick(), timeout=30).ok
+            except requests.RequestException:
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0]
+
+
+def run_server(label, command, env, args, pick):
+    port = free_port()
+    command = [part.replace('{port}', str(port)) for part in command]
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        wait_ready(base_url, proc)
+        # Warm up imports, fonts and connection pools
+        load(base_url, pick, args.clients, 2)
+        latencies, errors = load(base_url, pick, args.clients, args.seconds)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    latencies.sort()
+    return {
+        'server': label,
+        'req/s': len(latencies) / args.seconds,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32, help="concurrent HTTP clients")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--invoices', type=int, default=2000)
+    args = parser.parse_args()
+    n_clients = max(1, args.invoices // 100)
+
+    servers = [
+        # What the Dockerfile used to run
+        ('flask run', [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', '{port}']),
+        (f'gunicorn {args.workers}x{args.threads}',
+         [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', '127.0.0.1:{port}',
+          '--workers', str(args.workers), '--threads', str(args.threads), 'wsgi:app']),
+    ]
+    print(f"{args.clients} clients, {args.seconds:g}s per server, {args.invoices} invoices, {os.cpu_count()} CPUs")
+    columns = ('server', 'req/s', 'p50_ms', 'p99_ms', 'errors')
+    print("".join(f"{c:>16}" for c in columns))
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, DATABASE_PATH=os.path.join(workdir, 'invoices.db'),
+                   PDF_PRERENDER='0', PDF_ARCHIVE='0', FLASK_ENV='production')
+        prepare_database(env, n_clients, args.invoices)
+        pick = request_mix(n_clients, args.invoices)
+        for label, command in servers:
+            row = run_server(label, command, env, args, pick)
+            print("".join(f"{row[c]:>16.1f}" if isinstance(row[c], float) else f"{row[c]:>16}" for c in columns))
+
+
+if __name__ == '__main__':
+    main()
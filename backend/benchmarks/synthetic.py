@@ -0,0 +1,53 @@
+"""Synthetic invoice and settings data for the benchmarks."""
+import datetime
+
+LONG_ADDRESS = "\n".join([
+    "Building 12, Floor 7, Suite 704 - Business Innovation Park",
+    "1234 Very Long Street Name With Several Qualifiers Avenue",
+    "District of Somewhere Far Away, Postal Box 98765-4321",
+    "City Name, Region Name, Country Name",
+])
+
+
+def make_settings():
+    return {
+        "sender_name": "Jane Doe",
+        "sender_address_line1": "Address Line 1",
+        "sender_address_line2": "City",
+        "sender_address_line3": "Country",
+        "sender_email": "jane@example.com",
+        "sender_phone": "+1 234 567 890",
+        "bank_iban": "LB00 0000 0000 0000 0000 0000 0000",
+        "bank_account_holder": "Jane Doe",
+        "bank_swift": "SWIFTCODE",
+        "vat_percentage": "11",
+        "tax_id": "123456-601",
+        "default_vat_exempt_reason": "under current Lebanese law,\nno VAT for export services",
+        "discord_webhook_url": "",
+    }
+
+
+def make_invoice(n_items=10, vat_exempt=False, long_address=False, number="BEN-1-001-2026"):
+    """Invoice dict shaped like db_manager.get_invoice_details()."""
+    items = []
+    for i in range(n_items):
+        quantity = float(i % 9 + 1)
+        rate = 12.5 + (i % 13)
+        items.append((i + 1, 1, f"Consulting work package {i + 1} - analysis and implementation", quantity, rate, quantity * rate))
+    return {
+        'id': 1,
+        'client': {
+            'name': "Société Générale d'Exemple",
+            'address': LONG_ADDRESS if long_address else "Street 1\nCity",
+            'email': "billing@example.com",
+            'phone': "+33 1 23 45 67 89",
+        },
+        'invoice_number': number,
+        'date_issued': datetime.date(2026, 1, 15),
+        'due_date': datetime.date(2026, 1, 29),
+        'status': 'Draft',
+        'total_amount': sum(i[5] for i in items),
+        'vat_exempt': vat_exempt,
+        'vat_exempt_reason': None,
+        'line_items': items,
+    }
@@ -0,0 +1,89 @@
+import io
+import datetime
+import zipfile
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import db_manager
+import render_pool
+from pdf_store import safe_client_name
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that hands back whatever zipfile wrote since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def month_range(month):
+    """'YYYY-MM' -> (first day, first day of next month)."""
+    start = datetime.datetime.strptime(month, '%Y-%m').date()
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+def stream_invoice_zip(invoice_numbers, settings, pool=None):
+    """Yield a ZIP archive of the given invoices' PDFs chunk by chunk.
+
+    Invoices are loaded and submitted to the render pool lazily, keeping at
+    most two renders per worker in flight, so memory depends on the pool
+    size rather than on how many invoices were selected. Must run inside an
+    app context (use flask.stream_with_context for responses).
+    """
+    pool = pool or render_pool.get_pool()
+    # Plain dict: the read-only settings snapshot cannot be pickled to workers
+    settings = dict(settings)
+    max_in_flight = render_pool.pool_size() * 2
+    pending_numbers = iter(invoice_numbers)
+    in_flight = {}
+    failures = []
+
+    def submit_next():
+        for number in pending_numbers:
+            invoice_data = db_manager.get_invoice_details(number)
+            if invoice_data:
+                future = pool.submit(render_pool.render_invoice_pdf, invoice_data, settings)
+                in_flight[future] = number
+                return True
+        return False
+
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                number = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Bulk export: failed to render {number}: {e}")
+                    failures.append(f"{number}: {e}")
+                else:
+                    # PDFs are already compressed, store them as-is
+                    path = f"{safe_client_name(result['client_name'])}/{result['invoice_number']}.pdf"
+                    archive.writestr(path, result['pdf'])
+                    yield stream.drain()
+                submit_next()
+
+        if failures:
+            archive.writestr("errors.txt", "\n".join(failures) + "\n")
+    # Central directory is written on close
+    yield stream.drain()
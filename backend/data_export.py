@@ -0,0 +1,44 @@
+import json
+
+import db_manager
+
+# Rows per database query, and roughly per chunk written to the response
+EXPORT_BATCH_SIZE = 1000
+
+
+def _batched(rows, batch_size):
+    # Group rows so each yielded chunk covers many of them
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_json(batch_size=EXPORT_BATCH_SIZE):
+    """Yield the export as one JSON document, in the format json.load() and
+    db_manager.import_data() expect: {"clients": [...], "invoices": [...], ...}.
+
+    Only one batch of rows is in memory at a time. Must run inside an app
+    context (stream_with_context in a view).
+    """
+    yield "{"
+    for n, table in enumerate(db_manager.EXPORT_TABLES):
+        yield f'{"," if n else ""}\n    {json.dumps(table)}: ['
+        empty = True
+        for batch in _batched(db_manager.iter_export_table(table, batch_size), batch_size):
+            yield ("" if empty else ",") + ",".join("\n        " + json.dumps(row) for row in batch)
+            empty = False
+        yield "]" if empty else "\n    ]"
+    yield "\n}\n"
+
+
+def stream_ndjson(batch_size=EXPORT_BATCH_SIZE):
+    """Yield the export as newline-delimited JSON, one {"table", "row"} object per line."""
+    for table in db_manager.EXPORT_TABLES:
+        for batch in _batched(db_manager.iter_export_table(table, batch_size), batch_size):
+            yield "".join(json.dumps({"table": table, "row": row}) + "\n" for row in batch)
+
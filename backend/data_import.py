@@ -0,0 +1,201 @@
+import codecs
+import json
+import threading
+import time
+
+from file_utils import write_atomic
+
+# Bytes read from the upload per step of the incremental parser
+READ_SIZE = 64 * 1024
+
+# No single export row comes close; stops a malformed upload from being
+# buffered whole while the parser waits for a value to end
+MAX_VALUE_SIZE = 16 * 1024 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file is not a readable export."""
+
+
+class _JSONRowReader:
+    """Incremental reader for the export document produced by
+    data_export.stream_json() (or older json.dumps(indent=4) backups):
+
+        {"clients": [{...}, ...], "invoices": [...], ...}
+
+    Only the row currently being decoded has to fit in the buffer, so the
+    whole upload is never held in memory.
+    """
+
+    def __init__(self, text_stream):
+        self.stream = text_stream
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        # Drop consumed text and append the next block; False at end of input
+        if self.eof:
+            return False
+        block = self.stream.read(READ_SIZE)
+        if not block:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """Next non-whitespace character, without consuming it ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ImportFormatError(f"Invalid JSON file: expected {' or '.join(repr(c) for c in chars)}")
+        self.pos += 1
+        return char
+
+    def _value(self):
+        # raw_decode does not skip leading whitespace itself
+        if not self._peek():
+            raise ImportFormatError("Invalid JSON file")
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Probably cut off at the end of the buffer; read more and retry
+                if len(self.buffer) - self.pos < MAX_VALUE_SIZE and self._fill():
+                    continue
+                raise ImportFormatError("Invalid JSON file")
+            # A number at the very end of the buffer may continue in the next block
+            if end == len(self.buffer) and not self.eof and not isinstance(value, (dict, list, str)):
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+    def rows(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            if self._peek():
+                raise ImportFormatError("Invalid JSON file: unexpected data after the end")
+            return
+        while True:
+            table = self._value()
+            if not isinstance(table, str):
+                raise ImportFormatError("Invalid JSON file")
+            self._expect(':')
+            if self._peek() != '[':
+                # Not a table; keep the value out of the import like before
+                self._value()
+            else:
+                self.pos += 1
+                if self._peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield table, self._value()
+                        if self._expect(',]') == ']':
+                            break
+            if self._expect(',}') == '}':
+                break
+        # Like json.load, reject anything after the document
+        if self._peek():
+            raise ImportFormatError("Invalid JSON file: unexpected data after the end")
+
+
+def iter_json_rows(binary_stream):
+    """Yield (table, row) from a JSON export file object, reading it in blocks."""
+    # A StreamReader decodes without taking ownership of (or closing) the upload
+    text = codecs.getreader('utf-8-sig')(binary_stream)
+    try:
+        yield from _JSONRowReader(text).rows()
+    except UnicodeDecodeError:
+        raise ImportFormatError("Invalid JSON file: not UTF-8")
+
+
+def iter_ndjson_rows(lines):
+    """Yield (table, row) from NDJSON export lines (str or bytes)."""
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError:
+                raise ImportFormatError(f"Invalid NDJSON export record on line {number}")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            yield record["table"], record["row"]
+        except (ValueError, KeyError, TypeError):
+            raise ImportFormatError(f"Invalid NDJSON export record on line {number}")
+
+
+def iter_dict_rows(data):
+    """Yield (table, row) from an already loaded export dict."""
+    for table, rows in data.items():
+        if isinstance(rows, list):
+            for row in rows:
+                yield table, row
+
+
+class ImportProgress:
+    """Row counts of the import in progress, readable from other requests.
+
+    With path, the state is also written to that file after every change and
+    read back from it, so server workers other than the one running the
+    import report the same progress.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = {'running': False}
+
+    def start(self):
+        with self._lock:
+            self._state = {'running': True, 'started_at': time.time(), 'rows': {}}
+            self._save()
+
+    def update(self, table, count):
+        with self._lock:
+            self._state['rows'][table] = count
+            self._save()
+
+    def finish(self, success, message):
+        with self._lock:
+            self._state.update(running=False, finished_at=time.time(), success=success, message=message)
+            self._save()
+
+    def to_dict(self):
+        if self.path:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        with self._lock:
+            state = dict(self._state)
+            if 'rows' in state:
+                state['rows'] = dict(state['rows'])
+            return state
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            write_atomic(self.path, json.dumps(self._state).encode('utf-8'))
+        except OSError as e:
+            print(f"Could not write import progress: {e}")
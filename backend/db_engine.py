@@ -0,0 +1,101 @@
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError: # Windows: the desktop build runs a single process
+    fcntl = None
+
+# Pragmas run on every new SQLite connection, per profile. "wal" lets the
+# dashboard keep reading while the scheduler or an import writes; "legacy"
+# is SQLite's own defaults (rollback journal, readers blocked by writers).
+PROFILES = {
+    'wal': {
+        'journal_mode': 'WAL',
+        # NORMAL is durable in WAL mode except for the last commits on power
+        # loss; FULL fsyncs on every commit
+        'synchronous': 'NORMAL',
+        # Milliseconds a writer waits for the lock before "database is locked"
+        'busy_timeout': '5000',
+        # Negative values are KiB: 32 MiB page cache per connection
+        'cache_size': '-32000',
+        # Reads go through a 256 MiB memory map instead of read() calls
+        'mmap_size': str(256 * 1024 * 1024),
+        'temp_store': 'MEMORY',
+    },
+    'legacy': {},
+}
+
+DEFAULT_PROFILE = 'wal'
+
+
+def profile_pragmas(name=None):
+    """Pragmas of the named profile (DB_PROFILE by default), with overrides
+    from SQLITE_PRAGMAS, e.g. "cache_size=-64000,mmap_size=0"."""
+    name = name or os.environ.get('DB_PROFILE', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {name!r}, expected one of {', '.join(PROFILES)}")
+    pragmas = dict(PROFILES[name])
+    for override in os.environ.get('SQLITE_PRAGMAS', '').split(','):
+        if override.strip():
+            key, _, value = override.partition('=')
+            pragmas[key.strip()] = value.strip()
+    return pragmas
+
+
+def engine_options():
+    """SQLALCHEMY_ENGINE_OPTIONS for a threaded WSGI server.
+
+    Every request thread checks out its own connection. The pool keeps enough
+    of them open that threads do not wait for each other or reconnect (and
+    re-run the pragmas) on every request.
+    """
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.environ.get('DB_POOL_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', '30')),
+    }
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for key, value in pragmas.items():
+            cursor.execute(f"PRAGMA {key}={value}")
+            # journal_mode answers with the mode in effect
+            cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def install(engine, pragmas=None):
+    """Run the profile pragmas on each connection the engine opens."""
+    pragmas = profile_pragmas() if pragmas is None else pragmas
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+
+def pragma_values(connection, names):
+    """Current values of the given pragmas on a SQLAlchemy connection."""
+    return {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path across processes for the block."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -1,6 +1,21 @@
-from models import db, Client, Invoice, InvoiceItem, Settings
-from sqlalchemy import func, extract
-from datetime import datetime
+from models import db, Client, Invoice, InvoiceItem, Settings, SettingsVersion, InvoiceSequence, Notification, Lease
+from sqlalchemy import func, case, literal_column, tuple_, select, insert, update, delete, bindparam, or_
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import render_queue
+from data_import import ImportFormatError, iter_dict_rows
+from datetime import datetime, date, timedelta
+import hashlib
+from bisect import bisect_left, bisect_right
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+# Inlined rather than bound so SQLite can match ix_invoices_unpaid_due_date,
+# whose WHERE clause is status != 'Paid'
+UNPAID = Invoice.status != literal_column("'Paid'")
 
 # No manually init_db needed, handled by Migrate/App
 def init_db():
@@ -22,18 +37,38 @@ def init_db():
         }
         for k, v in defaults.items():
             db.session.add(Settings(key=k, value=v))
+        _bump_settings_version()
         db.session.commit()
+        invalidate_settings_cache()
 
 def add_client(name, address, email, phone, category):
     client = Client(name=name, address=address, email=email, phone=phone, category=category)
     db.session.add(client)
     db.session.commit()
 
+def _client_row(c):
+    return (c.id, c.name, c.address, c.email, c.phone, c.category, c.created_at)
+
 def get_clients():
     # Return list of tuples to match old behavior: (id, name, address, email, phone, category, created_at)
     clients = Client.query.all()
     # Note: ensure order matches table definition in old db_manager if consumed by index
-    return [(c.id, c.name, c.address, c.email, c.phone, c.category, c.created_at) for c in clients]
+    return [_client_row(c) for c in clients]
+
+def get_clients_page(limit, after=None):
+    """One page of get_clients() rows ordered by name, then id.
+
+    after is the (name, id) of the last client on the previous page.
+    Returns (rows, has_more).
+    """
+    query = Client.query
+    if after is not None:
+        query = query.filter(tuple_(Client.name, Client.id) > tuple_(*after))
+    results = query.order_by(Client.name, Client.id).limit(limit + 1).all()
+    return [_client_row(c) for c in results[:limit]], len(results) > limit
+
+def count_clients():
+    return Client.query.count()
 
 def get_client(client_id):
     c = Client.query.get(client_id)
@@ -56,6 +91,12 @@ def create_invoice(client_id, invoice_number, date_issued, due_date, items, vat_
     db.session.add(invoice)
     db.session.flush() # get ID
     
+    # Reserved numbers are already counted; a number typed in by hand moves
+    # the sequence past it, in the same transaction as the insert
+    parsed = _sequence_number(invoice_number, client_id)
+    if parsed:
+        _advance_sequence(client_id, *parsed)
+    
     for item_data in items:
         item = InvoiceItem(
             invoice_id=invoice.id,
@@ -67,6 +108,7 @@ def create_invoice(client_id, invoice_number, date_issued, due_date, items, vat_
         db.session.add(item)
     
     db.session.commit()
+    render_queue.enqueue(invoice_number)
     return invoice.id
 
 def get_invoices(status=None):
@@ -78,45 +120,159 @@ def get_invoices(status=None):
     results = query.order_by(Invoice.date_issued.desc()).all()
     
     # Map to tuple structure expected by template
-    invoices = []
-    for inv, client in results:
-        invoices.append((
-            inv.id, 
-            inv.invoice_number, 
-            client.name, 
-            inv.date_issued, 
-            inv.status, 
-            inv.total_amount, 
-            inv.vat_exempt,
-            inv.vat_exempt_reason,
-            client.id
-        ))
-    return invoices
+    return [_invoice_row(inv, client) for inv, client in results]
 
-def get_client_invoices(client_id, status=None):
-    query = Invoice.query.filter_by(client_id=client_id)
+def _invoice_row(inv, client):
+    return (
+        inv.id, 
+        inv.invoice_number, 
+        client.name, 
+        inv.date_issued, 
+        inv.status, 
+        inv.total_amount, 
+        inv.vat_exempt,
+        inv.vat_exempt_reason,
+        client.id
+    )
+
+def get_invoices_page(status=None, limit=50, after=None):
+    """One page of get_invoices() rows, newest first (date_issued, then id).
+
+    after is the (date_issued, id) of the last row on the previous page.
+    Invoices without a date sort after all dated ones. Returns (rows, has_more).
+    """
+    def base_query():
+        query = db.session.query(Invoice, Client).join(Client)
+        if status and status != 'All':
+            query = query.filter(Invoice.status == status)
+        return query
+    
+    # Dated and undated invoices are read separately so each part is a plain
+    # range over ix_invoices_date_issued / ix_invoices_status_date_issued
+    results = []
+    if after is None or after[0] is not None:
+        query = base_query().filter(Invoice.date_issued.isnot(None))
+        if after is not None:
+            query = query.filter(tuple_(Invoice.date_issued, Invoice.id) < tuple_(*after))
+        results = query.order_by(Invoice.date_issued.desc(), Invoice.id.desc()).limit(limit + 1).all()
+    if len(results) <= limit:
+        query = base_query().filter(Invoice.date_issued.is_(None))
+        if after is not None and after[0] is None:
+            query = query.filter(Invoice.id < after[1])
+        results += query.order_by(Invoice.id.desc()).limit(limit + 1 - len(results)).all()
+    
+    return [_invoice_row(inv, client) for inv, client in results[:limit]], len(results) > limit
+
+def count_invoices(status=None):
+    query = Invoice.query
+    if status and status != 'All':
+        query = query.filter(Invoice.status == status)
+    return query.count()
+
+def get_invoice_numbers(status=None, client_id=None, date_from=None, date_to=None):
+    """Invoice numbers matching the filters, oldest first. date_to is exclusive."""
+    query = db.session.query(Invoice.invoice_number)
+    if status and status != 'All':
+        query = query.filter(Invoice.status == status)
+    if client_id:
+        query = query.filter(Invoice.client_id == client_id)
+    if date_from:
+        query = query.filter(Invoice.date_issued >= date_from)
+    if date_to:
+        query = query.filter(Invoice.date_issued < date_to)
+    
+    results = query.order_by(Invoice.date_issued, Invoice.id).all()
+    return [r[0] for r in results]
+
+def get_invoice_numbers_by_render_priority(limit=None):
+    """Invoice numbers in the order their PDFs are most likely to be needed:
+    unpaid before paid, then newest first."""
+    unpaid_first = case((Invoice.status == 'Paid', 1), else_=0)
+    query = db.session.query(Invoice.invoice_number).order_by(
+        unpaid_first, Invoice.date_issued.desc(), Invoice.id.desc()
+    )
+    if limit:
+        query = query.limit(limit)
+    return [r[0] for r in query.all()]
+
+def get_client_invoices(client_id, status=None, unpaid=False):
+    query = db.session.query(Invoice, Client.name).join(Client).filter(Invoice.client_id == client_id)
     if status and status != 'All':
-        query = query.filter_by(status=status)
+        query = query.filter(Invoice.status == status)
+    if unpaid:
+        query = query.filter(UNPAID)
     
     results = query.order_by(Invoice.date_issued.desc()).all()
     
     invoices = []
-    for inv in results:
+    for inv, client_name in results:
         invoices.append((
             inv.id, 
             inv.invoice_number, 
-            inv.client.name, 
+            client_name, 
             inv.date_issued, 
             inv.status, 
             inv.total_amount, 
             inv.vat_exempt,
             inv.vat_exempt_reason,
-            inv.client_id
+            inv.client_id,
+            inv.due_date
         ))
     return invoices
 
+def get_client_statement(client_id, status='Open'):
+    """Client and invoice dicts for a statement PDF.
+
+    status 'Open' selects every invoice that is not Paid; any other value
+    filters like get_client_invoices. Line items for all invoices are loaded
+    in batched queries rather than once per invoice.
+    """
+    client = get_client(client_id)
+    if not client:
+        return None, []
+    
+    if status == 'Open':
+        # Paid invoices are filtered out by SQLite, not loaded and dropped
+        rows = get_client_invoices(client_id, unpaid=True)
+    else:
+        rows = get_client_invoices(client_id, status=status)
+    
+    items_by_invoice = {r[0]: [] for r in rows}
+    ids = list(items_by_invoice)
+    # Stay well below SQLite's bound parameter limit
+    for start in range(0, len(ids), 500):
+        batch = InvoiceItem.query.filter(InvoiceItem.invoice_id.in_(ids[start:start + 500])).order_by(InvoiceItem.invoice_id, InvoiceItem.id)
+        for i in batch:
+            items_by_invoice[i.invoice_id].append((i.id, i.invoice_id, i.description, i.quantity, i.rate, i.amount))
+    
+    client_data = {
+        'name': client[1],
+        'address': client[2] or "",
+        'email': client[3] or "",
+        'phone': client[4] or ""
+    }
+    invoices = []
+    # Oldest first reads naturally on a statement
+    for r in reversed(rows):
+        invoices.append({
+            'id': r[0],
+            'client': client_data,
+            'invoice_number': r[1],
+            'date_issued': r[3],
+            'due_date': r[9],
+            'status': r[4],
+            'total_amount': r[5],
+            'vat_exempt': r[6],
+            'vat_exempt_reason': r[7],
+            'line_items': items_by_invoice[r[0]]
+        })
+    return client_data, invoices
+
 def get_invoice_details(invoice_number):
-    invoice = Invoice.query.filter_by(invoice_number=invoice_number).first()
+    # Client joined in, items in one extra SELECT: two queries whatever the size
+    invoice = Invoice.query.options(
+        joinedload(Invoice.client), selectinload(Invoice.items)
+    ).filter_by(invoice_number=invoice_number).first()
     if not invoice:
         return None
     
@@ -143,6 +299,123 @@ def get_invoice_details(invoice_number):
         'line_items': items
     }
 
+def sweep_overdue_invoices(today, commit=True):
+    """Mark unpaid invoices past their due date as Overdue and return what
+    the daily check notifies about: (newly_overdue, due_today), rows with
+    id, invoice_number, due_date, total_amount and client_name.
+
+    One joined read collects both groups, then a single UPDATE flips the
+    statuses and returns the ids it changed. Pass commit=False to queue the
+    notifications (add_notifications) in the same transaction.
+    """
+    rows = db.session.execute(
+        select(Invoice.id, Invoice.invoice_number, Invoice.due_date, Invoice.total_amount,
+               Client.name.label('client_name'))
+        .outerjoin(Client, Client.id == Invoice.client_id)
+        .where(Invoice.due_date <= today, UNPAID, or_(Invoice.due_date == today, Invoice.status != 'Overdue'))
+        .order_by(Invoice.due_date)
+    ).all()
+    invoice_table = Invoice.__table__
+    flipped = set(db.session.scalars(
+        update(invoice_table)
+        .where(Invoice.due_date < today, UNPAID, Invoice.status != 'Overdue')
+        .values(status='Overdue')
+        .returning(invoice_table.c.id)
+    ))
+    if commit:
+        db.session.commit()
+    newly_overdue = [row for row in rows if row.id in flipped]
+    due_today = [row for row in rows if row.due_date == today]
+    return newly_overdue, due_today
+
+def add_notifications(webhook_url, messages):
+    """Queue (kind, invoice_number, content) messages in the outbox. Part of
+    the caller's transaction; notifier.Dispatcher delivers them."""
+    if not messages:
+        return
+    now = datetime.utcnow()
+    db.session.execute(insert(Notification.__table__), [
+        {"webhook_url": webhook_url, "kind": kind, "invoice_number": invoice_number, "content": content,
+         "status": "pending", "attempts": 0, "next_attempt_at": now, "created_at": now}
+        for kind, invoice_number, content in messages
+    ])
+
+def claim_notifications(now, lease_seconds, limit):
+    """Lease up to limit due notifications and return them (id, webhook_url,
+    content, attempts), oldest first. The lease pushes next_attempt_at into
+    the future so other processes skip the rows; if this process dies
+    before recording a result, the rows become due again when it runs out."""
+    outbox = Notification.__table__
+    due = (
+        select(outbox.c.id)
+        .where(outbox.c.status == 'pending', outbox.c.next_attempt_at <= now)
+        .order_by(outbox.c.next_attempt_at, outbox.c.id)
+        .limit(limit)
+    )
+    rows = db.session.execute(
+        update(outbox).where(outbox.c.id.in_(due))
+        .values(next_attempt_at=now + timedelta(seconds=lease_seconds))
+        .returning(outbox.c.id, outbox.c.webhook_url, outbox.c.content, outbox.c.attempts)
+    ).all()
+    db.session.commit()
+    return sorted(rows, key=lambda row: row.id)
+
+def record_notification_results(results):
+    """Store delivery outcomes in one batch: dicts with id, status, attempts,
+    next_attempt_at, last_error and sent_at."""
+    if not results:
+        return
+    outbox = Notification.__table__
+    db.session.execute(
+        update(outbox).where(outbox.c.id == bindparam('_id')),
+        [{"_id": r["id"], "status": r["status"], "attempts": r["attempts"], "next_attempt_at": r["next_attempt_at"],
+          "last_error": r["last_error"], "sent_at": r["sent_at"]} for r in results]
+    )
+    db.session.commit()
+
+def next_notification_due():
+    """When the earliest pending notification is due, or None."""
+    return db.session.execute(
+        select(func.min(Notification.next_attempt_at)).where(Notification.status == 'pending')
+    ).scalar()
+
+def notification_counts():
+    return dict(db.session.query(Notification.status, func.count()).group_by(Notification.status).all())
+
+def prune_notifications(before):
+    """Delete sent notifications older than before."""
+    deleted = db.session.execute(
+        delete(Notification).where(Notification.status == 'sent', Notification.sent_at < before)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+def acquire_lease(name, holder, ttl_seconds, now=None):
+    """Take or renew the named lease for holder. Succeeds when the lease is
+    free, expired or already held by holder; one atomic upsert, so two
+    processes can never both win. Returns True if holder has the lease."""
+    now = now or datetime.utcnow()
+    leases = Lease.__table__
+    stmt = sqlite_insert(leases).values(name=name, holder=holder, expires_at=now + timedelta(seconds=ttl_seconds))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[leases.c.name],
+        set_={"holder": stmt.excluded.holder, "expires_at": stmt.excluded.expires_at},
+        where=(leases.c.holder == holder) | (leases.c.expires_at < now),
+    )
+    won = db.session.execute(stmt.returning(leases.c.holder)).scalar()
+    db.session.commit()
+    return won == holder
+
+def release_lease(name, holder):
+    """Give up the lease if holder has it, so another process can take over
+    right away instead of waiting for it to expire."""
+    db.session.execute(delete(Lease).where(Lease.name == name, Lease.holder == holder))
+    db.session.commit()
+
+def get_lease(name):
+    lease = db.session.get(Lease, name)
+    return {"name": lease.name, "holder": lease.holder, "expires_at": lease.expires_at} if lease else None
+
 def update_invoice_status(invoice_number, new_status):
     invoice = Invoice.query.filter_by(invoice_number=invoice_number).first()
     if invoice:
@@ -162,6 +435,7 @@ def update_client(client_id, name, address, email, phone, category):
 def delete_client(client_id):
     client = Client.query.get(client_id)
     if client:
+        db.session.execute(delete(InvoiceSequence).where(InvoiceSequence.client_id == client_id))
         db.session.delete(client)
         db.session.commit()
 
@@ -172,7 +446,9 @@ def delete_invoice(invoice_id):
         db.session.commit()
 
 def get_invoice_by_id(invoice_id):
-    invoice = Invoice.query.get(invoice_id)
+    invoice = db.session.get(Invoice, invoice_id, options=[
+        joinedload(Invoice.client), selectinload(Invoice.items)
+    ])
     if not invoice:
         return None
         
@@ -198,172 +474,755 @@ def get_invoice_by_id(invoice_id):
         'line_items': items
     }
 
+def _item_content(item_data):
+    quantity = float(item_data['quantity'])
+    rate = float(item_data['rate'])
+    return {
+        'description': item_data['description'],
+        'quantity': quantity,
+        'rate': rate,
+        'amount': quantity * rate
+    }
+
+def _plan_item_changes(existing, items):
+    """Work out the statements that turn existing item rows into items.
+
+    existing is a list of rows (id, description, quantity, rate, amount)
+    sorted by id; items are the incoming dicts, some carrying the id of the
+    row they were loaded from. Items are printed in id order, so ids must
+    stay increasing along the new list:
+      - incoming ids that belong to this invoice are kept where that holds,
+      - the other items take over the leftover rows between kept ones by position,
+      - only items past the last kept row can be inserted (new ids sort last),
+      - rows nobody took are deleted.
+
+    Returns (updates, inserts, delete_ids); updates are (id, content) pairs
+    for rows whose content actually changes.
+    """
+    rows = {row.id: row for row in existing}
+    ids = [row.id for row in existing]
+    
+    # Items that can keep their row: known ids, increasing along the list
+    anchors = []
+    for index, item_data in enumerate(items):
+        item_id = item_data.get('id')
+        if item_id in rows and (not anchors or item_id > anchors[-1][1]):
+            anchors.append((index, item_id))
+    
+    while True:
+        placed, inserts, delete_ids = [], [], []
+        prev_index, prev_id = -1, None
+        overflow = False
+        for n, (index, anchor_id) in enumerate(anchors + [(len(items), None)]):
+            segment = items[prev_index + 1:index]
+            # Rows strictly between the previous and the next kept row
+            free = ids[bisect_right(ids, prev_id) if prev_id is not None else 0:
+                       bisect_left(ids, anchor_id) if anchor_id is not None else len(ids)]
+            if anchor_id is not None and len(segment) > len(free):
+                # No room to keep these in order before the next kept row;
+                # let them (and everything after) use the tail instead
+                anchors = anchors[:n]
+                overflow = True
+                break
+            placed += zip(free, segment)
+            delete_ids += free[len(segment):]
+            inserts += segment[len(free):]
+            if anchor_id is not None:
+                placed.append((anchor_id, items[index]))
+            prev_index, prev_id = index, anchor_id
+        if not overflow:
+            break
+    
+    updates = []
+    for row_id, item_data in placed:
+        content = _item_content(item_data)
+        row = rows[row_id]
+        if (row.description, row.quantity, row.rate, row.amount) != tuple(content.values()):
+            updates.append((row_id, content))
+    return updates, [_item_content(i) for i in inserts], delete_ids
+
 def update_invoice(invoice_id, client_id, invoice_number, date_issued, due_date, items, vat_exempt=False, vat_exempt_reason=None, status='Draft'):
     invoice = Invoice.query.get(invoice_id)
     if not invoice:
         return
 
+    if invoice_number != invoice.invoice_number:
+        parsed = _sequence_number(invoice_number, client_id)
+        if parsed:
+            _advance_sequence(client_id, *parsed)
+    
     invoice.client_id = client_id
     invoice.invoice_number = invoice_number
     invoice.date_issued = date_issued
     invoice.due_date = due_date
-    invoice.total_amount = sum(i['quantity'] * i['rate'] for i in items)
     invoice.status = status
     invoice.vat_exempt = vat_exempt
     invoice.vat_exempt_reason = vat_exempt_reason
     
-    # Replace items: simplest way is delete all and re-add
-    for item in invoice.items:
-        db.session.delete(item)
+    # Only touch the item rows that change, with one statement per kind
+    item_table = InvoiceItem.__table__
+    existing = db.session.execute(
+        select(InvoiceItem.id, InvoiceItem.description, InvoiceItem.quantity, InvoiceItem.rate, InvoiceItem.amount)
+        .where(InvoiceItem.invoice_id == invoice.id).order_by(InvoiceItem.id)
+    ).all()
+    updates, inserts, delete_ids = _plan_item_changes(existing, items)
     
-    for item_data in items:
-        new_item = InvoiceItem(
-            invoice_id=invoice.id,
-            description=item_data['description'],
-            quantity=item_data['quantity'],
-            rate=item_data['rate'],
-            amount=item_data['quantity'] * item_data['rate']
+    if updates:
+        db.session.execute(
+            update(item_table).where(item_table.c.id == bindparam('_id')),
+            [dict(content, _id=row_id) for row_id, content in updates]
+        )
+    if inserts:
+        db.session.execute(insert(item_table), [dict(content, invoice_id=invoice.id) for content in inserts])
+    for chunk in _in_batches(delete_ids):
+        db.session.execute(delete(item_table).where(item_table.c.id.in_(chunk)))
+    
+    # Adjust the total by what changed instead of summing every item again
+    amounts = {row.id: row.amount or 0 for row in existing}
+    if invoice.total_amount is None:
+        invoice.total_amount = sum(_item_content(i)['amount'] for i in items)
+    else:
+        invoice.total_amount += (
+            sum(content['amount'] - amounts[row_id] for row_id, content in updates)
+            + sum(content['amount'] for content in inserts)
+            - sum(amounts[row_id] for row_id in delete_ids)
         )
-        db.session.add(new_item)
         
     db.session.commit()
+    render_queue.enqueue(invoice_number)
+
+# Settings are read on every PDF render but change rarely. Each process keeps
+# a snapshot tagged with the settings_version it was loaded at; the version
+# row is re-read at most every SETTINGS_CHECK_INTERVAL seconds, so changes
+# made by another process show up within that time.
+SETTINGS_CHECK_INTERVAL = float(os.environ.get('SETTINGS_CHECK_INTERVAL', '1'))
+
+_settings_lock = threading.Lock()
+_settings_snapshot = None
+_settings_version = None
+_settings_checked_at = 0.0
+
+def _read_settings_version():
+    return db.session.execute(select(SettingsVersion.version).where(SettingsVersion.id == 1)).scalar()
+
+def _bump_settings_version():
+    # Part of the caller's transaction, so the new version and the new
+    # values become visible together
+    if db.session.execute(update(SettingsVersion).where(SettingsVersion.id == 1).values(version=SettingsVersion.version + 1)).rowcount == 0:
+        db.session.add(SettingsVersion(id=1, version=1))
+
+def invalidate_settings_cache():
+    global _settings_snapshot, _settings_version
+    with _settings_lock:
+        _settings_snapshot = None
+        _settings_version = None
 
 def get_settings():
+    """Current settings as a read-only mapping.
+
+    The result is shared between callers; use dict(get_settings()) for a
+    copy that can be modified, pickled or serialised.
+    """
+    global _settings_snapshot, _settings_version, _settings_checked_at
+    now = time.monotonic()
+    snapshot = _settings_snapshot
+    if snapshot is not None and now - _settings_checked_at < SETTINGS_CHECK_INTERVAL:
+        return snapshot
+    
+    version = _read_settings_version()
+    with _settings_lock:
+        if _settings_snapshot is not None and version == _settings_version:
+            _settings_checked_at = now
+            return _settings_snapshot
+    
+    # Read after the version, so the snapshot is at least as new as the tag
     settings = Settings.query.all()
-    return {s.key: s.value for s in settings}
+    snapshot = MappingProxyType({s.key: s.value for s in settings})
+    with _settings_lock:
+        _settings_snapshot, _settings_version, _settings_checked_at = snapshot, version, now
+    return snapshot
 
 def update_settings(settings_dict):
+    changed = []
     for key, value in settings_dict.items():
         setting = Settings.query.get(key)
         if setting:
+            # The frontend sends every key; numbers come back from the
+            # String column as text
+            if setting.value != (value if value is None else str(value)):
+                changed.append(key)
             setting.value = value
         else:
+            changed.append(key)
             db.session.add(Settings(key=key, value=value))
+    _bump_settings_version()
     db.session.commit()
+    invalidate_settings_cache()
+    # Saving e.g. only the webhook URL leaves every rendered PDF valid
+    render_queue.requeue_all(changed_keys=changed)
 
 def get_client_invoice_count(client_id, year=None):
     query = Invoice.query.filter_by(client_id=client_id)
     if year:
-        query = query.filter(extract('year', Invoice.date_issued) == year)
+        # A range on the raw column can use ix_invoices_client_id_date_issued,
+        # extract('year', ...) cannot
+        year = int(year)
+        query = query.filter(Invoice.date_issued >= date(year, 1, 1), Invoice.date_issued < date(year + 1, 1, 1))
     
     return query.count()
 
+def _sequence_number(invoice_number, client_id):
+    """(year, number) of an invoice number in the generated
+    PREFIX-<client_id>-NNN-<year> format, or None for anything else."""
+    parts = (invoice_number or '').rsplit('-', 2)
+    if len(parts) != 3 or not parts[0].endswith(f"-{client_id}"):
+        return None
+    if not (parts[1].isdigit() and parts[2].isdigit()):
+        return None
+    return int(parts[2]), int(parts[1])
+
+def _highest_used_number(client_id, year):
+    # Only needed once per client and year, when its sequence row is created.
+    # Never below the yearly invoice count numbers used to be derived from.
+    numbers = db.session.scalars(
+        select(Invoice.invoice_number)
+        .where(Invoice.client_id == client_id, Invoice.invoice_number.like(f"%-{client_id}-%-{year}"))
+    )
+    used = [n for y, n in filter(None, (_sequence_number(x, client_id) for x in numbers)) if y == year]
+    return max(used + [get_client_invoice_count(client_id, year=year)])
+
+def _advance_sequence(client_id, year, number=None):
+    """Move the client's sequence for year on in one statement and return
+    the new last number. Without number the next one is claimed; with
+    number the sequence only moves forward to it."""
+    seq = InvoiceSequence.__table__
+    if number is None:
+        value = seq.c.last_number + 1
+    else:
+        value = func.max(seq.c.last_number, number)
+    new = db.session.execute(
+        update(seq).where(seq.c.client_id == client_id, seq.c.year == year)
+        .values(last_number=value).returning(seq.c.last_number)
+    ).scalar()
+    if new is None:
+        # First number of the year for this client: start after what is in use
+        start = _highest_used_number(client_id, year)
+        stmt = sqlite_insert(seq).values(
+            client_id=client_id, year=year, last_number=start + 1 if number is None else max(start, number)
+        )
+        # Another process may have created the row in the meantime
+        stmt = stmt.on_conflict_do_update(index_elements=[seq.c.client_id, seq.c.year], set_={'last_number': value})
+        new = db.session.execute(stmt.returning(seq.c.last_number)).scalar()
+    return new
+
+def reserve_invoice_number(client_id, year):
+    """Claim the next running number of client_id for year. The claim is
+    committed right away, so no other form is handed the same number."""
+    number = _advance_sequence(client_id, year)
+    db.session.commit()
+    return number
+
+def peek_invoice_number(client_id, year):
+    """The number reserve_invoice_number would hand out, without claiming it."""
+    last = db.session.execute(
+        select(InvoiceSequence.last_number)
+        .where(InvoiceSequence.client_id == client_id, InvoiceSequence.year == year)
+    ).scalar()
+    if last is None:
+        last = _highest_used_number(client_id, year)
+    return last + 1
+
+def release_invoice_number(client_id, invoice_number):
+    """Give back a reserved number whose draft was discarded. Only the most
+    recent reservation can be returned and only while no invoice uses it;
+    anything else stays a gap. Returns True if the number was released."""
+    parsed = _sequence_number(invoice_number, client_id)
+    if parsed is None:
+        return False
+    year, number = parsed
+    seq = InvoiceSequence.__table__
+    in_use = select(Invoice.id).where(Invoice.invoice_number == invoice_number).exists()
+    released = db.session.execute(
+        update(seq)
+        .where(seq.c.client_id == client_id, seq.c.year == year, seq.c.last_number == number, ~in_use)
+        .values(last_number=number - 1)
+    ).rowcount
+    db.session.commit()
+    return released == 1
+
+# Export order matters for import: parents before children
+EXPORT_TABLES = ("clients", "invoices", "invoice_items", "settings")
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def _export_batches(key, columns, batch_size):
+    # Keyset over the primary key so each batch is an index range and only
+    # batch_size rows are held at a time
+    last = None
+    while True:
+        query = db.session.query(*columns).order_by(key)
+        if last is not None:
+            query = query.filter(key > last)
+        rows = query.limit(batch_size).all()
+        if not rows:
+            return
+        yield rows
+        last = getattr(rows[-1], key.key)
+        if len(rows) < batch_size:
+            return
+
+def _export_client(c):
+    return {
+        "id": c.id,
+        "name": c.name,
+        "address": c.address,
+        "email": c.email,
+        "phone": c.phone,
+        "category": c.category,
+        "created_at": _isoformat(c.created_at)
+    }
+
+def _export_invoice(i):
+    return {
+        "id": i.id,
+        "client_id": i.client_id,
+        "invoice_number": i.invoice_number,
+        "date_issued": _isoformat(i.date_issued),
+        "due_date": _isoformat(i.due_date),
+        "status": i.status,
+        "total_amount": i.total_amount,
+        "vat_exempt": i.vat_exempt,
+        "vat_exempt_reason": i.vat_exempt_reason
+    }
+
+def _export_item(item):
+    return {
+        "id": item.id,
+        "invoice_id": item.invoice_id,
+        "description": item.description,
+        "quantity": item.quantity,
+        "rate": item.rate,
+        "amount": item.amount
+    }
+
+def _export_setting(s):
+    return {
+        "key": s.key,
+        "value": s.value
+    }
+
+# table: (keyset column, selected columns, row -> dict)
+_EXPORT_SPECS = {
+    "clients": (Client.id, (Client.id, Client.name, Client.address, Client.email, Client.phone,
+                            Client.category, Client.created_at), _export_client),
+    "invoices": (Invoice.id, (Invoice.id, Invoice.client_id, Invoice.invoice_number, Invoice.date_issued,
+                              Invoice.due_date, Invoice.status, Invoice.total_amount, Invoice.vat_exempt,
+                              Invoice.vat_exempt_reason), _export_invoice),
+    "invoice_items": (InvoiceItem.id, (InvoiceItem.id, InvoiceItem.invoice_id, InvoiceItem.description,
+                                       InvoiceItem.quantity, InvoiceItem.rate, InvoiceItem.amount), _export_item),
+    "settings": (Settings.key, (Settings.key, Settings.value), _export_setting),
+}
+
+def iter_export_table(table, batch_size=1000):
+    """Yield the export dicts of one table, reading batch_size rows at a time."""
+    key, columns, to_dict = _EXPORT_SPECS[table]
+    for rows in _export_batches(key, columns, batch_size):
+        for row in rows:
+            yield to_dict(row)
+
+def iter_export_rows(batch_size=1000):
+    """Yield (table, row dict) for the whole database in EXPORT_TABLES order."""
+    for table in EXPORT_TABLES:
+        for row in iter_export_table(table, batch_size):
+            yield table, row
+
 def export_data():
     """Export all data to a dictionary."""
-    data = {
-        "clients": [],
-        "invoices": [],
-        "invoice_items": [],
-        "settings": []
+    data = {table: [] for table in EXPORT_TABLES}
+    for table, row in iter_export_rows():
+        data[table].append(row)
+    return data
+
+# Rows per executemany batch during import
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '5000'))
+
+def _import_date(value):
+    return datetime.fromisoformat(value).date() if value else None
+
+def _import_client(c_data):
+    return {
+        "id": c_data["id"],
+        "name": c_data["name"],
+        "address": c_data["address"],
+        "email": c_data["email"],
+        "phone": c_data["phone"],
+        "category": c_data["category"],
+        "created_at": datetime.fromisoformat(c_data["created_at"]) if c_data.get("created_at") else None
     }
-    
-    # Clients
-    for c in Client.query.all():
-        data["clients"].append({
-            "id": c.id,
-            "name": c.name,
-            "address": c.address,
-            "email": c.email,
-            "phone": c.phone,
-            "category": c.category,
-            "created_at": c.created_at.isoformat() if c.created_at else None
-        })
+
+def _import_invoice(i_data):
+    return {
+        "id": i_data["id"],
+        "client_id": i_data["client_id"],
+        "invoice_number": i_data["invoice_number"],
+        "date_issued": _import_date(i_data.get("date_issued")),
+        "due_date": _import_date(i_data.get("due_date")),
+        "status": i_data["status"],
+        "total_amount": i_data["total_amount"],
+        "vat_exempt": i_data.get("vat_exempt", False),
+        "vat_exempt_reason": i_data.get("vat_exempt_reason")
+    }
+
+def _import_item(item_data):
+    return {
+        "id": item_data["id"],
+        "invoice_id": item_data["invoice_id"],
+        "description": item_data["description"],
+        "quantity": item_data["quantity"],
+        "rate": item_data["rate"],
+        "amount": item_data["amount"]
+    }
+
+def _import_setting(s_data):
+    return {"key": s_data["key"], "value": s_data["value"]}
+
+# table: (model, export dict -> insert parameters)
+_IMPORT_SPECS = {
+    "clients": (Client, _import_client),
+    "invoices": (Invoice, _import_invoice),
+    "invoice_items": (InvoiceItem, _import_item),
+    "settings": (Settings, _import_setting),
+}
+
+# Merge imports match incoming rows to existing ones on these columns, not on
+# ids, which differ between instances: clients by name, invoices by number.
+# Exported client and invoice ids are remapped to the local ones. Invoice
+# items have no natural key; see _MergeImport._merge_items.
+_MERGE_KEYS = {
+    "clients": Client.name,
+    "invoices": Invoice.invoice_number,
+    "settings": Settings.key,
+}
+
+# Stay below SQLite's bound parameter limit for IN (...) lists
+_IN_BATCH = 900
+
+def _in_batches(values, size=_IN_BATCH):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _content_hash(values):
+    # JSON gives 5 where the database returns 5.0 for Float columns
+    values = {k: float(v) if isinstance(v, int) and not isinstance(v, bool) else v for k, v in values.items()}
+    raw = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).digest()
+
+_MERGE_ITEM_FIELDS = ("description", "quantity", "rate", "amount")
+
+def _merge_item_key(values):
+    # What makes two invoice lines the same; 5 from JSON equals 5.0 stored
+    return tuple(float(values[k]) if isinstance(values[k], int) and not isinstance(values[k], bool) else values[k]
+                 for k in _MERGE_ITEM_FIELDS)
+
+def _empty_summary():
+    return {table: {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0} for table in _IMPORT_SPECS}
+
+class _MergeImport:
+    """Upserts export rows chunk by chunk; used by import_rows(mode='merge')."""
+
+    def __init__(self):
+        self.summary = _empty_summary()
+        # Exported id -> local id, to re-point invoices and their items
+        self.local_ids = {"clients": {}, "invoices": {}}
+        # Local invoices created by this import; all their items are new
+        self.new_invoices = set()
+        # Rows the import covered, for delete_missing: local ids for clients
+        # and items, the merge key for invoices and settings
+        self.seen = {table: set() for table in _IMPORT_SPECS}
+
+    def _remap(self, table, exported_id, owner):
+        if exported_id is None:
+            return None
+        try:
+            return self.local_ids[table][exported_id]
+        except KeyError:
+            raise ImportFormatError(f"{owner} refers to {table[:-1]} {exported_id}, which is not in the file")
+
+    def merge(self, table, batch):
+        if table == "invoice_items":
+            self._merge_items(batch)
+            return
+        model = _IMPORT_SPECS[table][0]
+        key_col = _MERGE_KEYS[table]
+        key = key_col.key
+        pk = model.__table__.primary_key.columns[0]
+        if table == "invoices":
+            for values in batch:
+                values["client_id"] = self._remap("clients", values["client_id"],
+                                                  f"Invoice {values['invoice_number']}")
         
-    # Invoices
-    for i in Invoice.query.all():
-        data["invoices"].append({
-            "id": i.id,
-            "client_id": i.client_id,
-            "invoice_number": i.invoice_number,
-            "date_issued": i.date_issued.isoformat() if i.date_issued else None,
-            "due_date": i.due_date.isoformat() if i.due_date else None,
-            "status": i.status,
-            "total_amount": i.total_amount,
-            "vat_exempt": i.vat_exempt,
-            "vat_exempt_reason": i.vat_exempt_reason
-        })
+        keys = [values[key] for values in batch]
+        if table != "clients":
+            self.seen[table].update(keys)
+        columns = list(model.__table__.columns)
+        # Client names are not unique: key -> rows, oldest first
+        existing = {}
+        for chunk in _in_batches(set(keys)):
+            for row in db.session.execute(select(*columns).where(key_col.in_(chunk)).order_by(pk)):
+                # Each local client takes at most one incoming one
+                if table == "clients" and row.id in self.seen["clients"]:
+                    continue
+                existing.setdefault(row._mapping[key], []).append(dict(row._mapping))
         
-    # Invoice Items
-    for item in InvoiceItem.query.all():
-        data["invoice_items"].append({
-            "id": item.id,
-            "invoice_id": item.invoice_id,
-            "description": item.description,
-            "quantity": item.quantity,
-            "rate": item.rate,
-            "amount": item.amount
-        })
+        inserts, updates = [], []
+        counts = self.summary[table]
+        for values in batch:
+            candidates = existing.get(values[key], [])
+            # Prefer the row with the same id, e.g. between copies of one database
+            old = next((r for r in candidates if r[pk.key] == values.get(pk.key)), None)
+            if old is None and candidates:
+                old = candidates[0]
+            if old is None:
+                inserts.append(values)
+                continue
+            candidates.remove(old)
+            if table in self.local_ids:
+                self.local_ids[table][values["id"]] = old["id"]
+                values["id"] = old["id"]
+                if table == "clients":
+                    self.seen["clients"].add(old["id"])
+            if _content_hash(values) == _content_hash(old):
+                counts["unchanged"] += 1
+            else:
+                updates.append(dict(values, _match=old[pk.key]))
         
-    # Settings
-    for s in Settings.query.all():
-        data["settings"].append({
-            "key": s.key,
-            "value": s.value
-        })
+        if table in self.local_ids and inserts:
+            inserts = self._place_new(table, inserts)
+        if inserts:
+            db.session.execute(insert(model.__table__), inserts)
+            counts["inserted"] += len(inserts)
+        if updates:
+            db.session.execute(update(model.__table__).where(pk == bindparam("_match")), updates)
+            counts["updated"] += len(updates)
+
+    def _place_new(self, table, inserts):
+        # New clients and invoices keep their exported id unless a different
+        # local row already has it; those get a fresh id instead. Returns the
+        # rows still to be inserted.
+        model = _IMPORT_SPECS[table][0]
+        taken = set()
+        for chunk in _in_batches([values["id"] for values in inserts]):
+            taken.update(r[0] for r in db.session.execute(select(model.id).where(model.id.in_(chunk))))
+        free = []
+        for values in inserts:
+            exported_id = values["id"]
+            if exported_id in taken:
+                local_id = db.session.execute(
+                    insert(model.__table__).values({k: v for k, v in values.items() if k != "id"})
+                ).inserted_primary_key[0]
+                self.summary[table]["inserted"] += 1
+            else:
+                free.append(values)
+                local_id = exported_id
+            self.local_ids[table][exported_id] = local_id
+            if table == "invoices":
+                self.new_invoices.add(local_id)
+            else:
+                self.seen["clients"].add(local_id)
+        return free
+
+    def _merge_items(self, batch):
+        """Items are matched only among the lines of their (local) invoice,
+        never by the exported id alone, which may be an unrelated local line:
+        the same id in the same invoice first, then an identical line, then
+        the remaining lines in order. Items of new invoices, and lines beyond
+        those the local invoice has, are inserted with fresh ids."""
+        counts = self.summary["invoice_items"]
+        seen = self.seen["invoice_items"]
+        columns = list(InvoiceItem.__table__.columns)
+        inserts, matched, updates = [], [], []
+        for values in batch:
+            values["invoice_id"] = self._remap("invoices", values["invoice_id"], f"Invoice item {values['id']}")
+            if values["invoice_id"] is None or values["invoice_id"] in self.new_invoices:
+                inserts.append(values)
+            else:
+                matched.append(values)
         
-    return data
+        def merge_into(values, old):
+            seen.add(old.id)
+            if _merge_item_key(values) == _merge_item_key(old._mapping):
+                counts["unchanged"] += 1
+            else:
+                updates.append(dict(values, id=old.id, _match=old.id))
+        
+        # Same id in the same invoice: e.g. a copy of this database
+        by_id = {}
+        for chunk in _in_batches([values["id"] for values in matched]):
+            by_id.update((row.id, row) for row in db.session.execute(select(*columns).where(InvoiceItem.id.in_(chunk))))
+        rest = []
+        for values in matched:
+            old = by_id.get(values["id"])
+            if old is None or old.invoice_id != values["invoice_id"] or old.id in seen:
+                rest.append(values)
+            else:
+                merge_into(values, old)
+        
+        # The other lines of those invoices not yet claimed by an earlier row
+        local = {} # invoice_id -> {item id: row}, oldest first
+        by_content = {} # (invoice_id, content) -> [item id]
+        for chunk in _in_batches({values["invoice_id"] for values in rest}):
+            query = select(*columns).where(InvoiceItem.invoice_id.in_(chunk)).order_by(InvoiceItem.id)
+            for row in db.session.execute(query):
+                if row.id not in seen:
+                    local.setdefault(row.invoice_id, {})[row.id] = row
+                    by_content.setdefault((row.invoice_id, _merge_item_key(row._mapping)), []).append(row.id)
+        
+        # Identical lines before the rest, so an edited line does not take
+        # their place
+        leftover = []
+        for values in rest:
+            lines = local.get(values["invoice_id"], {})
+            same = [i for i in by_content.get((values["invoice_id"], _merge_item_key(values)), ()) if i in lines]
+            if same:
+                merge_into(values, lines.pop(same[0]))
+            else:
+                leftover.append(values)
+        for values in leftover:
+            lines = local.get(values["invoice_id"])
+            if lines:
+                merge_into(values, lines.pop(next(iter(lines))))
+            else:
+                inserts.append(values)
+        
+        if updates:
+            db.session.execute(update(InvoiceItem.__table__).where(InvoiceItem.id == bindparam("_match")), updates)
+            counts["updated"] += len(updates)
+        if inserts:
+            new_ids = db.session.execute(
+                insert(InvoiceItem.__table__).returning(InvoiceItem.id),
+                [{k: v for k, v in values.items() if k != "id"} for values in inserts],
+            ).scalars().all()
+            seen.update(new_ids)
+            counts["inserted"] += len(inserts)
 
-def import_data(data):
-    """Import data from dictionary, replacing existing data."""
+    def delete_missing(self):
+        # Children first, like the replace import
+        for table, key_col in (("invoice_items", InvoiceItem.id), ("invoices", Invoice.invoice_number),
+                               ("clients", Client.id), ("settings", Settings.key)):
+            model = _IMPORT_SPECS[table][0]
+            local = [r[0] for r in db.session.execute(select(key_col))]
+            missing = [k for k in local if k not in self.seen[table]]
+            for chunk in _in_batches(missing):
+                if table == "invoices":
+                    # Items of a removed invoice go with it
+                    ids = select(Invoice.id).where(Invoice.invoice_number.in_(chunk))
+                    db.session.execute(delete(InvoiceItem).where(InvoiceItem.invoice_id.in_(ids)))
+                elif table == "clients":
+                    db.session.execute(delete(InvoiceSequence).where(InvoiceSequence.client_id.in_(chunk)))
+                db.session.execute(delete(model).where(key_col.in_(chunk)))
+            self.summary[table]["deleted"] += len(missing)
+
+    def raise_sequences(self):
+        # Numbers already handed out stay claimed; a sequence only moves up
+        # past the numbers the merged invoices use
+        seq = InvoiceSequence.__table__
+        for client_id, year in db.session.execute(select(seq.c.client_id, seq.c.year)).all():
+            _advance_sequence(client_id, year, _highest_used_number(client_id, year))
+
+def import_rows(rows, chunk_size=IMPORT_CHUNK_SIZE, progress=None, mode='replace', delete_missing=False):
+    """Load the (table, row) pairs of an export.
+
+    mode 'replace' deletes all existing data first. mode 'merge' upserts:
+    clients by name, invoices by invoice_number, settings by key and invoice
+    items among the lines of their invoice, with exported ids remapped to
+    local ones. Rows whose content is unchanged are not written, and
+    existing rows absent from the import are only removed when
+    delete_missing is set. Replace clears the invoice number sequences;
+    merge keeps them, so reserved numbers stay claimed, and raises each to
+    the highest number its client now uses.
+
+    rows can be a lazy iterator (see data_import); rows are written with
+    executemany in chunks of chunk_size. Everything runs in one transaction,
+    so a failure part way through leaves the existing data untouched.
+    progress(table, rows_so_far) is called after every chunk.
+
+    Returns (success, message, summary) where summary maps each table to
+    inserted/updated/unchanged/deleted counts. ImportFormatError raised by
+    the row source is re-raised after rolling back.
+    """
+    buffers = {table: [] for table in _IMPORT_SPECS}
+    counts = dict.fromkeys(_IMPORT_SPECS, 0)
+    merger = _MergeImport() if mode == 'merge' else None
+    summary = merger.summary if merger else _empty_summary()
+    
+    def flush(table):
+        if not buffers[table]:
+            return
+        if merger:
+            merger.merge(table, buffers[table])
+        else:
+            db.session.execute(insert(_IMPORT_SPECS[table][0].__table__), buffers[table])
+            summary[table]["inserted"] += len(buffers[table])
+        counts[table] += len(buffers[table])
+        buffers[table] = []
+        if progress:
+            progress(table, counts[table])
+    
     try:
-        # 1. Clear existing data
-        # Delete children first to avoid FK constraints issues if cascade isn't perfect
-        InvoiceItem.query.delete()
-        Invoice.query.delete()
-        Client.query.delete()
-        Settings.query.delete()
+        if not merger:
+            # 1. Clear existing data
+            # Delete children first to avoid FK constraints issues if cascade isn't perfect
+            for model, table in ((InvoiceItem, "invoice_items"), (Invoice, "invoices"), (Client, "clients"), (Settings, "settings")):
+                summary[table]["deleted"] = db.session.execute(delete(model)).rowcount
         
-        # 2. Insert Settings
-        for s_data in data.get("settings", []):
-            db.session.add(Settings(key=s_data["key"], value=s_data["value"]))
-            
-        # 3. Insert Clients
-        for c_data in data.get("clients", []):
-            created_at = datetime.fromisoformat(c_data["created_at"]) if c_data.get("created_at") else None
-            client = Client(
-                id=c_data["id"],
-                name=c_data["name"],
-                address=c_data["address"],
-                email=c_data["email"],
-                phone=c_data["phone"],
-                category=c_data["category"],
-                created_at=created_at
-            )
-            db.session.add(client)
-            
-        # 4. Insert Invoices
-        for i_data in data.get("invoices", []):
-            date_issued = datetime.fromisoformat(i_data["date_issued"]).date() if i_data.get("date_issued") else None
-            due_date = datetime.fromisoformat(i_data["due_date"]).date() if i_data.get("due_date") else None
-            
-            invoice = Invoice(
-                id=i_data["id"],
-                client_id=i_data["client_id"],
-                invoice_number=i_data["invoice_number"],
-                date_issued=date_issued,
-                due_date=due_date,
-                status=i_data["status"],
-                total_amount=i_data["total_amount"],
-                vat_exempt=i_data.get("vat_exempt", False),
-                vat_exempt_reason=i_data.get("vat_exempt_reason")
-            )
-            db.session.add(invoice)
-            
-        # 5. Insert Invoice Items
-        for item_data in data.get("invoice_items", []):
-            item = InvoiceItem(
-                id=item_data["id"],
-                invoice_id=item_data["invoice_id"],
-                description=item_data["description"],
-                quantity=item_data["quantity"],
-                rate=item_data["rate"],
-                amount=item_data["amount"]
-            )
-            db.session.add(item)
-            
-        db.session.commit()
-        return True, "Data imported successfully."
+        # 2. Write in chunks as rows arrive; unknown sections are ignored
+        current = None
+        for table, row in rows:
+            spec = _IMPORT_SPECS.get(table)
+            if spec is None:
+                continue
+            if table != current:
+                # Finish earlier tables first so merged items can be
+                # matched to invoices from the same file
+                for other in buffers:
+                    flush(other)
+                current = table
+            buffers[table].append(spec[1](row))
+            if len(buffers[table]) >= chunk_size:
+                flush(table)
+        for table in buffers:
+            flush(table)
+        
+        if merger and delete_missing:
+            merger.delete_missing()
         
+        if merger:
+            merger.raise_sequences()
+        else:
+            # Sequences follow the imported invoice numbers; they are rebuilt
+            # on first use
+            db.session.execute(delete(InvoiceSequence))
+        
+        _bump_settings_version()
+        db.session.commit()
+        invalidate_settings_cache()
+        if merger:
+            totals = {k: sum(t[k] for t in summary.values()) for k in ("inserted", "updated", "unchanged", "deleted")}
+            description = ", ".join(f"{n} {k}" for k, n in totals.items())
+            return True, f"Data merged successfully ({description}).", summary
+        description = ", ".join(f"{n} {table.replace('_', ' ')}" for table, n in counts.items())
+        return True, f"Data imported successfully ({description}).", summary
+    
+    except ImportFormatError:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
-        return False, str(e)
+        return False, str(e), None
+
+def import_data(data):
+    """Import data from dictionary, replacing existing data."""
+    success, message, _ = import_rows(iter_dict_rows(data))
+    return success, message
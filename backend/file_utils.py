@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+
+def write_atomic(path, data):
+    """Write bytes via a temp file in the same folder and rename over the
+    target, so readers and concurrent writers never see a half-written file."""
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
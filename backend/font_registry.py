@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import namedtuple
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# Families we know how to use, in order of preference:
+# (registered name, regular file, bold file)
+# Liberation Sans is metric-compatible with Arial, DejaVu covers most scripts.
+FONT_CANDIDATES = [
+    ('Arial', 'arial.ttf', 'arialbd.ttf'),
+    ('LiberationSans', 'LiberationSans-Regular.ttf', 'LiberationSans-Bold.ttf'),
+    ('DejaVuSans', 'DejaVuSans.ttf', 'DejaVuSans-Bold.ttf'),
+]
+
+# Built-in Type 1 fonts, always available but Latin-1 only
+FALLBACK_REGULAR = 'Helvetica'
+FALLBACK_BOLD = 'Helvetica-Bold'
+
+FontSet = namedtuple('FontSet', ['regular', 'bold', 'regular_path', 'bold_path'])
+
+_lock = threading.Lock()
+_fonts = None
+
+
+def font_dirs():
+    """Directories searched for TTF files on this platform."""
+    dirs = []
+    # Explicit override, e.g. a fonts folder shipped next to the executable
+    if os.environ.get('INVOICE_FONT_DIR'):
+        dirs.append(os.environ['INVOICE_FONT_DIR'])
+    if os.name == 'nt':
+        dirs.append(os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'))
+    else:
+        dirs += [
+            '/usr/share/fonts',
+            '/usr/local/share/fonts',
+            os.path.expanduser('~/.local/share/fonts'),
+            os.path.expanduser('~/.fonts'),
+            # macOS
+            '/Library/Fonts',
+            '/System/Library/Fonts/Supplemental',
+        ]
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def _index_font_files():
+    # One walk over the font directories, keyed by lowercase file name
+    # (Windows ships arial.ttf, macOS Arial.ttf)
+    index = {}
+    for base in font_dirs():
+        for root, _, files in os.walk(base):
+            for name in files:
+                if name.lower().endswith('.ttf'):
+                    index.setdefault(name.lower(), os.path.join(root, name))
+    return index
+
+
+def _register(name, path):
+    # Registration is process-wide, so each TTF is only parsed once
+    if name not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(name, path))
+
+
+def _resolve():
+    index = _index_font_files()
+    for family, regular_file, bold_file in FONT_CANDIDATES:
+        regular_path = index.get(regular_file.lower())
+        if not regular_path:
+            continue
+        try:
+            _register(family, regular_path)
+        except Exception as e:
+            print(f"Warning: Could not load font {regular_path}: {e}")
+            continue
+
+        bold_path = index.get(bold_file.lower())
+        bold_name = f"{family}-Bold"
+        try:
+            if bold_path:
+                _register(bold_name, bold_path)
+            else:
+                bold_name = family # Fallback if bold missing
+        except Exception as e:
+            print(f"Warning: Could not load font {bold_path}: {e}")
+            bold_name, bold_path = family, None
+        return FontSet(family, bold_name, regular_path, bold_path)
+
+    print("Warning: No Unicode TTF font found, falling back to Helvetica")
+    return FontSet(FALLBACK_REGULAR, FALLBACK_BOLD, None, None)
+
+
+def get_fonts():
+    """Return the FontSet for this process, discovering it on first use."""
+    global _fonts
+    if _fonts is None:
+        with _lock:
+            if _fonts is None:
+                _fonts = _resolve()
+                print(f"PDF fonts: {_fonts.regular} ({_fonts.regular_path or 'built-in'}), "
+                      f"{_fonts.bold} ({_fonts.bold_path or 'built-in'})")
+    return _fonts
+
+
+def resolved_fonts():
+    """Report of the fonts in use, suitable for JSON."""
+    return get_fonts()._asdict()
@@ -0,0 +1,40 @@
+"""Gunicorn settings for the production server (used by the Dockerfile):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every worker runs the whole app, including the scheduler; only the worker
+holding the scheduler lease runs jobs (see leader.py).
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Processes for the CPU bound work (PDFs, JSON), threads for requests that
+# mostly wait on SQLite or the client. PDF jobs, import progress and rendered
+# PDFs are shared between workers through files in the data folder; only the
+# in-memory PDF cache and the pre-render queue are per worker.
+workers = int(os.environ.get('WEB_CONCURRENCY', min(2 * multiprocessing.cpu_count() + 1, 4)))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Bulk ZIP exports and backup imports stream for a while
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# app.py starts background threads (pre-render queue at import, the rest in
+# post_worker_init); threads do not survive a fork, so each worker imports
+# the app itself
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    # Scheduler, notification delivery and leader election, started beside
+    # the worker's request loop rather than ahead of it
+    import threading
+    from app import start_background_services
+    threading.Thread(target=start_background_services, name='background-start', daemon=True).start()
@@ -0,0 +1,73 @@
+import atexit
+import os
+import socket
+import threading
+import uuid
+
+
+class LeaderElection:
+    """Keeps one of several server processes as the leader for a task.
+
+    Every process runs one of these against the same database lease. The
+    holder renews it every renew_every seconds; if it stops (crash, kill -9)
+    the lease runs out after ttl seconds and the next process to try takes
+    over. on_elected / on_demoted are called from the election thread when
+    this process gains or loses the lease.
+    """
+
+    def __init__(self, app, name, ttl=30, renew_every=10, on_elected=None, on_demoted=None):
+        self.app = app
+        self.name = name
+        self.ttl = ttl
+        self.renew_every = renew_every
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Try for the lease once right away, then keep trying in the background."""
+        if self._thread is not None:
+            return
+        self._tick()
+        self._thread = threading.Thread(target=self._run, name=f'leader-{self.name}', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+        if self.is_leader:
+            self._set_leader(False)
+            try:
+                import db_manager
+                with self.app.app_context():
+                    db_manager.release_lease(self.name, self.holder)
+            except Exception as e:
+                print(f"Could not release the {self.name} lease: {e}")
+
+    def _set_leader(self, value):
+        if value == self.is_leader:
+            return
+        self.is_leader = value
+        callback = self.on_elected if value else self.on_demoted
+        print(f"{'Elected' if value else 'No longer'} {self.name} leader ({self.holder})")
+        if callback:
+            callback()
+
+    def _tick(self):
+        import db_manager
+        try:
+            with self.app.app_context():
+                won = db_manager.acquire_lease(self.name, self.holder, self.ttl)
+        except Exception as e:
+            # Could not reach the database (e.g. locked too long): step down
+            # rather than risk a second leader once the lease runs out
+            print(f"Leader election for {self.name} failed: {e}")
+            won = False
+        self._set_leader(won)
+
+    def _run(self):
+        while not self._stop.wait(self.renew_every):
+            self._tick()
@@ -1,6 +1,7 @@
 import sys
 import datetime
 import db_manager
+import bulk_export
 from pdf_builder import InvoicePDF
 
 def print_menu():
@@ -11,7 +12,8 @@ def print_menu():
     print("4. List Invoices")
     print("5. Generate PDF for Invoice")
     print("6. Mark Invoice as Paid")
-    print("7. Exit")
+    print("7. Export PDFs (ZIP)")
+    print("8. Exit")
     print("-------------------------")
 
 def add_client_flow():
@@ -101,6 +103,32 @@ def generate_pdf_flow():
     else:
         print("Invoice not found.")
 
+def export_pdfs_flow():
+    print("\n[Export PDFs]")
+    status = input("Status (Draft/Sent/Paid/Overdue) [All]: ") or 'All'
+    client_str = input("Client ID [All]: ")
+    month = input("Month (YYYY-MM) [All]: ")
+    
+    try:
+        client_id = int(client_str) if client_str else None
+        date_from, date_to = bulk_export.month_range(month) if month else (None, None)
+    except ValueError:
+        print("Invalid Client ID or month")
+        return
+    
+    invoice_numbers = db_manager.get_invoice_numbers(
+        status=status, client_id=client_id, date_from=date_from, date_to=date_to
+    )
+    if not invoice_numbers:
+        print("No invoices match the filter.")
+        return
+    
+    filename = f"Invoices_{month or datetime.date.today()}.zip"
+    with open(filename, 'wb') as f:
+        for chunk in bulk_export.stream_invoice_zip(invoice_numbers, db_manager.get_settings()):
+            f.write(chunk)
+    print(f"Exported {len(invoice_numbers)} invoices to {filename}")
+
 def mark_paid_flow():
     print("\n[Mark Paid]")
     invoice_number = input("Enter Invoice Number: ")
@@ -127,6 +155,8 @@ def main():
         elif choice == '6':
             mark_paid_flow()
         elif choice == '7':
+            export_pdfs_flow()
+        elif choice == '8':
             print("Goodbye!")
             break
         else:
@@ -0,0 +1,32 @@
+"""Add invoice_sequences for per-client yearly invoice numbers
+
+Revision ID: 3f7a9c2e5d18
+Revises: e4f2b8d61c57
+Create Date: 2026-10-17 18:12:37.214905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7a9c2e5d18'
+down_revision = 'e4f2b8d61c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are created on first use from the existing invoice numbers, see
+    # db_manager.reserve_invoice_number
+    op.create_table('invoice_sequences',
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('last_number', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+    sa.PrimaryKeyConstraint('client_id', 'year')
+    )
+
+
+def downgrade():
+    op.drop_table('invoice_sequences')
@@ -0,0 +1,39 @@
+"""Add indexes for invoice list, per-client and overdue queries
+
+Revision ID: 5b1e7c3f9a42
+Revises: d9ca41483bcf
+Create Date: 2026-10-17 10:12:41.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e7c3f9a42'
+down_revision = 'd9ca41483bcf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.create_index('ix_invoices_client_id_date_issued', ['client_id', 'date_issued'], unique=False)
+        batch_op.create_index('ix_invoices_status_date_issued', ['status', 'date_issued'], unique=False)
+        batch_op.create_index('ix_invoices_date_issued', ['date_issued'], unique=False)
+        batch_op.create_index('ix_invoices_unpaid_due_date', ['due_date', 'status'], unique=False,
+                              sqlite_where=sa.text("status != 'Paid'"))
+
+    with op.batch_alter_table('invoice_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_invoice_items_invoice_id'), ['invoice_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('invoice_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_invoice_items_invoice_id'))
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_index('ix_invoices_unpaid_due_date')
+        batch_op.drop_index('ix_invoices_date_issued')
+        batch_op.drop_index('ix_invoices_status_date_issued')
+        batch_op.drop_index('ix_invoices_client_id_date_issued')
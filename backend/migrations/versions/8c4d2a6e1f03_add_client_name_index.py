@@ -0,0 +1,25 @@
+"""Add client name index for the paged client list
+
+Revision ID: 8c4d2a6e1f03
+Revises: 5b1e7c3f9a42
+Create Date: 2026-10-17 14:03:27.918350
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4d2a6e1f03'
+down_revision = '5b1e7c3f9a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('clients', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_clients_name'), ['name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('clients', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_clients_name'))
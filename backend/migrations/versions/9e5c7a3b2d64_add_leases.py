@@ -0,0 +1,29 @@
+"""Add leases for electing the scheduler leader among server workers
+
+Revision ID: 9e5c7a3b2d64
+Revises: 6d2b1e8f4a90
+Create Date: 2026-10-17 21:05:14.377019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e5c7a3b2d64'
+down_revision = '6d2b1e8f4a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leases',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('holder', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('leases')
@@ -0,0 +1,29 @@
+"""Add settings_version for cross-process settings cache invalidation
+
+Revision ID: e4f2b8d61c57
+Revises: 8c4d2a6e1f03
+Create Date: 2026-10-17 16:41:09.502734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4f2b8d61c57'
+down_revision = '8c4d2a6e1f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('settings_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO settings_version (id, version) VALUES (1, 0)")
+
+
+def downgrade():
+    op.drop_table('settings_version')
@@ -6,7 +6,8 @@ db = SQLAlchemy()
 class Client(db.Model):
     __tablename__ = 'clients'
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String, nullable=False)
+    # Indexed for the paged client list, see migration 8c4d2a6e1f03
+    name = db.Column(db.String, nullable=False, index=True)
     address = db.Column(db.String)
     email = db.Column(db.String)
     phone = db.Column(db.String)
@@ -29,10 +30,24 @@ class Invoice(db.Model):
     
     items = db.relationship('InvoiceItem', backref='invoice', lazy=True, cascade="all, delete-orphan")
 
+    # Keep in sync with migration 5b1e7c3f9a42
+    __table_args__ = (
+        # Per-client lists and yearly counts
+        db.Index('ix_invoices_client_id_date_issued', 'client_id', 'date_issued'),
+        # Dashboard filtered by status, newest first
+        db.Index('ix_invoices_status_date_issued', 'status', 'date_issued'),
+        # Unfiltered dashboard, newest first
+        db.Index('ix_invoices_date_issued', 'date_issued'),
+        # Overdue checks only ever look at unpaid invoices. SQLite only uses a
+        # partial index when the query repeats the predicate literally, see
+        # db_manager.UNPAID.
+        db.Index('ix_invoices_unpaid_due_date', 'due_date', 'status', sqlite_where=db.text("status != 'Paid'")),
+    )
+
 class InvoiceItem(db.Model):
     __tablename__ = 'invoice_items'
     id = db.Column(db.Integer, primary_key=True)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'))
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), index=True)
     description = db.Column(db.String)
     quantity = db.Column(db.Float)
     rate = db.Column(db.Float)
@@ -42,3 +57,50 @@ class Settings(db.Model):
     __tablename__ = 'settings'
     key = db.Column(db.String, primary_key=True)
     value = db.Column(db.String)
+
+class SettingsVersion(db.Model):
+    # Single row (id=1) bumped on every settings change, so each process can
+    # tell whether its cached settings are still current with one cheap read
+    __tablename__ = 'settings_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class InvoiceSequence(db.Model):
+    # Last invoice number handed out per client and year. Numbers are claimed
+    # with a single atomic UPDATE, so concurrent forms never get the same one
+    __tablename__ = 'invoice_sequences'
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    last_number = db.Column(db.Integer, nullable=False, default=0)
+
+class Notification(db.Model):
+    # Outbox of webhook messages. Rows are written in the same transaction as
+    # the change they report and delivered by notifier.Dispatcher, which
+    # retries until the webhook accepts them or the attempts run out.
+    __tablename__ = 'notification_outbox'
+    id = db.Column(db.Integer, primary_key=True)
+    webhook_url = db.Column(db.String, nullable=False)
+    kind = db.Column(db.String, nullable=False)
+    invoice_number = db.Column(db.String)
+    content = db.Column(db.Text, nullable=False)
+    # pending -> sent, or failed once the attempts are used up
+    status = db.Column(db.String, nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    # Keep in sync with migration 6d2b1e8f4a90
+    __table_args__ = (
+        # The delivery worker polls for due pending rows
+        db.Index('ix_notification_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+class Lease(db.Model):
+    # Named leases with an expiry, renewed by their holder. Lets one of
+    # several server processes act as leader, see leader.LeaderElection
+    __tablename__ = 'leases'
+    name = db.Column(db.String, primary_key=True)
+    holder = db.Column(db.String, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,286 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# Discord rejects message content longer than this
+MESSAGE_LIMIT = 2000
+
+# (connect, read) seconds; a stuck webhook must not hold a delivery thread
+DEFAULT_TIMEOUT = (5, 10)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=4):
+    """Process-wide requests.Session; reuses TLS connections to the webhook
+    host instead of opening one per message."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests takes ~50 ms to import; only pay for it on the first send
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            # Retries are the outbox's job, not urllib3's
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def post(webhook_url, content, timeout=DEFAULT_TIMEOUT):
+    return get_session().post(webhook_url, json={"content": content}, timeout=timeout)
+
+
+# Messages
+
+def _money(amount):
+    return f"${amount or 0:,.2f}"
+
+
+def invoice_message(invoice, client_name, kind):
+    if kind == 'overdue':
+        emoji = "🚨"
+        title = "**OVERDUE INVOICE ALERT**"
+        time_info = f"was due on **{invoice.due_date}**"
+    else:
+        emoji = "📢"
+        title = "**Invoice Reminder**"
+        time_info = f"is due **today** ({invoice.due_date})"
+    return (f"{emoji} {title}\nInvoice **#{invoice.invoice_number}** for **{client_name}** {time_info} "
+            f"and is unpaid.\nTotal Amount: {_money(invoice.total_amount)}")
+
+
+def digest_messages(header, lines, limit=MESSAGE_LIMIT):
+    """Pack lines under header into as few messages as fit within limit."""
+    messages = []
+    current = header
+    for line in lines:
+        if len(line) > limit - len(header) - 1:
+            line = line[:limit - len(header) - 2] + "…"
+        if len(current) + 1 + len(line) > limit:
+            messages.append(current)
+            current = header
+        current += "\n" + line
+    if current != header:
+        messages.append(current)
+    return messages
+
+
+_DIGEST_HEADERS = {
+    'overdue': "🚨 **OVERDUE INVOICES**",
+    'reminder': "📢 **Invoices due today**",
+}
+
+
+def build_messages(newly_overdue, due_today, digest=False):
+    """Outbox messages (kind, invoice_number, content) for the daily check.
+    Rows need invoice_number, due_date, total_amount and client_name.
+
+    With digest, each group is packed into as few messages as the size limit
+    allows instead of one message per invoice.
+    """
+    messages = []
+    for kind, rows in (('overdue', newly_overdue), ('reminder', due_today)):
+        if not digest:
+            messages += [(kind, row.invoice_number, invoice_message(row, row.client_name or "Unknown Client", kind))
+                         for row in rows]
+            continue
+        lines = [
+            f"• **#{row.invoice_number}** for **{row.client_name or 'Unknown Client'}**, "
+            f"due {row.due_date}, {_money(row.total_amount)}"
+            for row in rows
+        ]
+        messages += [('digest', None, content) for content in digest_messages(_DIGEST_HEADERS[kind], lines)]
+    return messages
+
+
+# Delivery
+
+class Dispatcher:
+    """Delivers outbox rows through the shared session, a few at a time.
+
+    Each round leases a batch of due rows, posts them from a bounded thread
+    pool and records the outcomes in one write:
+
+    - 2xx: sent.
+    - 429: retried after the Retry-After the webhook asked for, without
+      counting as an attempt; the webhook is paused for that long.
+    - 5xx, timeouts, connection errors: exponential backoff with jitter,
+      failed after max_attempts.
+    - other 4xx (deleted webhook, bad payload): failed at once.
+    """
+
+    def __init__(self, app, concurrency=4, batch_size=50, timeout=DEFAULT_TIMEOUT, max_attempts=8,
+                 backoff_base=5.0, backoff_max=3600.0, poll_interval=30.0, keep_days=7):
+        self.app = app
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.keep_days = keep_days
+        # Long enough for a whole batch to go through the pool
+        self.lease_seconds = (timeout[0] + timeout[1]) * (batch_size // concurrency + 1)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='notify')
+        self._paused = {} # webhook_url -> time.monotonic() it may be called again
+        self._paused_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pruned_at = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='notify-dispatcher', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Deliver right away instead of at the next poll."""
+        self._wake.set()
+
+    def _paused_for(self, url):
+        with self._paused_lock:
+            return max(0.0, self._paused.get(url, 0.0) - time.monotonic())
+
+    def _pause(self, url, seconds):
+        with self._paused_lock:
+            until = time.monotonic() + seconds
+            self._paused[url] = max(self._paused.get(url, 0.0), until)
+
+    def _backoff(self, attempts):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _attempt(self, row):
+        import requests
+        get_session(pool_size=self.concurrency)
+        now = datetime.utcnow()
+        result = {"id": row.id, "status": "pending", "attempts": row.attempts, "next_attempt_at": now,
+                  "last_error": None, "sent_at": None}
+
+        wait = self._paused_for(row.webhook_url)
+        if wait:
+            result["next_attempt_at"] = now + timedelta(seconds=wait)
+            return result
+
+        result["attempts"] += 1
+        try:
+            resp = post(row.webhook_url, row.content, timeout=self.timeout)
+        except requests.RequestException as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            if resp.status_code < 300:
+                # Discord announces an exhausted bucket before answering 429
+                if resp.headers.get('X-RateLimit-Remaining') == '0':
+                    self._pause(row.webhook_url, _float(resp.headers.get('X-RateLimit-Reset-After'), 1.0))
+                result.update(status="sent", sent_at=now)
+                return result
+            if resp.status_code == 429:
+                retry_after = _retry_after(resp)
+                self._pause(row.webhook_url, retry_after)
+                result.update(attempts=row.attempts, last_error="429 rate limited",
+                              next_attempt_at=now + timedelta(seconds=retry_after))
+                return result
+            error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+            if resp.status_code < 500:
+                result.update(status="failed", last_error=error)
+                return result
+
+        if result["attempts"] >= self.max_attempts:
+            result.update(status="failed", last_error=error)
+        else:
+            result.update(last_error=error, next_attempt_at=now + timedelta(seconds=self._backoff(result["attempts"])))
+        return result
+
+    def deliver_due(self):
+        """Send one batch of due notifications; returns how many were tried."""
+        import db_manager
+        with self.app.app_context():
+            rows = db_manager.claim_notifications(datetime.utcnow(), self.lease_seconds, self.batch_size)
+        if not rows:
+            return 0
+        results = list(self._executor.map(self._attempt, rows))
+        with self.app.app_context():
+            db_manager.record_notification_results(results)
+        return len(rows)
+
+    def drain(self):
+        """Deliver until nothing is due right now."""
+        total = 0
+        while True:
+            count = self.deliver_due()
+            if not count:
+                return total
+            total += count
+
+    def _seconds_until_due(self):
+        import db_manager
+        with self.app.app_context():
+            due = db_manager.next_notification_due()
+        if due is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.0, (due - datetime.utcnow()).total_seconds()))
+
+    def _prune(self):
+        import db_manager
+        if time.monotonic() - self._pruned_at < 3600:
+            return
+        self._pruned_at = time.monotonic()
+        with self.app.app_context():
+            db_manager.prune_notifications(datetime.utcnow() - timedelta(days=self.keep_days))
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            wait = self.poll_interval
+            try:
+                self.drain()
+                self._prune()
+                wait = self._seconds_until_due()
+            except Exception as e:
+                print(f"Notification delivery failed: {e}")
+            # Rows that are due but still leased elsewhere would come back
+            # at once; never spin faster than once a second
+            self._wake.wait(max(wait, 1.0))
+
+
+def _float(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _retry_after(resp):
+    # Discord puts it in the JSON body (seconds, may be fractional); the
+    # header is the HTTP standard
+    try:
+        body = resp.json()
+    except ValueError:
+        body = None
+    seconds = body.get('retry_after') if isinstance(body, dict) else None
+    if seconds is None:
+        seconds = resp.headers.get('Retry-After')
+    return max(0.1, _float(seconds, 5.0))
+
+
+def dispatcher_from_env(app):
+    read_timeout = float(os.environ.get('NOTIFY_TIMEOUT', '10'))
+    return Dispatcher(
+        app,
+        concurrency=int(os.environ.get('NOTIFY_CONCURRENCY', '4')),
+        timeout=(min(5.0, read_timeout), read_timeout),
+        max_attempts=int(os.environ.get('NOTIFY_MAX_ATTEMPTS', '8')),
+        poll_interval=float(os.environ.get('NOTIFY_POLL_INTERVAL', '30')),
+    )
+
+
+def digest_enabled():
+    return os.environ.get('NOTIFY_DIGEST', '0').lower() in ('1', 'true', 'yes')
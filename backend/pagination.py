@@ -0,0 +1,36 @@
+import base64
+import json
+
+# Page size used when a client sends a cursor without a limit
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def encode_cursor(values):
+    """Opaque token for the sort key of the last row on a page."""
+    raw = json.dumps(values, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor. Raises ValueError for malformed tokens."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_limit(raw):
+    """Clamp a ?limit= value to 1..MAX_LIMIT. Raises ValueError if not a number."""
+    if raw in (None, ''):
+        return DEFAULT_LIMIT
+    return max(1, min(int(raw), MAX_LIMIT))
+
+
+def wants_page(args):
+    """Paged responses are opt-in so existing callers keep getting a plain list."""
+    return 'limit' in args or 'cursor' in args
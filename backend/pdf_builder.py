@@ -2,79 +2,279 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Flowable
+from reportlab.pdfbase.pdfmetrics import stringWidth
+import copy
+import io
 import os
+import time
+import logging
+import font_registry
+
+# Settings keys that end up on the rendered PDF. Anything else (e.g. the
+# Discord webhook) can change without invalidating previously rendered files.
+PDF_SETTINGS_KEYS = (
+    'sender_name',
+    'sender_address_line1',
+    'sender_address_line2',
+    'sender_address_line3',
+    'sender_email',
+    'sender_phone',
+    'tax_id',
+    'vat_percentage',
+    'default_vat_exempt_reason',
+    'bank_account_holder',
+    'bank_iban',
+    'bank_swift',
+)
+
+# Bump whenever the layout below changes so cached renders are discarded
+LAYOUT_VERSION = 2
+
+logger = logging.getLogger(__name__)
+
+# Invoices with more line items than this are laid out page by page, with
+# the column header repeated and plain-text cells where no wrapping is needed
+LARGE_INVOICE_THRESHOLD = 100
+
+class InvoiceTemplate:
+    """Styles and settings-derived flowables shared by every invoice render.
+
+    None of it depends on the invoice itself, so a document with several
+    invoices (see statement_builder) builds it once.
+    """
+
+    def __init__(self, settings, font_name, bold_font_name):
+        self.font_name = font_name
+        self.bold_font_name = bold_font_name
+        styles = getSampleStyleSheet()
+        
+        # Define Custom Styles
+        self.normal_style = ParagraphStyle('Normal_Custom', parent=styles['Normal'], fontName=font_name, fontSize=10, leading=14)
+        self.white_bold_style = ParagraphStyle('Bold_Custom', parent=styles['Normal'], fontName=bold_font_name, fontSize=10, leading=14, textColor=colors.white)
+        self.bold_style = ParagraphStyle('Bold_Custom', parent=styles['Normal'], fontName=bold_font_name, fontSize=10, leading=14)
+        self.title_style = ParagraphStyle('Title_Custom', parent=styles['Heading1'], fontName=bold_font_name, fontSize=24, spaceAfter=20, alignment=2) # Right align
+        self.inv_num_style = ParagraphStyle('InvNum', parent=self.normal_style, alignment=2, fontSize=12, textColor=colors.gray)
+        self.bill_to_label_style = ParagraphStyle('BillToLabel', parent=self.normal_style, textColor=colors.gray)
+        self.detail_label_style = ParagraphStyle('DetailLabel', parent=self.normal_style, alignment=2, textColor=colors.gray)
+        self.detail_value_style = ParagraphStyle('DetailValue', parent=self.normal_style, alignment=2)
+        self.bal_label_style = ParagraphStyle('BalLabel', parent=self.bold_style, alignment=2)
+        self.bal_value_style = ParagraphStyle('BalValue', parent=self.bold_style, alignment=2)
+        self.vat_exempt_label_style = ParagraphStyle('VatExemptLabel', parent=self.bold_style, fontSize=8, textColor=colors.gray)
+        self.vat_exempt_value_style = ParagraphStyle('VatExemptVal', parent=self.normal_style, fontSize=8, textColor=colors.gray)
+        # Note: True italic for Arial requires ariali.ttf. If not registered, it might not slant.
+        self.italic_style = ParagraphStyle('Italic', parent=self.normal_style, fontName=font_name, fontName_italic=font_name, face='Italic')
+
+        # Table styles
+        self.header_table_style = TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+            ('LEFTPADDING', (0,0), (-1,-1), 0),
+            ('RIGHTPADDING', (0,0), (-1,-1), 0),
+        ])
+        self.details_table_style = TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ('ALIGN', (1,0), (1,-1), 'RIGHT'), # Align values right (though Paragraph handles text align, Table align helps placement)
+            ('BACKGROUND', (0,3), (-1,3), colors.whitesmoke), # Balance Due Row Background (Light Gray)
+            ('PADDING', (0,3), (-1,3), 6), # Extra padding for Balance Due
+            ('BOTTOMPADDING', (0,0), (-1,-2), 2),
+            ('TOPPADDING', (0,0), (-1,-2), 2),
+        ])
+        self.mid_table_style = TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+            ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ])
+        self.items_table_style = TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.Color(0.2, 0.2, 0.2)), # Dark Grey Background
+            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            ('FONTNAME', (0,0), (-1,-1), font_name),
+            # Sample screenshot shows dark header strip, no grid.
+            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ('PADDING', (0,0), (-1,-1), 10),
+            ('LINEBELOW', (0,0), (-1,0), 0, colors.black),
+        ])
+        # Large invoices draw most cells as plain strings instead of Paragraphs
+        self.large_items_table_style = TableStyle(self.items_table_style.getCommands() + [
+            ('FONTSIZE', (0,1), (-1,-1), 10),
+            ('LEADING', (0,1), (-1,-1), 14),
+        ])
+        self.totals_table_style = TableStyle([   
+            ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ])
+
+        # Settings-derived flowables
+        self._sender_info = [
+            Paragraph(settings.get("sender_name", ""), self.bold_style),
+            Paragraph(settings.get("sender_address_line1", ""), self.normal_style),
+            Paragraph(settings.get("sender_address_line2", ""), self.normal_style),
+            Paragraph(settings.get("sender_address_line3", ""), self.normal_style),
+            Paragraph(f"Email: {settings.get('sender_email', '')}", self.normal_style),
+            Paragraph(f"Phone Number: {settings.get('sender_phone', '')}", self.normal_style),
+        ]
+        self._invoice_title = Paragraph("INVOICE", self.title_style)
+        self._tax_id_row = [
+            Paragraph("Tax Identification Number:", self.detail_label_style),
+            Paragraph(settings.get('tax_id', ''), self.detail_value_style),
+        ]
+        self._items_header = [
+            Paragraph("Item", self.white_bold_style),
+            Paragraph("Quantity", self.white_bold_style),
+            Paragraph("Rate", self.white_bold_style),
+            Paragraph("Amount", self.white_bold_style)
+        ]
+
+        # Use the specific bank account holder name, defaulting to sender name if not set
+        holder = settings.get('bank_account_holder') or settings.get('sender_name', '')
+        payment_info = [
+            f"Account Holder Name: {holder}",
+            f"IBAN: {settings.get('bank_iban', '')}",
+            "Currency Code: USD",
+            f"Swift code: {settings.get('bank_swift', '')}"
+        ]
+        self._payment_block = [
+            Paragraph("Payment Instructions:", self.bold_style),
+            Spacer(1, 5),
+            Paragraph("Please remit payment via international wire transfer to the following account:", self.normal_style),
+            Spacer(1, 10),
+        ]
+        for line in payment_info:
+            self._payment_block.append(Paragraph(line, self.normal_style))
+        self._payment_block.append(Spacer(1, 10))
+        self._payment_block.append(Paragraph("Please note that all transfer fees should be covered by the sender.", self.italic_style))
+
+    # Platypus records layout state on flowables (wrapped size, _postponed
+    # when pushed to the next page), so every invoice gets shallow copies.
+    # The parsed paragraph text and styles stay shared.
+    @staticmethod
+    def _copies(flowables):
+        return [copy.copy(f) for f in flowables]
+
+    def sender_info(self):
+        return self._copies(self._sender_info)
+
+    def invoice_title(self):
+        return copy.copy(self._invoice_title)
+
+    def tax_id_row(self):
+        return self._copies(self._tax_id_row)
+
+    def items_header(self):
+        return self._copies(self._items_header)
+
+    def payment_block(self):
+        return self._copies(self._payment_block)
+
+
+class RenderProfile:
+    """Wall-clock time spent in each stage of one InvoicePDF.generate() call.
+
+    Stages: styles (template build), header (sender, bill-to and
+    details), items, totals (incl. payment instructions) and build. For
+    large invoices the item rows are laid out lazily, so most of their cost
+    shows up under build.
+    """
+
+    def __init__(self, invoice_data):
+        self.invoice_number = invoice_data.get('invoice_number')
+        self.line_items = len(invoice_data.get('line_items') or [])
+        self.stages = {}
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = now - self._last
+        self._last = now
+
+    def to_dict(self):
+        return {
+            'invoice_number': self.invoice_number,
+            'line_items': self.line_items,
+            'total_seconds': self._last - self._start,
+            'stages': dict(self.stages),
+        }
+
+
+class _NoProfile:
+    def mark(self, stage):
+        pass
+
 
 class InvoicePDF:
-    def __init__(self, invoice_data, settings_data):
+    def __init__(self, invoice_data, settings_data, profile=None):
         self.invoice_data = invoice_data
         # Ensure all settings values are strings (handle None from DB)
         self.settings = {k: (v if v is not None else "") for k, v in settings_data.items()}
         
-        # Register standard font for unicode support (Windows)
-        # Try finding Arial, fallback to Helvetica if not found (though less likely to support special chars)
-        self.font_name = 'Helvetica'
-        self.bold_font_name = 'Helvetica-Bold'
+        # Fonts are discovered and registered once per process
+        fonts = font_registry.get_fonts()
+        self.font_name = fonts.regular
+        self.bold_font_name = fonts.bold
         
-        try:
-            # Common Windows Font Path
-            font_dir = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
-            arial_path = os.path.join(font_dir, 'arial.ttf')
-            arial_bd_path = os.path.join(font_dir, 'arialbd.ttf')
-            
-            if os.path.exists(arial_path):
-                pdfmetrics.registerFont(TTFont('Arial', arial_path))
-                self.font_name = 'Arial'
-                
-            if os.path.exists(arial_bd_path):
-                pdfmetrics.registerFont(TTFont('Arial-Bold', arial_bd_path))
-                self.bold_font_name = 'Arial-Bold'
-            elif self.font_name == 'Arial':
-                self.bold_font_name = 'Arial' # Fallback if bold missing
-                
-        except Exception as e:
-            print(f"Warning: Could not load system font: {e}")
-
-    def generate(self, filename):
+        # Per-stage timings, enabled per instance or with PDF_PROFILE=1
+        if profile is None:
+            profile = os.environ.get('PDF_PROFILE', '0').lower() in ('1', 'true', 'yes')
+        self.profile = profile
+        self.last_profile = None
+
+    def generate(self, filename=None):
+        """Render to filename (a path or file-like object), or return the PDF bytes when omitted."""
+        if filename is None:
+            buffer = io.BytesIO()
+            self.generate(buffer)
+            return buffer.getvalue()
+        
+        profile = RenderProfile(self.invoice_data) if self.profile else _NoProfile()
         doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40)
-        story = []
-        styles = getSampleStyleSheet()
+        t = InvoiceTemplate(self.settings, self.font_name, self.bold_font_name)
+        profile.mark('styles')
         
-        # Define Custom Styles
-        normal_style = ParagraphStyle('Normal_Custom', parent=styles['Normal'], fontName=self.font_name, fontSize=10, leading=14)
-        white_bold_style = ParagraphStyle('Bold_Custom', parent=styles['Normal'], fontName=self.bold_font_name, fontSize=10, leading=14, textColor=colors.white)
-        bold_style = ParagraphStyle('Bold_Custom', parent=styles['Normal'], fontName=self.bold_font_name, fontSize=10, leading=14)
-        title_style = ParagraphStyle('Title_Custom', parent=styles['Heading1'], fontName=self.bold_font_name, fontSize=24, spaceAfter=20, alignment=2) # Right align
+        story = self.story(t, profile)
+        
+        doc.build(story)
+        profile.mark('build')
         
+        if self.profile:
+            self.last_profile = profile.to_dict()
+            logger.info(
+                "Rendered invoice %s (%d items) in %.3fs",
+                profile.invoice_number, profile.line_items, self.last_profile['total_seconds'],
+                extra={'pdf_profile': self.last_profile}
+            )
+
+    def story(self, t, profile=None):
+        """Flowables for this invoice, built on template t.
+
+        Used by generate() and by documents that embed several invoices
+        (see statement_builder).
+        """
+        profile = profile or _NoProfile()
+        story = []
+        story += self._header(t)
+        story += self._bill_to_and_details(t)
+        profile.mark('header')
+        story += self._items(t)
+        profile.mark('items')
+        story += self._totals(t)
+        story += t.payment_block()
+        profile.mark('totals')
+        return story
+
+    def _header(self, t):
         # ------------------------------------------------------------------
         # Header Section: Sender Info (Left) | INVOICE Title (Right)
         # ------------------------------------------------------------------
-        sender_info = [
-            Paragraph(self.settings.get("sender_name", ""), bold_style),
-            Paragraph(self.settings.get("sender_address_line1", ""), normal_style),
-            Paragraph(self.settings.get("sender_address_line2", ""), normal_style),
-            Paragraph(self.settings.get("sender_address_line3", ""), normal_style),
-            Paragraph(f"Email: {self.settings.get('sender_email', '')}", normal_style),
-            Paragraph(f"Phone Number: {self.settings.get('sender_phone', '')}", normal_style),
-        ]
-        
         invoice_title = [
-            Paragraph("INVOICE", title_style),
-            Paragraph(f"#{self.invoice_data['invoice_number']}", ParagraphStyle('InvNum', parent=normal_style, alignment=2, fontSize=12, textColor=colors.gray))
+            t.invoice_title(),
+            Paragraph(f"#{self.invoice_data['invoice_number']}", t.inv_num_style)
         ]
         
-        header_data = [[sender_info, invoice_title]]
+        header_data = [[t.sender_info(), invoice_title]]
         header_table = Table(header_data, colWidths=[3.5*inch, 2.5*inch])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-        ]))
-        story.append(header_table)
-        story.append(Spacer(1, 0.5*inch))
-        
+        header_table.setStyle(t.header_table_style)
+        return [header_table, Spacer(1, 0.5*inch)]
+
+    def _bill_to_and_details(self, t):
         # ------------------------------------------------------------------
         # Bill To & Details Section
         # ------------------------------------------------------------------
@@ -82,61 +282,41 @@ class InvoicePDF:
         client_address = self.invoice_data['client']['address'] or ""
         client_address_lines = client_address.split('\n')
         bill_to_content = [
-            Paragraph("Bill To:", ParagraphStyle('BillToLabel', parent=normal_style, textColor=colors.gray)),
-            Paragraph(self.invoice_data['client']['name'], bold_style)
+            Paragraph("Bill To:", t.bill_to_label_style),
+            Paragraph(self.invoice_data['client']['name'], t.bold_style)
         ]
         for line in client_address_lines:
-            bill_to_content.append(Paragraph(line, normal_style))
+            bill_to_content.append(Paragraph(line, t.normal_style))
             
         # Invoice Details (Right) - Structure: [Label, Value]
         # We need a table style that right aligns the values and highlights the Balance Due
-        
-        # Helper to simplify label styling
-        def detail_label(text):
-            return Paragraph(text, ParagraphStyle('DetailLabel', parent=normal_style, alignment=2, textColor=colors.gray))
-        def detail_value(text, style=None):
-            return Paragraph(text, style if style else ParagraphStyle('DetailValue', parent=normal_style, alignment=2))
-
         details_data = [
-            [detail_label("Invoice Date:"), detail_value(str(self.invoice_data['date_issued']))],
-            [detail_label("Due Date:"), detail_value(str(self.invoice_data['due_date']))],
-            [detail_label("Tax Identification Number:"), detail_value(self.settings.get('tax_id', ''))],
-            [Paragraph("Balance Due:", ParagraphStyle('BalLabel', parent=bold_style, alignment=2)), 
-             Paragraph(f"US${self.invoice_data['total_amount']:.2f}", ParagraphStyle('BalValue', parent=bold_style, alignment=2))]
+            [Paragraph("Invoice Date:", t.detail_label_style), Paragraph(str(self.invoice_data['date_issued']), t.detail_value_style)],
+            [Paragraph("Due Date:", t.detail_label_style), Paragraph(str(self.invoice_data['due_date']), t.detail_value_style)],
+            t.tax_id_row(),
+            [Paragraph("Balance Due:", t.bal_label_style), 
+             Paragraph(f"US${self.invoice_data['total_amount']:.2f}", t.bal_value_style)]
         ]
         
         # Columns need to be wide enough. 
         # Left col (labels) ~ 1.5 inch, Right col (values) ~ 1.2 inch
         details_table = Table(details_data, colWidths=[2*inch, 1.2*inch])
-        details_table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('ALIGN', (1,0), (1,-1), 'RIGHT'), # Align values right (though Paragraph handles text align, Table align helps placement)
-            ('BACKGROUND', (0,3), (-1,3), colors.whitesmoke), # Balance Due Row Background (Light Gray)
-            ('PADDING', (0,3), (-1,3), 6), # Extra padding for Balance Due
-            ('BOTTOMPADDING', (0,0), (-1,-2), 2),
-            ('TOPPADDING', (0,0), (-1,-2), 2),
-        ]))
+        details_table.setStyle(t.details_table_style)
         
         mid_section_data = [[bill_to_content, details_table]]
         mid_table = Table(mid_section_data, colWidths=[3.0*inch, 3.2*inch])
-        mid_table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-        ]))
-        story.append(mid_table)
-        story.append(Spacer(1, 0.5*inch))
-        
+        mid_table.setStyle(t.mid_table_style)
+        return [mid_table, Spacer(1, 0.5*inch)]
+
+    def _items(self, t):
         # ------------------------------------------------------------------
         # Line Items Table
         # ------------------------------------------------------------------
-        items_header = [
-            Paragraph("Item", white_bold_style),
-            Paragraph("Quantity", white_bold_style),
-            Paragraph("Rate", white_bold_style),
-            Paragraph("Amount", white_bold_style)
-        ]
+        if len(self.invoice_data['line_items']) > LARGE_INVOICE_THRESHOLD:
+            return [_ItemRowsFeeder(self, t), Spacer(1, 0.2*inch)]
         
-        items_data = [items_header]
+        normal_style = t.normal_style
+        items_data = [t.items_header()]
         
         for item in self.invoice_data['line_items']:
             description = item[2] or ""
@@ -153,20 +333,25 @@ class InvoicePDF:
             ])
             
         items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1*inch, 1*inch])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.Color(0.2, 0.2, 0.2)), # Dark Grey Background
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('FONTNAME', (0,0), (-1,-1), self.font_name),
-            # ('GRID', (0,0), (-1,-1), 0.5, colors.grey), # Remove grid for cleaner look if needed, or keep? Sample shows no vertical lines usually.
-            # Sample screenshot shows dark header strip.
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('PADDING', (0,0), (-1,-1), 10),
-            ('LINEBELOW', (0,0), (-1,0), 0, colors.black),
-        ]))
-        story.append(items_table)
-        story.append(Spacer(1, 0.2*inch))
+        items_table.setStyle(t.items_table_style)
+        return [items_table, Spacer(1, 0.2*inch)]
+
+    def _large_items_table(self, t, items):
+        # Only the description can need wrapping; numbers are drawn as plain
+        # strings, which skips Paragraph parsing and line breaking per cell.
+        max_width = 3*inch - 20 # column width minus padding
+        items_data = [t.items_header()]
+        for item in items:
+            description = item[2] or ""
+            if '\n' in description or '<' in description or stringWidth(description, t.font_name, 10) > max_width:
+                description = Paragraph(description, t.normal_style)
+            items_data.append([description, str(item[3]), f"US${item[4]:.2f}", f"US${item[5]:.2f}"])
         
+        items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1*inch, 1*inch])
+        items_table.setStyle(t.large_items_table_style)
+        return items_table
+
+    def _totals(self, t):
         # ------------------------------------------------------------------
         # Totals Section
         # ------------------------------------------------------------------
@@ -183,9 +368,9 @@ class InvoicePDF:
             vat_amount = self.invoice_data['total_amount'] - subtotal
         
         totals_data = [
-            [Paragraph("Subtotal:", bold_style), Paragraph(f"US${subtotal:.2f}", normal_style)],
-            [Paragraph(f"VAT ({vat_percent}%):", bold_style), Paragraph(f"US${vat_amount:.2f}", normal_style)],
-            [Paragraph("Total:", bold_style), Paragraph(f"US${self.invoice_data['total_amount']:.2f}", bold_style)]
+            [Paragraph("Subtotal:", t.bold_style), Paragraph(f"US${subtotal:.2f}", t.normal_style)],
+            [Paragraph(f"VAT ({vat_percent}%):", t.bold_style), Paragraph(f"US${vat_amount:.2f}", t.normal_style)],
+            [Paragraph("Total:", t.bold_style), Paragraph(f"US${self.invoice_data['total_amount']:.2f}", t.bold_style)]
         ]
 
         if vat_exempt:
@@ -197,69 +382,63 @@ class InvoicePDF:
                  reason = "VAT Exempt"
                  
              totals_data.append([
-                 Paragraph("VAT Exemption:", ParagraphStyle('VatExemptLabel', parent=bold_style, fontSize=8, textColor=colors.gray)),
-                 Paragraph(str(reason), ParagraphStyle('VatExemptVal', parent=normal_style, fontSize=8, textColor=colors.gray))
+                 Paragraph("VAT Exemption:", t.vat_exempt_label_style),
+                 Paragraph(str(reason), t.vat_exempt_value_style)
              ])
         
         # Align to the right side of the page
         totals_table = Table(totals_data, colWidths=[1.5*inch, 1.5*inch])
-        totals_table.setStyle(TableStyle([   
-            ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
+        totals_table.setStyle(t.totals_table_style)
         
         # Create a container table to push totals to the right
         container_data = [[None, totals_table]]
         container_table = Table(container_data, colWidths=[3*inch, 3*inch])
-        story.append(container_table)
-        story.append(Spacer(1, 0.5*inch))
-        
-        # ------------------------------------------------------------------
-        # Payment Instructions
-        # ------------------------------------------------------------------
-        story.append(Paragraph("Payment Instructions:", bold_style))
-        story.append(Spacer(1, 5))
-        story.append(Paragraph("Please remit payment via international wire transfer to the following account:", normal_style))
-        story.append(Spacer(1, 10))
-        
-        payment_info = [
-            f"Account Holder Name: {self.settings.get('bank_account_holder', '')}",
-            f"IBAN: {self.settings.get('bank_iban', '')}",
-            f"Currency Code: USD",
-            f"Account Number / Branch: {self.settings.get('bank_branch', '')}", # Keep if exists, or remove if user wanted just the header changed? User said 'remove Bank Branch from settings, add Account Holder'. 
-                                                                               # Wait, user said 'remove the Account Number / Branch from the settings'.
-                                                                               # And 'make the account hlder name be set also'.
-            f"Swift code: {self.settings.get('bank_swift', '')}"
-        ]
-        
-        # NOTE: I kept bank_branch key in DB but in UI it was replaced? 
-        # In previous step I renamed the input field to 'bank_account_holder' but I might have left 'bank_branch' key in dictionary?
-        # Let's check app.py. User said: "Remove Bank Branch, add Account Holder Name".
-        # In app.py I mapped 'bank_account_holder' from form to 'bank_account_holder' key in DB.
-        # But I removed 'bank_branch' from the form.
-        # So 'bank_branch' in settings might be empty or old value. 
-        # I should NOT display Account Number / Branch if user asked to remove it.
-        # User said: "remove the Account Number / Branch from the settings"
-        
-        # Use the specific bank account holder name, defaulting to sender name if not set
-        holder = self.settings.get('bank_account_holder') or self.settings.get('sender_name', '')
+        return [container_table, Spacer(1, 0.5*inch)]
 
-        payment_info_clean = [
-            f"Account Holder Name: {holder}",
-            f"IBAN: {self.settings.get('bank_iban', '')}",
-            f"Currency Code: USD",
-            f"Swift code: {self.settings.get('bank_swift', '')}"
-        ]
-        # User said "Make the account hlder name be set also for the payment instructions other than my name directly"
-        # So I should show THAT one.
-        # Let's use the explicit list below.
-
-        for line in payment_info_clean:
-             story.append(Paragraph(line, normal_style))
-             
-        story.append(Spacer(1, 10))
-        story.append(Paragraph("Please note that all transfer fees should be covered by the sender.", ParagraphStyle('Italic', parent=normal_style, fontName=self.font_name, fontName_italic=self.font_name, face='Italic'))) 
-        # Note: True italic for Arial requires ariali.ttf. If not registered, it might not slant.
-        # For now, just keep normal or try oblique if ReportLab simulates it.
-        
-        doc.build(story)
+
+class _ItemRowsFeeder(Flowable):
+    """Lays out a large items table one page at a time.
+
+    It never fits as a whole, so platypus always asks it to split. Each split
+    builds a table of the column header plus the rows that fit the remaining
+    frame, and hands back a new feeder for the rest. Only about a page of row
+    flowables exists at any time, and the header repeats on every page.
+    """
+
+    INITIAL_CHUNK = 50
+
+    def __init__(self, pdf, template, start=0, chunk=INITIAL_CHUNK):
+        Flowable.__init__(self)
+        self.pdf = pdf
+        self.template = template
+        self.start = start
+        self.chunk = chunk
+
+    def wrap(self, availWidth, availHeight):
+        return availWidth, availHeight + 1
+
+    def draw(self):
+        pass
+
+    def split(self, availWidth, availHeight):
+        items = self.pdf.invoice_data['line_items']
+        chunk = self.chunk
+        while True:
+            end = min(self.start + chunk, len(items))
+            table = self.pdf._large_items_table(self.template, items[self.start:end])
+            _, height = table.wrap(availWidth, availHeight)
+            if height <= availHeight:
+                if end == len(items):
+                    return [table]
+                # Short rows: take more of them before splitting
+                chunk *= 2
+                continue
+            
+            parts = table.split(availWidth, availHeight)
+            if not parts:
+                return [] # Not even one row fits, move on to the next page
+            consumed = parts[0]._nrows - 1 # header row
+            if consumed <= 0:
+                return []
+            # The next page usually holds about as many rows as this one
+            return [parts[0], _ItemRowsFeeder(self.pdf, self.template, self.start + consumed, consumed + consumed // 2 + 5)]
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Default budget for rendered PDFs kept in memory (bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+# Invoice fields that are not printed on the PDF
+NON_RENDERED_FIELDS = ('status',)
+
+
+def render_key(invoice_data, settings):
+    """Content hash of everything that influences the rendered PDF."""
+    # Deferred so importing the cache does not load ReportLab
+    from pdf_builder import PDF_SETTINGS_KEYS, LAYOUT_VERSION
+    payload = {
+        'layout': LAYOUT_VERSION,
+        'invoice': {k: v for k, v in invoice_data.items() if k not in NON_RENDERED_FIELDS},
+        'settings': {k: settings.get(k) for k in PDF_SETTINGS_KEYS},
+    }
+    # default=str covers dates coming straight from the ORM
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PDFRenderCache:
+    """Thread-safe LRU cache of rendered PDF bytes, bounded by total size."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, count=True):
+        """Cached bytes for key, or None. Pass count=False for internal
+        lookups that should not show up in the hit/miss counters."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return data
+
+    def put(self, key, data):
+        # A single file bigger than the whole budget is never worth keeping
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
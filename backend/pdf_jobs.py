@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import time
+import uuid
+import datetime
+import threading
+from collections import OrderedDict
+
+import render_pool
+from file_utils import write_atomic
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class RegistryFull(Exception):
+    pass
+
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+# Fields written to <store_dir>/<id>.json
+_STORED_FIELDS = ('id', 'invoice_number', 'status', 'created_at', 'started_at', 'finished_at', 'error')
+
+
+class PDFJob:
+    def __init__(self, invoice_number):
+        self.id = uuid.uuid4().hex
+        self.invoice_number = invoice_number
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.future = None
+        self._pdf = None
+        # Set for jobs loaded from the shared store; read on first access
+        self._pdf_path = None
+
+    @property
+    def pdf(self):
+        if self._pdf is None and self._pdf_path:
+            with open(self._pdf_path, 'rb') as f:
+                self._pdf = f.read()
+        return self._pdf
+
+    @pdf.setter
+    def pdf(self, value):
+        self._pdf = value
+
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self):
+        status = self.status
+        # Process pool futures flip to running once handed to a worker
+        if status == QUEUED and self.future is not None and self.future.running():
+            status = RUNNING
+
+        def iso(ts):
+            return datetime.datetime.fromtimestamp(ts).isoformat() if ts else None
+
+        data = {
+            'id': self.id,
+            'invoice_number': self.invoice_number,
+            'status': status,
+            'created_at': iso(self.created_at),
+            'started_at': iso(self.started_at),
+            'finished_at': iso(self.finished_at),
+            'queue_seconds': round(self.started_at - self.created_at, 3) if self.started_at else None,
+            'render_seconds': round(self.finished_at - self.started_at, 3) if self.started_at and self.finished_at else None,
+            'error': self.error,
+        }
+        if status == DONE:
+            data['download_url'] = f"/api/pdf-jobs/{self.id}/download"
+        return data
+
+
+class PDFJobRegistry:
+    """Registry of PDF render jobs.
+
+    Bounded to max_jobs entries; finished jobs expire after ttl seconds and
+    are evicted oldest first when room is needed. Polling only takes a short
+    in-process lock and never touches the database.
+
+    With store_dir, each job's state (<id>.json) and result (<id>.pdf) are
+    also written there, so any server worker sharing the folder can answer
+    polls and downloads for jobs another worker rendered. Such jobs show as
+    queued until they are finished.
+    """
+
+    def __init__(self, max_jobs=500, ttl=3600, cache=None, store_dir=None):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.cache = cache
+        self.store_dir = store_dir
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+    def submit(self, invoice_data, settings, cache_key=None):
+        """Create a job for an invoice. Served from the cache when possible,
+        otherwise rendered on the process pool."""
+        job = PDFJob(invoice_data['invoice_number'])
+        cached = self.cache.get(cache_key) if self.cache is not None and cache_key else None
+        with self._lock:
+            self._make_room()
+            self._jobs[job.id] = job
+            if cached is not None:
+                job.pdf = cached
+                job.started_at = job.finished_at = job.created_at
+                job.status = DONE
+        self._store(job)
+        if cached is not None:
+            return job
+
+        try:
+            # dict(): the read-only settings snapshot cannot be pickled
+            job.future = render_pool.get_pool().submit(render_pool.render_invoice_pdf, invoice_data, dict(settings))
+        except Exception as e:
+            self._finish(job, error=str(e))
+            return job
+        job.future.add_done_callback(lambda future: self._on_done(job, future, cache_key))
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        if job is None:
+            job = self._load(job_id)
+        return job
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.to_dict()['status']] += 1
+            return {'jobs': len(self._jobs), 'max_jobs': self.max_jobs, **counts}
+
+    def _on_done(self, job, future, cache_key):
+        try:
+            result = future.result()
+        except Exception as e:
+            self._finish(job, error=str(e) or e.__class__.__name__)
+            return
+        if self.cache is not None and cache_key:
+            self.cache.put(cache_key, result['pdf'])
+        self._finish(job, result=result)
+
+    def _finish(self, job, result=None, error=None):
+        self._update(job, result, error)
+        self._store(job)
+
+    def _update(self, job, result, error):
+        with self._lock:
+            if result is not None:
+                job.pdf = result['pdf']
+                job.started_at = result['started_at']
+                job.finished_at = result['finished_at']
+                job.status = DONE
+            else:
+                job.error = error
+                job.finished_at = time.time()
+                job.status = FAILED
+            job.future = None
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished() and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+        if self.store_dir and time.time() - self._swept_at > 60:
+            self._swept_at = time.time()
+            self._sweep(cutoff)
+
+    # Shared store
+
+    def _path(self, job_id, ext):
+        return os.path.join(self.store_dir, f"{job_id}.{ext}")
+
+    def _store(self, job):
+        if not self.store_dir:
+            return
+        try:
+            # The PDF first, so a job stored as done always has its result
+            if job.status == DONE and job._pdf_path is None:
+                write_atomic(self._path(job.id, 'pdf'), job.pdf)
+            state = {field: getattr(job, field) for field in _STORED_FIELDS}
+            write_atomic(self._path(job.id, 'json'), json.dumps(state).encode('utf-8'))
+        except OSError as e:
+            print(f"Could not store PDF job {job.id}: {e}")
+
+    def _load(self, job_id):
+        """A job another worker created, from the shared store."""
+        if not self.store_dir or not _JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id, 'json'), encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        job = PDFJob(state['invoice_number'])
+        for field in _STORED_FIELDS:
+            setattr(job, field, state.get(field))
+        if job.finished() and job.finished_at < time.time() - self.ttl:
+            return None
+        if job.status == DONE:
+            job._pdf_path = self._path(job_id, 'pdf')
+        return job
+
+    def _sweep(self, cutoff):
+        # Files of jobs older than the ttl, whichever worker wrote them
+        try:
+            names = os.listdir(self.store_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.store_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def _make_room(self):
+        self._expire()
+        if len(self._jobs) < self.max_jobs:
+            return
+        # Evict the oldest finished job; unfinished ones are never dropped
+        for job_id, job in self._jobs.items():
+            if job.finished():
+                del self._jobs[job_id]
+                return
+        raise RegistryFull(f"Too many PDF jobs in progress ({self.max_jobs})")
+
+
+def registry_from_env(cache=None, store_dir=None):
+    return PDFJobRegistry(
+        max_jobs=int(os.environ.get('PDF_JOBS_MAX', '500')),
+        ttl=int(os.environ.get('PDF_JOBS_TTL', '3600')),
+        cache=cache,
+        store_dir=os.environ.get('PDF_JOBS_DIR', store_dir),
+    )
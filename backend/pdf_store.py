@@ -0,0 +1,120 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from file_utils import write_atomic
+
+# Rendered PDFs are archived under data/invoices/<ClientName>/<number>.pdf.
+# Downloads are served from memory; archiving is a best-effort side copy.
+INVOICES_DIR = os.environ.get(
+    'PDF_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'invoices')
+)
+
+# Rendered PDFs by render_key (pdf_cache.render_key), shared by every server
+# worker: a PDF pre-rendered by one worker is served by the others without
+# rendering it again. Oldest files are removed past PDF_RENDER_STORE_MAX_MB.
+RENDERS_DIR = os.environ.get(
+    'PDF_RENDER_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'renders')
+)
+# Stored renders between two size checks of RENDERS_DIR
+PRUNE_EVERY = 100
+
+_executor = None
+_lock = threading.Lock()
+_stores_since_prune = 0
+
+
+def archive_enabled():
+    return os.environ.get('PDF_ARCHIVE', '1').lower() not in ('0', 'false', 'no')
+
+
+def safe_client_name(name):
+    # Sanitize client name for folder safely
+    return "".join([c for c in (name or "") if c.isalpha() or c.isdigit() or c==' ']).strip()
+
+
+def archive_path(client_name, invoice_number):
+    return os.path.join(INVOICES_DIR, safe_client_name(client_name), f"{invoice_number}.pdf")
+
+
+def archive_pdf(client_name, invoice_number, data):
+    path = archive_path(client_name, invoice_number)
+    try:
+        write_atomic(path, data)
+    except Exception as e:
+        print(f"Failed to archive {path}: {e}")
+    return path
+
+
+def archive_async(client_name, invoice_number, data):
+    """Queue an archive write on a background thread (no-op when archiving is disabled)."""
+    global _executor
+    if not archive_enabled():
+        return None
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                # A single writer keeps disk I/O sequential and off request threads
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdf-archive')
+    return _executor.submit(archive_pdf, client_name, invoice_number, data)
+
+
+def render_store_enabled():
+    return os.environ.get('PDF_RENDER_STORE', '1').lower() not in ('0', 'false', 'no')
+
+
+def render_path(key):
+    # Two-character fan-out keeps any one folder small
+    return os.path.join(RENDERS_DIR, key[:2], f"{key}.pdf")
+
+
+def load_render(key):
+    """Stored PDF bytes for a render key, or None."""
+    if not render_store_enabled():
+        return None
+    try:
+        with open(render_path(key), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def store_render(key, data):
+    global _stores_since_prune
+    if not render_store_enabled():
+        return
+    try:
+        write_atomic(render_path(key), data)
+    except Exception as e:
+        print(f"Failed to store render {key}: {e}")
+        return
+    with _lock:
+        _stores_since_prune += 1
+        if _stores_since_prune < PRUNE_EVERY:
+            return
+        _stores_since_prune = 0
+    prune_renders(int(os.environ.get('PDF_RENDER_STORE_MAX_MB', '512')) * 1024 * 1024)
+
+
+def prune_renders(max_bytes):
+    """Delete the oldest stored renders until the store fits max_bytes."""
+    files = []
+    for folder, _, names in os.walk(RENDERS_DIR):
+        for name in names:
+            path = os.path.join(folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
@@ -0,0 +1,52 @@
+import os
+import time
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Workers only need this module and pdf_builder. They are always spawned:
+# forking a server that already runs background threads can deadlock the
+# child. Spawned workers re-import the main script, see IS_POOL_WORKER in
+# app.py; frozen builds rely on freeze_support() at the top of app.py.
+_pool = None
+_lock = threading.Lock()
+
+
+def pool_size():
+    return int(os.environ.get('PDF_RENDER_PROCESSES', min(4, os.cpu_count() or 1)))
+
+
+def _init_worker():
+    # Pay font discovery once per worker instead of on the first render
+    import font_registry
+    font_registry.get_fonts()
+
+
+def render_invoice_pdf(invoice_data, settings):
+    """Render one invoice to PDF bytes. Runs inside a pool worker."""
+    from pdf_builder import InvoicePDF
+    started = time.time()
+    pdf = InvoicePDF(invoice_data, settings).generate()
+    return {
+        'invoice_number': invoice_data['invoice_number'],
+        'client_name': invoice_data['client']['name'],
+        'pdf': pdf,
+        'started_at': started,
+        'finished_at': time.time(),
+    }
+
+
+def get_pool():
+    """Shared process pool for PDF rendering, created on first use."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=pool_size(),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
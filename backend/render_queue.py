@@ -0,0 +1,122 @@
+import os
+import heapq
+import itertools
+import threading
+
+import pdf_store
+from pdf_cache import render_key
+
+# Lower runs first. Invoices that were just saved jump the queue; bulk
+# re-renders after a settings change follow in the order of
+# db_manager.get_invoice_numbers_by_render_priority().
+PRIORITY_EDITED = 0
+PRIORITY_BULK = 1
+
+_app = None
+_cache = None
+_heap = []
+_pending = {} # invoice_number -> heap entry currently considered live
+_counter = itertools.count()
+_cond = threading.Condition()
+
+
+def enabled():
+    return _app is not None
+
+
+def init_app(app, cache):
+    """Start the pre-render workers. Until this is called enqueueing is a no-op
+    (e.g. for the CLI in main.py)."""
+    global _app, _cache
+    if _app is not None or os.environ.get('PDF_PRERENDER', '1').lower() in ('0', 'false', 'no'):
+        return
+    _app = app
+    _cache = cache
+    for i in range(int(os.environ.get('PDF_PRERENDER_WORKERS', '1'))):
+        threading.Thread(target=_worker, name=f'pdf-prerender-{i}', daemon=True).start()
+
+
+def enqueue(invoice_number, priority=PRIORITY_EDITED):
+    if not enabled():
+        return
+    with _cond:
+        current = _pending.get(invoice_number)
+        # Already queued at the same or a more urgent priority
+        if current is not None and current[0] <= priority:
+            return
+        entry = (priority, next(_counter), invoice_number)
+        _pending[invoice_number] = entry
+        heapq.heappush(_heap, entry)
+        _cond.notify()
+
+
+def requeue_all(changed_keys=None):
+    """Drop cached renders and queue the most relevant invoices again.
+
+    Called after settings changes. Only changes to settings that are printed
+    on the PDF (pdf_builder.PDF_SETTINGS_KEYS) do anything; with
+    changed_keys=None everything is re-rendered. Only the first
+    PDF_PRERENDER_REQUEUE_LIMIT invoices in priority order are re-rendered;
+    older ones render on demand.
+    """
+    if not enabled():
+        return
+    if changed_keys is not None:
+        from pdf_builder import PDF_SETTINGS_KEYS
+        if not set(changed_keys) & set(PDF_SETTINGS_KEYS):
+            return
+    import db_manager
+    _cache.clear()
+    limit = int(os.environ.get('PDF_PRERENDER_REQUEUE_LIMIT', '200'))
+    for number in db_manager.get_invoice_numbers_by_render_priority(limit=limit):
+        enqueue(number, PRIORITY_BULK)
+
+
+def pending_count():
+    with _cond:
+        return len(_pending)
+
+
+def _next():
+    with _cond:
+        while True:
+            while not _heap:
+                _cond.wait()
+            entry = heapq.heappop(_heap)
+            # Skip entries superseded by a later, more urgent enqueue
+            if _pending.get(entry[2]) is entry:
+                del _pending[entry[2]]
+                return entry[2]
+
+
+def _render(invoice_number):
+    import db_manager
+    from pdf_builder import InvoicePDF
+    with _app.app_context():
+        invoice_data = db_manager.get_invoice_details(invoice_number)
+        if not invoice_data:
+            return
+        settings = db_manager.get_settings()
+    
+    key = render_key(invoice_data, settings)
+    if _cache.get(key, count=False) is not None:
+        return
+    # Another worker may have rendered it already
+    pdf_bytes = pdf_store.load_render(key)
+    if pdf_bytes is not None:
+        _cache.put(key, pdf_bytes)
+        return
+    pdf_bytes = InvoicePDF(invoice_data, settings).generate()
+    _cache.put(key, pdf_bytes)
+    pdf_store.store_render(key, pdf_bytes)
+    if pdf_store.archive_enabled():
+        pdf_store.archive_pdf(invoice_data['client']['name'], invoice_number, pdf_bytes)
+
+
+def _worker():
+    while True:
+        invoice_number = _next()
+        try:
+            _render(invoice_number)
+        except Exception as e:
+            print(f"Pre-render of invoice {invoice_number} failed: {e}")
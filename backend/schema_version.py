@@ -0,0 +1,84 @@
+"""Cheap check of the database's Alembic revision against the migrations'
+head, so a start with an up-to-date database does not load Alembic at all."""
+import os
+import re
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Written into the migrations directory at build time by tools/schema_head.py
+HEAD_FILE = 'head.txt'
+
+_REVISION = re.compile(r"""^revision\s*(?::[^=]*)?=\s*['"](\w+)['"]""", re.M)
+_DOWN_REVISION = re.compile(r"^down_revision\s*(?::[^=]*)?=\s*(.+)$", re.M)
+_QUOTED = re.compile(r"""['"](\w+)['"]""")
+
+
+def _version_files(migration_dir):
+    return sorted(f for f in os.listdir(os.path.join(migration_dir, 'versions')) if f.endswith('.py'))
+
+
+def scan_head(migration_dir):
+    """Head revision read from the migration scripts themselves, or None when
+    there is not exactly one."""
+    revisions, parents = set(), set()
+    for name in _version_files(migration_dir):
+        with open(os.path.join(migration_dir, 'versions', name), encoding='utf-8') as f:
+            source = f.read()
+        revision = _REVISION.search(source)
+        if not revision:
+            continue
+        revisions.add(revision.group(1))
+        down = _DOWN_REVISION.search(source)
+        if down:
+            # None, 'abc' or ('abc', 'def') for merge revisions
+            parents.update(_QUOTED.findall(down.group(1)))
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+def head_revision(migration_dir):
+    """Head revision from HEAD_FILE, or from scanning the scripts when the
+    file is missing or was written for a different set of scripts."""
+    try:
+        files = _version_files(migration_dir)
+    except OSError:
+        return None
+    try:
+        with open(os.path.join(migration_dir, HEAD_FILE), encoding='utf-8') as f:
+            head, *listed = f.read().split()
+    except (OSError, ValueError):
+        head, listed = None, None
+    if head and listed == files:
+        return head
+    return scan_head(migration_dir)
+
+
+def write_head_file(migration_dir):
+    """Record the head revision and the scripts it was computed from."""
+    head = scan_head(migration_dir)
+    if head is None:
+        raise ValueError(f"{migration_dir} does not have exactly one head revision")
+    with open(os.path.join(migration_dir, HEAD_FILE), 'w', encoding='utf-8') as f:
+        f.write('\n'.join([head] + _version_files(migration_dir)) + '\n')
+    return head
+
+
+def current_revision(engine):
+    """Revision stamped in alembic_version, or None (no table, no row or
+    several heads)."""
+    with engine.connect() as conn:
+        try:
+            rows = conn.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+        except OperationalError:
+            return None
+    return rows[0] if len(rows) == 1 else None
+
+
+def matches_models(engine, metadata):
+    """True when the tables in the database match the models, as far as
+    Alembic's autogenerate can tell. Loads Alembic."""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    with engine.connect() as conn:
+        return not compare_metadata(MigrationContext.configure(conn), metadata)
@@ -0,0 +1,95 @@
+import io
+import datetime
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, PageBreak
+
+import font_registry
+from pdf_builder import InvoicePDF, InvoiceTemplate
+
+
+class ClientStatementPDF:
+    """One document covering several invoices of a client.
+
+    Starts with a summary page listing every invoice and the outstanding
+    balance, followed by each invoice laid out exactly as InvoicePDF does.
+    Fonts are embedded once and all invoices share one template.
+    """
+
+    def __init__(self, client, invoices, settings_data, statement_date=None):
+        # client: dict with name/address, invoices: dicts shaped like
+        # db_manager.get_invoice_details() (see get_client_statement)
+        self.client = client
+        self.invoices = invoices
+        self.settings = {k: (v if v is not None else "") for k, v in settings_data.items()}
+        self.statement_date = statement_date or datetime.date.today()
+
+        fonts = font_registry.get_fonts()
+        self.font_name = fonts.regular
+        self.bold_font_name = fonts.bold
+
+    def generate(self, filename=None):
+        """Render to filename (a path or file-like object), or return the PDF bytes when omitted."""
+        if filename is None:
+            buffer = io.BytesIO()
+            self.generate(buffer)
+            return buffer.getvalue()
+
+        doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40)
+        t = InvoiceTemplate(self.settings, self.font_name, self.bold_font_name)
+
+        story = self._summary(t)
+        for invoice_data in self.invoices:
+            story.append(PageBreak())
+            story += InvoicePDF(invoice_data, self.settings).story(t)
+
+        doc.build(story)
+
+    def _summary(self, t):
+        story = []
+
+        # Header: Sender Info (Left) | STATEMENT Title (Right)
+        title = [
+            Paragraph("STATEMENT", t.title_style),
+            Paragraph(str(self.statement_date), t.inv_num_style)
+        ]
+        header_table = Table([[t.sender_info(), title]], colWidths=[3.5*inch, 2.5*inch])
+        header_table.setStyle(t.header_table_style)
+        story.append(header_table)
+        story.append(Spacer(1, 0.5*inch))
+
+        # Client
+        story.append(Paragraph("Statement For:", t.bill_to_label_style))
+        story.append(Paragraph(self.client['name'], t.bold_style))
+        for line in (self.client.get('address') or "").split('\n'):
+            story.append(Paragraph(line, t.normal_style))
+        story.append(Spacer(1, 0.5*inch))
+
+        # One row per invoice
+        rows = [[Paragraph(h, t.white_bold_style) for h in ("Invoice", "Issued", "Due", "Status", "Amount")]]
+        outstanding = 0.0
+        for inv in self.invoices:
+            rows.append([
+                Paragraph(inv['invoice_number'], t.normal_style),
+                Paragraph(str(inv['date_issued'] or ""), t.normal_style),
+                Paragraph(str(inv['due_date'] or ""), t.normal_style),
+                Paragraph(inv['status'] or "", t.normal_style),
+                Paragraph(f"US${inv['total_amount'] or 0:.2f}", t.normal_style),
+            ])
+            if inv['status'] != 'Paid':
+                outstanding += inv['total_amount'] or 0
+
+        summary_table = Table(rows, colWidths=[2.2*inch, 1*inch, 1*inch, 0.8*inch, 1.2*inch], repeatRows=1)
+        summary_table.setStyle(t.items_table_style)
+        story.append(summary_table)
+        story.append(Spacer(1, 0.2*inch))
+
+        balance_table = Table([[
+            Paragraph("Total Outstanding:", t.bal_label_style),
+            Paragraph(f"US${outstanding:.2f}", t.bal_value_style)
+        ]], colWidths=[1.8*inch, 1.2*inch])
+        balance_table.setStyle(t.totals_table_style)
+        # Push the balance to the right side of the page
+        story.append(Table([[None, balance_table]], colWidths=[3.2*inch, 3*inch]))
+        return story
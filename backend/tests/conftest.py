@@ -0,0 +1,14 @@
+import pytest
+
+from models import db
+from tools.sql_counter import make_app
+
+
+@pytest.fixture
+def app():
+    """App context on an empty in-memory database created from models.py."""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
@@ -0,0 +1,93 @@
+"""SQLite connection profiles (db_engine.py): readers and writers do not block each other in WAL mode."""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+import db_engine
+from benchmarks.bench_sqlite_concurrency import seed
+
+READ_TOTALS = "SELECT total_amount FROM invoices ORDER BY id"
+WRITE_TOTALS = "UPDATE invoices SET total_amount = total_amount + 1"
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    engines = []
+
+    def make(profile):
+        # A short connect timeout so a lock wait shows up as an error quickly;
+        # the wal profile's busy_timeout pragma overrides it
+        engine = create_engine(f"sqlite:///{tmp_path / profile}.db", connect_args={'timeout': 0.2},
+                               **db_engine.engine_options())
+        db_engine.install(engine, db_engine.profile_pragmas(profile))
+        seed(engine, 200)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+def test_wal_profile_pragmas(make_engine):
+    with make_engine('wal').connect() as conn:
+        values = db_engine.pragma_values(conn, ['journal_mode', 'synchronous', 'busy_timeout'])
+    assert values == {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000}
+
+
+def test_profile_overrides(monkeypatch):
+    monkeypatch.setenv('SQLITE_PRAGMAS', 'cache_size=-64000, mmap_size=0')
+    pragmas = db_engine.profile_pragmas('wal')
+    assert pragmas['cache_size'] == '-64000' and pragmas['mmap_size'] == '0'
+    assert pragmas['journal_mode'] == 'WAL'
+    with pytest.raises(ValueError):
+        db_engine.profile_pragmas('nope')
+
+
+def read_one_row(engine):
+    """Start reading invoices and stop after the first row, keeping the read
+    (and its snapshot) open like a slow dashboard request."""
+    conn = engine.raw_connection()
+    cursor = conn.cursor()
+    cursor.execute(READ_TOTALS)
+    return conn, cursor, cursor.fetchone()[0]
+
+
+def test_wal_writer_commits_while_reader_is_open(make_engine):
+    engine = make_engine('wal')
+    reader, cursor, first = read_one_row(engine)
+    try:
+        with engine.begin() as writer:
+            writer.exec_driver_sql(WRITE_TOTALS)
+        # The open read still sees the snapshot from before the write
+        assert cursor.fetchone()[0] == first
+    finally:
+        cursor.close()
+        reader.close()
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql(READ_TOTALS).scalar() == first + 1
+
+
+def test_wal_reader_not_blocked_by_open_write(make_engine):
+    engine = make_engine('wal')
+    with engine.connect() as conn:
+        before = conn.exec_driver_sql(READ_TOTALS).scalar()
+    with engine.begin() as writer:
+        writer.exec_driver_sql(WRITE_TOTALS)
+        # Uncommitted: other connections read the last committed values
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql(READ_TOTALS).scalar() == before
+
+
+def test_legacy_writer_blocked_by_open_reader(make_engine):
+    # What the wal profile fixes: with the rollback journal the commit needs
+    # an exclusive lock, which an open read holds off
+    engine = make_engine('legacy')
+    reader, cursor, _ = read_one_row(engine)
+    try:
+        with pytest.raises(OperationalError, match='locked'):
+            with engine.begin() as writer:
+                writer.exec_driver_sql(WRITE_TOTALS)
+    finally:
+        cursor.close()
+        reader.close()
@@ -0,0 +1,116 @@
+"""Outbox delivery (notifier.py) against a local webhook stub."""
+import datetime
+import time
+
+import pytest
+from flask import Flask
+
+import db_manager
+import notifier
+from benchmarks.bench_notifications import make_rows
+from models import db, Notification
+from tools.webhook_stub import WebhookStub
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    # The dispatcher's threads need their own connections, so a file database
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'notify.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def stub():
+    stubs = []
+
+    def start(**options):
+        stubs.append(WebhookStub(**options).start())
+        return stubs[-1]
+
+    yield start
+    for s in stubs:
+        s.stop()
+
+
+def queue(app, url, messages):
+    with app.app_context():
+        db_manager.add_notifications(url, messages)
+        db.session.commit()
+
+
+def deliver_all(app, dispatcher, timeout=30):
+    """Drain the outbox, waiting out backoffs, until nothing is pending."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        dispatcher.drain()
+        with app.app_context():
+            counts = db_manager.notification_counts()
+            due = db_manager.next_notification_due()
+        if not counts.get('pending'):
+            return counts
+        time.sleep(min(1.0, max(0.01, (due - datetime.datetime.utcnow()).total_seconds())))
+    raise AssertionError(f"outbox not delivered within {timeout}s: {counts}")
+
+
+def test_retries_server_errors_and_rate_limits(file_app, stub):
+    webhook = stub(delay=0.02, fail_every=4, rate_limit=(8, 0.5))
+    messages = notifier.build_messages(make_rows(30), make_rows(5))
+    queue(file_app, webhook.url, messages)
+
+    dispatcher = notifier.Dispatcher(file_app, concurrency=3, backoff_base=0.05, max_attempts=8)
+    counts = deliver_all(file_app, dispatcher)
+
+    assert counts == {'sent': len(messages)}
+    # Every message arrived exactly once, despite the 500s and 429s
+    assert sorted(webhook.messages) == sorted(content for _, _, content in messages)
+    assert webhook.counts['failed'] > 0 and webhook.counts['rate_limited'] > 0
+    assert webhook.max_in_flight <= 3
+
+
+def test_gives_up_after_max_attempts(file_app, stub):
+    webhook = stub(fail_every=1)
+    queue(file_app, webhook.url, [('overdue', 'INV-1', 'hello')])
+
+    dispatcher = notifier.Dispatcher(file_app, concurrency=1, backoff_base=0.01, max_attempts=3)
+    assert deliver_all(file_app, dispatcher) == {'failed': 1}
+    assert webhook.counts['requests'] == 3
+    with file_app.app_context():
+        row = Notification.query.one()
+        assert row.attempts == 3 and row.last_error.startswith('HTTP 500')
+
+
+def test_client_errors_fail_at_once(file_app, stub):
+    webhook = stub()
+    # Longer than Discord accepts: answered with 400, not worth retrying
+    queue(file_app, webhook.url, [('overdue', 'INV-1', 'x' * (notifier.MESSAGE_LIMIT + 1))])
+
+    dispatcher = notifier.Dispatcher(file_app, concurrency=1, backoff_base=0.01)
+    assert deliver_all(file_app, dispatcher) == {'failed': 1}
+    assert webhook.counts['requests'] == 1
+
+
+def test_unreachable_webhook_is_retried(file_app, stub):
+    webhook = stub()
+    url = webhook.url
+    webhook.stop()
+    queue(file_app, url, [('overdue', 'INV-1', 'hello')])
+
+    dispatcher = notifier.Dispatcher(file_app, concurrency=1, timeout=(0.5, 0.5), backoff_base=0.01, max_attempts=2)
+    assert deliver_all(file_app, dispatcher) == {'failed': 1}
+    with file_app.app_context():
+        assert Notification.query.one().last_error.startswith('ConnectionError')
+
+
+def test_digest_fits_message_limit():
+    rows = make_rows(200)
+    messages = notifier.build_messages(rows, [], digest=True)
+    assert 1 < len(messages) < len(rows)
+    assert all(len(content) <= notifier.MESSAGE_LIMIT for _, _, content in messages)
+    text = "\n".join(content for _, _, content in messages)
+    assert all(f"#{row.invoice_number}**" in text for row in rows)
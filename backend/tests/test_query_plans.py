@@ -0,0 +1,19 @@
+"""Hot queries must be served by indexes (tools/query_plans.py)."""
+import pytest
+
+from tools.query_plans import CHECKS, check, problems_in
+from tools.sql_counter import seed
+
+
+@pytest.mark.parametrize('name, fn', CHECKS, ids=[c[0] for c in CHECKS])
+def test_query_plan_uses_indexes(app, name, fn):
+    seed(3)
+    assert check(name, fn) == []
+
+
+def test_problems_in():
+    assert problems_in(['SCAN invoices', 'USE TEMP B-TREE FOR ORDER BY']) == ['SCAN invoices', 'USE TEMP B-TREE FOR ORDER BY']
+    walk = 'SCAN invoices USING INDEX ix_invoices_date_issued'
+    assert problems_in([walk]) == [walk]
+    assert problems_in([walk], index_walk_ok=True) == []
+    assert problems_in(['SEARCH invoices USING INDEX ix_invoices_client_id_date_issued (client_id=?)', 'SCAN clients']) == []
@@ -0,0 +1,10 @@
+"""Read paths must issue a fixed number of statements (tools/sql_counter.py)."""
+import pytest
+
+from tools.sql_counter import CHECKS, assert_constant
+
+
+@pytest.mark.parametrize('check', CHECKS, ids=[c[0] for c in CHECKS])
+def test_statement_count_does_not_grow_with_rows(app, check):
+    name, fn, *batches = check
+    assert_constant(name, fn, 2, 20, *batches)
@@ -0,0 +1,20 @@
+"""Cold start: heavy modules stay deferred and the first response is within budget (tools/startup_time.py)."""
+import pytest
+
+from tools.startup_time import DEFAULT_BUDGET, import_report, prepare_env, time_to_first_response
+
+
+@pytest.fixture(scope='module')
+def env(tmp_path_factory):
+    return prepare_env(str(tmp_path_factory.mktemp('startup')))
+
+
+def test_importing_app_defers_heavy_modules(env):
+    _, loaded, _ = import_report(env)
+    assert loaded == []
+
+
+def test_first_response_within_budget(env):
+    # Best of two, so one slow start on a busy machine does not fail the suite
+    elapsed = min(time_to_first_response(env) for _ in range(2))
+    assert elapsed < DEFAULT_BUDGET
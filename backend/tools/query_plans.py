@@ -0,0 +1,106 @@
+"""Check that hot db_manager queries are served by indexes.
+
+Runs each read path against an in-memory database created from models.py,
+captures the SELECTs and UPDATEs it issues and fails when EXPLAIN QUERY PLAN shows a
+full scan of invoices or invoice_items, a walk over a whole index of them
+where the query filters, or a temporary B-tree for sorting.
+
+Run from the backend directory (exits non-zero on failure):
+
+    python -m tools.query_plans [-v]
+"""
+import argparse
+import datetime
+import re
+import sys
+
+import db_manager
+from models import db
+from tools.sql_counter import QueryCounter, make_app, seed
+
+# Tables large enough that a scan is a bug
+WATCHED_TABLES = ('invoices', 'invoice_items')
+
+# "SCAN invoices" is a full table scan; "SCAN invoices USING INDEX ..." walks
+# a whole index in order, which is only fine for unfiltered lists
+FULL_SCAN = re.compile(r'^SCAN (%s)(?: AS \w+)?$' % '|'.join(WATCHED_TABLES))
+INDEX_WALK = re.compile(r'^SCAN (%s)(?: AS \w+)? USING (?:COVERING )?INDEX ' % '|'.join(WATCHED_TABLES))
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+TODAY = datetime.date.today()
+
+# (name, call). export_data and the render priority order read every row on
+# purpose and are not listed.
+CHECKS = [
+    # Unfiltered: walks ix_invoices_date_issued, see INDEX_WALK_OK
+    ('get_invoices', lambda: db_manager.get_invoices()),
+    ('get_invoices by status', lambda: db_manager.get_invoices(status='Draft')),
+    ('get_invoices_page', lambda: db_manager.get_invoices_page(limit=2, after=(TODAY, 10002))),
+    ('get_invoices_page by status', lambda: db_manager.get_invoices_page(status='Draft', limit=2, after=(TODAY, 10002))),
+    ('get_invoices_page undated', lambda: db_manager.get_invoices_page(limit=2, after=(None, 10002))),
+    ('get_clients_page', lambda: db_manager.get_clients_page(limit=2, after=("Client 1", 1))),
+    ('get_client_invoices', lambda: db_manager.get_client_invoices(1)),
+    ('get_client_invoices by status', lambda: db_manager.get_client_invoices(1, status='Paid')),
+    ('get_client_statement', lambda: db_manager.get_client_statement(1)),
+    ('get_client_invoice_count', lambda: db_manager.get_client_invoice_count(1, year=TODAY.year)),
+    ('get_invoice_details', lambda: db_manager.get_invoice_details("C1-0001")),
+    ('get_invoice_by_id', lambda: db_manager.get_invoice_by_id(10001)),
+    # Writes: runs last so the status changes do not affect the checks above
+    ('sweep_overdue_invoices', lambda: db_manager.sweep_overdue_invoices(TODAY)),
+]
+
+# Checks that read every invoice, where walking an index in order is the plan
+INDEX_WALK_OK = {'get_invoices'}
+
+
+def explain(statement, parameters):
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def problems_in(plan, index_walk_ok=False):
+    return [step for step in plan
+            if FULL_SCAN.match(step) or step == TEMP_SORT or (not index_walk_ok and INDEX_WALK.match(step))]
+
+
+def check(name, fn, verbose=False):
+    db.session.expunge_all()
+    with QueryCounter(db.engine) as counter:
+        fn()
+    failures = []
+    for statement, parameters in zip(counter.statements, counter.parameters):
+        if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE')):
+            continue
+        plan = explain(statement, parameters)
+        if verbose:
+            print(f"{name}:\n    " + "\n    ".join(plan))
+        bad = problems_in(plan, index_walk_ok=name in INDEX_WALK_OK)
+        if bad:
+            failures.append(f"{name}: {', '.join(bad)}\n  {' '.join(statement.split())}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    app = make_app()
+    failures = []
+    with app.app_context():
+        db.create_all()
+        seed(3)
+        for name, fn in CHECKS:
+            failures += check(name, fn, verbose=args.verbose)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(CHECKS)} read paths checked, {len(failures)} query plan problem(s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Write migrations/head.txt, the head revision the app compares the
+database's alembic_version against at startup (see schema_version.py).
+
+Run from the backend directory as part of a build (Dockerfile, PyInstaller):
+
+    python -m tools.schema_head
+
+Without the file the app scans the migration scripts instead, which is what
+a source checkout does; the file is ignored once the scripts change.
+"""
+import os
+import sys
+
+import schema_version
+
+MIGRATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def main():
+    try:
+        head = schema_version.write_head_file(MIGRATION_DIR)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"Wrote {schema_version.HEAD_FILE}: {head}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
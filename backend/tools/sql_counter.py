@@ -0,0 +1,170 @@
+"""Count SQL statements issued by db_manager read functions.
+
+A read path that lazy-loads a relationship per row issues more statements
+as the table grows. This seeds an in-memory database at two sizes, calls
+each function, and fails when the statement count differs between them.
+Batched reads (the export) may grow by exactly the number of extra batches.
+
+Run from the backend directory:
+
+    python -m tools.sql_counter [--small 2] [--large 20] [-v]
+
+QueryCounter can also be used on its own around any block of code:
+
+    with QueryCounter(db.engine) as counter:
+        db_manager.get_invoices()
+    print(counter.count, counter.statements)
+"""
+import argparse
+import datetime
+import sys
+
+from sqlalchemy import func
+
+from flask import Flask
+from sqlalchemy import event
+
+import data_export
+import db_manager
+from models import db, Client, Invoice, InvoiceItem
+
+
+class QueryCounter:
+    """Context manager recording every statement sent to an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def __enter__(self):
+        self.statements = []
+        self.parameters = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+def count_statements(fn, *args, **kwargs):
+    """Run fn with an empty session and return the statements it issued."""
+    # Objects left in the identity map would hide lazy loads
+    db.session.expunge_all()
+    with QueryCounter(db.engine) as counter:
+        fn(*args, **kwargs)
+    return counter.statements
+
+
+def assert_constant(name, fn, small, large, batches=None, verbose=False):
+    """Raise AssertionError if fn issues more statements on the large dataset.
+
+    batches, if given, returns how many batched reads fn is expected to make
+    on the current data; only the statements beyond those must stay constant.
+    """
+    seed(small)
+    small_statements = count_statements(fn)
+    small_batches = batches() if batches else 0
+    seed(large)
+    large_statements = count_statements(fn)
+    large_batches = batches() if batches else 0
+    if verbose:
+        print(f"{name}: {len(small_statements)} statement(s) at {small} rows, "
+              f"{len(large_statements)} at {large}")
+    if len(large_statements) - large_batches != len(small_statements) - small_batches:
+        raise AssertionError(
+            f"{name} issued {len(small_statements)} statement(s) for {small} rows "
+            f"but {len(large_statements)} for {large} (expected {large_batches - small_batches} "
+            f"more for batching):\n  " + "\n  ".join(large_statements)
+        )
+
+
+def seed(n):
+    """Replace the data with n clients, each with n invoices of 3 items."""
+    db.session.rollback()
+    InvoiceItem.query.delete()
+    Invoice.query.delete()
+    Client.query.delete()
+    today = datetime.date.today()
+    for c in range(1, n + 1):
+        db.session.add(Client(id=c, name=f"Client {c}", address="Street\nCity"))
+        for k in range(n):
+            inv_id = c * 10000 + k
+            db.session.add(Invoice(
+                id=inv_id, client_id=c, invoice_number=f"C{c}-{k:04d}",
+                date_issued=today - datetime.timedelta(days=k),
+                due_date=today - datetime.timedelta(days=k - 7),
+                status='Paid' if k % 3 == 0 else 'Draft', total_amount=30.0,
+            ))
+            for j in range(3):
+                db.session.add(InvoiceItem(invoice_id=inv_id, description=f"item {j}", quantity=1, rate=10, amount=10))
+    db.session.commit()
+
+
+def export_batches():
+    """Keyset reads the export makes at EXPORT_BATCH_SIZE: per table, one per
+    full batch plus the final short (or empty) one."""
+    size = data_export.EXPORT_BATCH_SIZE
+    return sum(
+        db.session.query(func.count()).select_from(db.metadata.tables[table]).scalar() // size + 1
+        for table in db_manager.EXPORT_TABLES
+    )
+
+
+# Read paths that must not scale with the row count: (name, call[, batches])
+CHECKS = [
+    ('get_clients', lambda: db_manager.get_clients()),
+    ('get_client', lambda: db_manager.get_client(1)),
+    ('get_invoices', lambda: db_manager.get_invoices()),
+    ('get_client_invoices', lambda: db_manager.get_client_invoices(1)),
+    ('get_client_statement', lambda: db_manager.get_client_statement(1, status='All')),
+    ('get_invoice_details', lambda: db_manager.get_invoice_details("C1-0001")),
+    ('get_invoice_by_id', lambda: db_manager.get_invoice_by_id(10001)),
+    ('get_invoice_numbers', lambda: db_manager.get_invoice_numbers()),
+    # The export as /settings/export streams it; the large seed needs two
+    # batches of invoice_items
+    ('export', lambda: list(data_export.stream_json()), export_batches),
+    # The overdue check reads the client name of every invoice it notifies about
+    ('sweep_overdue_invoices', lambda: db_manager.sweep_overdue_invoices(datetime.date.today())),
+]
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument('--small', type=int, default=2)
+    parser.add_argument('--large', type=int, default=20)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    app = make_app()
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        for name, fn, *batches in CHECKS:
+            try:
+                assert_constant(name, fn, args.small, args.large, *batches, verbose=args.verbose)
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL {e}")
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} read paths use a fixed number of statements")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
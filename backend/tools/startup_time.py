@@ -0,0 +1,144 @@
+"""Startup timing report and cold-start budget check.
+
+Starts the app the way a restart does, against an existing database in a
+temp directory, and reports:
+
+- the slowest modules imported by app under `python -X importtime -c "import app"`,
+- heavy modules that importing app loaded although they are only needed
+  later (ReportLab, requests, APScheduler, Alembic once the database is
+  at head),
+- wall clock from launching `flask run` to the first 200 from /api/settings
+  (median of --runs).
+
+Run from the backend directory (exits non-zero when the median time to first
+response exceeds --budget seconds or a deferred module was loaded):
+
+    python -m tools.startup_time [--budget 3.0] [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds from launch to the first response
+DEFAULT_BUDGET = 3.0
+
+# Imported where first used (PDF routes, webhook delivery, background
+# services, migrations the database still needs); importing app must not
+# load them
+DEFERRED_MODULES = ('reportlab', 'requests', 'apscheduler', 'flask_apscheduler', 'alembic', 'flask_migrate')
+
+IMPORT_SCRIPT = (
+    "import sys, time; start = time.perf_counter(); import app; "
+    "print('elapsed', time.perf_counter() - start); "
+    f"print('loaded', *[m for m in {DEFERRED_MODULES!r} if m in sys.modules])"
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def parse_importtime(stderr):
+    """(cumulative_us, module) for the modules app imports directly, from the
+    -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Each level of nesting under the importing module adds two spaces;
+        # app itself is at level 0
+        if len(name) - len(name.lstrip(' ')) != 3:
+            continue
+        rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def prepare_env(workdir):
+    """Environment for an app with its database in workdir. The first start
+    creates and migrates the database; restarts are what gets timed."""
+    env = dict(os.environ, DATABASE_PATH=os.path.join(workdir, 'invoices.db'), FLASK_ENV='production')
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=BACKEND_DIR, env=env, check=True,
+                   capture_output=True)
+    return env
+
+
+def import_report(env):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', IMPORT_SCRIPT], cwd=BACKEND_DIR,
+                            env=env, capture_output=True, text=True, check=True)
+    elapsed, loaded = 0.0, []
+    for line in result.stdout.splitlines():
+        if line.startswith('elapsed '):
+            elapsed = float(line.split()[1])
+        elif line.startswith('loaded'):
+            loaded = line.split()[1:]
+    return elapsed, loaded, parse_importtime(result.stderr)
+
+
+def time_to_first_response(env, timeout=60):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/settings"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port)],
+                            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise SystemExit(f"server exited with {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                pass
+            time.sleep(0.02)
+        raise SystemExit("server did not answer")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="seconds to first response (median)")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15, help="slowest imports of app to list")
+    args = parser.parse_args()
+
+    problems = []
+    with tempfile.TemporaryDirectory() as workdir:
+        env = prepare_env(workdir)
+        elapsed, loaded, rows = import_report(env)
+        print(f"import app: {elapsed * 1000:.0f} ms")
+        for cumulative, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+        if loaded:
+            problems.append(f"importing app loaded {', '.join(loaded)}")
+
+        timings = [time_to_first_response(env) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"first response: {median:.2f} s median of {', '.join(f'{t:.2f}' for t in timings)} "
+          f"(budget {args.budget:.2f} s)")
+    if median > args.budget:
+        problems.append(f"first response after {median:.2f} s, budget {args.budget:.2f} s")
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
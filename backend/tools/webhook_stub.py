@@ -0,0 +1,147 @@
+"""Local stand-in for a Discord webhook, for trying notification delivery.
+
+Accepts POSTed {"content": ...} messages like Discord does, with optional
+latency, server errors and a per-window rate limit answered with 429, the
+JSON retry_after and Discord's X-RateLimit-* headers.
+
+Run from the backend directory, then set the Discord Webhook URL setting to
+the printed address:
+
+    python -m tools.webhook_stub [--port 8765] [--delay 0.2] [--fail-every 10] [--rate-limit 5/2]
+
+WebhookStub can also be started in-process, see benchmarks/bench_notifications.py.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from notifier import MESSAGE_LIMIT
+
+
+class WebhookStub:
+    """Threaded HTTP server recording the messages it accepts."""
+
+    def __init__(self, port=0, delay=0.0, fail_every=0, rate_limit=None):
+        self.delay = delay
+        self.fail_every = fail_every
+        # (requests, window seconds) or None
+        self.rate_limit = rate_limit
+        self.messages = []
+        self.counts = {'requests': 0, 'accepted': 0, 'rate_limited': 0, 'failed': 0, 'rejected': 0}
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._window = [] # monotonic times of accepted requests in the current window
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/webhook"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _decide(self, body):
+        """(status, headers, payload) for one request."""
+        with self._lock:
+            self.counts['requests'] += 1
+            number = self.counts['requests']
+            now = time.monotonic()
+            if self.rate_limit:
+                limit, window = self.rate_limit
+                self._window = [t for t in self._window if now - t < window]
+                if len(self._window) >= limit:
+                    self.counts['rate_limited'] += 1
+                    retry_after = round(window - (now - self._window[0]), 3)
+                    return 429, {'Retry-After': str(max(1, round(retry_after)))}, {
+                        'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': False
+                    }
+            if self.fail_every and number % self.fail_every == 0:
+                self.counts['failed'] += 1
+                return 500, {}, {'message': 'Internal Server Error'}
+            try:
+                content = json.loads(body)['content']
+            except (ValueError, KeyError, TypeError):
+                content = None
+            if not content or len(content) > MESSAGE_LIMIT:
+                self.counts['rejected'] += 1
+                return 400, {}, {'message': 'Invalid Form Body'}
+            self.counts['accepted'] += 1
+            self.messages.append(content)
+            headers = {}
+            if self.rate_limit:
+                self._window.append(now)
+                limit, window = self.rate_limit
+                headers = {'X-RateLimit-Limit': str(limit),
+                           'X-RateLimit-Remaining': str(limit - len(self._window)),
+                           'X-RateLimit-Reset-After': str(round(window - (now - self._window[0]), 3))}
+            return 204, headers, None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                with stub._lock:
+                    stub._in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub._in_flight)
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    status, headers, payload = stub._decide(body)
+                finally:
+                    with stub._lock:
+                        stub._in_flight -= 1
+                data = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if data:
+                    self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def parse_rate_limit(value):
+    """"5/2" -> (5, 2.0): five requests per two seconds."""
+    count, _, window = value.partition('/')
+    return int(count), float(window or 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help="seconds before each response")
+    parser.add_argument('--fail-every', type=int, default=0, help="answer every Nth request with 500")
+    parser.add_argument('--rate-limit', type=parse_rate_limit, default=None, help="REQUESTS/SECONDS, e.g. 5/2")
+    args = parser.parse_args()
+
+    stub = WebhookStub(args.port, args.delay, args.fail_every, args.rate_limit).start()
+    print(f"Webhook stub listening on {stub.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(stub.counts)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
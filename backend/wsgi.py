@@ -0,0 +1,7 @@
+"""WSGI entry point for production servers, see gunicorn.conf.py:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app import app
+
+application = app
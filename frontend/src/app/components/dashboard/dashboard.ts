@@ -1,4 +1,4 @@
-import { Component, OnInit, ChangeDetectorRef } from '@angular/core';
+import { Component, OnInit, AfterViewInit, OnDestroy, ChangeDetectorRef, ElementRef, ViewChild } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { RouterLink } from '@angular/router';
 import { FormsModule } from '@angular/forms';
@@ -12,11 +12,21 @@ import { Invoice } from '../../models/models';
   templateUrl: './dashboard.html',
   styleUrl: './dashboard.css',
 })
-export class Dashboard implements OnInit {
+export class Dashboard implements OnInit, AfterViewInit, OnDestroy {
   invoices: Invoice[] = [];
   statusFilter: string = 'All';
   statuses: string[] = ['All', 'Draft', 'Paid', 'Sent', 'Overdue'];
 
+  // Infinite scroll: pages are appended when the sentinel below the table comes into view
+  @ViewChild('sentinel') sentinel?: ElementRef<HTMLElement>;
+  total: number | null = null;
+  nextCursor: string | null = null;
+  loading = false;
+  private pageSize = 50;
+  private requestSeq = 0;
+  private sentinelVisible = false;
+  private observer?: IntersectionObserver;
+
   constructor(private api: ApiService, private cdr: ChangeDetectorRef) { }
 
   ngOnInit(): void {
@@ -28,10 +38,63 @@ export class Dashboard implements OnInit {
     this.loadInvoices();
   }
 
+  ngAfterViewInit(): void {
+    if (!this.sentinel) {
+      return;
+    }
+    this.observer = new IntersectionObserver(entries => {
+      this.sentinelVisible = entries.some(e => e.isIntersecting);
+      if (this.sentinelVisible) {
+        this.loadMore();
+      }
+    }, { rootMargin: '300px' });
+    this.observer.observe(this.sentinel.nativeElement);
+  }
+
+  ngOnDestroy(): void {
+    this.observer?.disconnect();
+  }
+
   loadInvoices(): void {
-    this.api.getInvoices(this.statusFilter).subscribe(data => {
-      this.invoices = data;
-      this.cdr.detectChanges();
+    this.invoices = [];
+    this.total = null;
+    this.nextCursor = null;
+    this.fetchPage(null);
+  }
+
+  loadMore(): void {
+    if (!this.loading && this.nextCursor) {
+      this.fetchPage(this.nextCursor);
+    }
+  }
+
+  private fetchPage(cursor: string | null): void {
+    // A newer request (e.g. after a filter change) makes older responses stale
+    const seq = ++this.requestSeq;
+    this.loading = true;
+    this.api.getInvoicesPage(this.statusFilter, cursor, this.pageSize, cursor === null).subscribe({
+      next: page => {
+        if (seq !== this.requestSeq) {
+          return;
+        }
+        this.invoices = this.invoices.concat(page.items);
+        this.nextCursor = page.next_cursor;
+        if (page.total !== undefined) {
+          this.total = page.total;
+        }
+        this.loading = false;
+        this.cdr.detectChanges();
+        // The observer only fires on changes, so keep going while the sentinel is still on screen
+        if (this.sentinelVisible) {
+          this.loadMore();
+        }
+      },
+      error: () => {
+        if (seq === this.requestSeq) {
+          this.loading = false;
+          this.cdr.detectChanges();
+        }
+      }
     });
   }
 
@@ -53,6 +116,9 @@ export class Dashboard implements OnInit {
     if (confirm('Are you sure you want to delete this invoice?')) {
       this.api.deleteInvoice(id).subscribe(() => {
         this.invoices = this.invoices.filter(i => i.id !== id);
+        if (this.total !== null) {
+          this.total--;
+        }
       });
     }
   }
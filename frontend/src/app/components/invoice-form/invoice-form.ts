@@ -1,4 +1,4 @@
-import { Component, OnInit, ChangeDetectorRef } from '@angular/core';
+import { Component, OnInit, OnDestroy, ChangeDetectorRef } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { Router, ActivatedRoute, RouterLink } from '@angular/router';
 import { FormsModule } from '@angular/forms';
@@ -12,7 +12,7 @@ import { Client, Invoice, InvoiceItem } from '../../models/models';
   templateUrl: './invoice-form.html',
   styleUrl: './invoice-form.css',
 })
-export class InvoiceForm implements OnInit {
+export class InvoiceForm implements OnInit, OnDestroy {
   invoice: Invoice = {
     client_id: 0,
     invoice_number: '',
@@ -26,6 +26,8 @@ export class InvoiceForm implements OnInit {
   clients: Client[] = [];
   isEditMode = false;
   defaultReason = '';
+  // Number claimed for this draft; given back if the form is left unsaved
+  reserved: { clientId: number, invoiceNumber: string } | null = null;
 
   constructor(
     private api: ApiService,
@@ -113,9 +115,11 @@ export class InvoiceForm implements OnInit {
 
   onClientChange(): void {
     if (!this.invoice.invoice_number && this.invoice.client_id && !this.isEditMode) {
-      this.api.getNextInvoiceNumber(this.invoice.client_id).subscribe(data => {
+      const clientId = this.invoice.client_id;
+      this.api.reserveInvoiceNumber(clientId).subscribe(data => {
         if (data && data.invoice_number) {
           this.invoice.invoice_number = data.invoice_number;
+          this.reserved = { clientId, invoiceNumber: data.invoice_number };
           this.cdr.detectChanges();
         }
       });
@@ -164,8 +168,17 @@ export class InvoiceForm implements OnInit {
       });
     } else {
       this.api.createInvoice(this.invoice).subscribe(() => {
+        this.reserved = null;
         this.router.navigate(['/dashboard']);
       });
     }
   }
+
+  ngOnDestroy(): void {
+    // The backend only takes the number back while it is still the latest
+    // one and no invoice uses it, so this is safe to call unconditionally
+    if (this.reserved) {
+      this.api.releaseInvoiceNumber(this.reserved.clientId, this.reserved.invoiceNumber).subscribe();
+    }
+  }
 }
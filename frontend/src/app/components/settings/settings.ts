@@ -32,6 +32,8 @@ export class Settings implements OnInit {
   messageType: 'success' | 'error' = 'success';
   testBtnText = 'Test Webhook';
   isTesting = false;
+  importStatus = '';
+  mergeImport = false;
 
   constructor(private api: ApiService, private cdr: ChangeDetectorRef) { }
 
@@ -88,14 +90,33 @@ export class Settings implements OnInit {
   onFileSelected(event: any): void {
     const file: File = event.target.files[0];
     if (file) {
-      if (confirm('WARNING: This will DELETE all current data and replace it with the imported file. This action cannot be undone. Proceed?')) {
-        this.api.importData(file).subscribe({
+      const warning = this.mergeImport
+        ? 'Records from the file will be added or updated; nothing else is deleted. Proceed?'
+        : 'WARNING: This will DELETE all current data and replace it with the imported file. This action cannot be undone. Proceed?';
+      if (confirm(warning)) {
+        // Large backups take a while; show how many rows are in so far
+        const poll = setInterval(() => {
+          this.api.getImportProgress().subscribe(p => {
+            if (p.running && p.rows) {
+              const total = Object.values(p.rows).reduce((a, b) => a + b, 0);
+              this.importStatus = `Importing... ${total} rows`;
+              this.cdr.detectChanges();
+            }
+          });
+        }, 1000);
+        const done = () => {
+          clearInterval(poll);
+          this.importStatus = '';
+        };
+        this.api.importData(file, this.mergeImport ? 'merge' : 'replace').subscribe({
           next: (res) => {
+            done();
             this.showMessage(res.message, 'success');
             // Reload settings potentially
             this.ngOnInit();
           },
           error: (err) => {
+            done();
             this.showMessage(err.error?.error || 'Import failed', 'error');
           }
         });
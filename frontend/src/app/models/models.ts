@@ -31,6 +31,13 @@ export interface Invoice {
     items?: InvoiceItem[];
 }
 
+// Keyset-paged list response (?limit= / ?cursor= on list endpoints)
+export interface Page<T> {
+    items: T[];
+    next_cursor: string | null;
+    total?: number;
+}
+
 export interface Settings {
     sender_name: string;
     sender_address_line1: string;
@@ -1,7 +1,7 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
-import { Client, Invoice, Settings } from '../models/models';
+import { Client, Invoice, Page, Settings } from '../models/models';
 
 @Injectable({
   providedIn: 'root'
@@ -16,6 +16,18 @@ export class ApiService {
     return this.http.get<Invoice[]>(`${this.apiUrl}/invoices?status=${status}`);
   }
 
+  // One page of invoices, newest first. Pass the previous page's next_cursor to continue.
+  getInvoicesPage(status: string = 'All', cursor: string | null = null, limit: number = 50, withTotal: boolean = false): Observable<Page<Invoice>> {
+    let params = new HttpParams().set('status', status).set('limit', limit);
+    if (cursor) {
+      params = params.set('cursor', cursor);
+    }
+    if (withTotal) {
+      params = params.set('total', 1);
+    }
+    return this.http.get<Page<Invoice>>(`${this.apiUrl}/invoices`, { params });
+  }
+
   getInvoice(id: number): Observable<Invoice> {
     return this.http.get<Invoice>(`${this.apiUrl}/invoices/${id}`);
   }
@@ -44,11 +56,30 @@ export class ApiService {
     return this.http.get<{ invoice_number: string }>(`${this.apiUrl}/next-invoice-number?client_id=${clientId}`);
   }
 
+  reserveInvoiceNumber(clientId: number): Observable<{ invoice_number: string }> {
+    return this.http.post<{ invoice_number: string }>(`${this.apiUrl}/invoice-numbers/reserve`, { client_id: clientId });
+  }
+
+  releaseInvoiceNumber(clientId: number, invoiceNumber: string): Observable<{ released: boolean }> {
+    return this.http.post<{ released: boolean }>(`${this.apiUrl}/invoice-numbers/release`, { client_id: clientId, invoice_number: invoiceNumber });
+  }
+
   // Clients
   getClients(): Observable<Client[]> {
     return this.http.get<Client[]>(`${this.apiUrl}/clients`);
   }
 
+  getClientsPage(cursor: string | null = null, limit: number = 50, withTotal: boolean = false): Observable<Page<Client>> {
+    let params = new HttpParams().set('limit', limit);
+    if (cursor) {
+      params = params.set('cursor', cursor);
+    }
+    if (withTotal) {
+      params = params.set('total', 1);
+    }
+    return this.http.get<Page<Client>>(`${this.apiUrl}/clients`, { params });
+  }
+
   getClient(id: number): Observable<Client> {
     return this.http.get<Client>(`${this.apiUrl}/clients/${id}`);
   }
@@ -82,9 +113,19 @@ export class ApiService {
     return this.http.post(`${this.apiUrl}/settings/test-discord`, { discord_webhook_url: webhookUrl });
   }
 
-  importData(file: File): Observable<any> {
+  // mode 'merge' upserts into the existing data instead of replacing it
+  importData(file: File, mode: 'replace' | 'merge' = 'replace', deleteMissing: boolean = false): Observable<any> {
     const formData = new FormData();
     formData.append('file', file);
+    formData.append('mode', mode);
+    if (deleteMissing) {
+      formData.append('delete_missing', '1');
+    }
     return this.http.post(`${this.apiUrl}/settings/import`, formData);
   }
+
+  // Row counts of the running import, keyed by table
+  getImportProgress(): Observable<{ running: boolean, rows?: { [table: string]: number } }> {
+    return this.http.get<{ running: boolean, rows?: { [table: string]: number } }>(`${this.apiUrl}/settings/import/progress`);
+  }
 }